@@ -1,90 +1,119 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import zlib
 
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, Response, g, render_template, request, redirect, url_for, flash, jsonify
 
-import requests
 import config
 from src.db import init_db
-from src import watchlist, market_sentiment, stock_analysis
+from src import (watchlist, market_sentiment, stock_analysis, warmer, price_stream, compute_pool,
+                 http_client, taskgraph, thread_pool, dashboard, screener, rate_limit, symbols, scoring)
 
 app = Flask(__name__)
 app.secret_key = "invest-secret-key"
 
+# 계산 프로세스 풀: DB 연결·백그라운드 스레드가 생기기 전에 미리 fork
+# (지표 계산이 요청 스레드의 GIL을 점유하지 않게)
+compute_pool.start()
+
 # DB 초기화: 서버 시작 시 1회만 실행 (매 요청마다 실행 X)
 init_db()
 
+# 대시보드 스냅샷: 입력이 바뀌면 백그라운드에서 다시 생성 (워커마다 1개 스레드)
+dashboard.start()
+
+# 캐시 워머: 만료 직전 항목을 백그라운드 갱신 (여러 워커 중 1곳만 임대로 담당)
+if config.CACHE_WARMER_ENABLED:
+    warmer.start()
+
+# 유니버스 스크리너 크롤러: Yahoo 요청 예산 안에서 구성 종목 갱신 (여러 워커 중 1곳만 임대로 담당)
+if config.SCREENER_ENABLED:
+    screener.start()
+
 
 @app.route("/")
 def index():
-    # 시장심리 6개 지표 + fear_score 를 동시에 병렬 조회
-    with ThreadPoolExecutor(max_workers=7) as ex:
-        f_fg  = ex.submit(market_sentiment.get_fear_greed)
-        f_vix = ex.submit(market_sentiment.get_vix)
-        f_rsi = ex.submit(market_sentiment.get_market_rsi)
-        f_cpi = ex.submit(market_sentiment.get_cpi)
-        f_yc  = ex.submit(market_sentiment.get_yield_curve)
-        f_m2  = ex.submit(market_sentiment.get_m2)
-        f_fs  = ex.submit(market_sentiment.get_fear_score)
-
-    fear_greed  = f_fg.result()
-    vix         = f_vix.result()
-    market_rsi  = f_rsi.result()
-    cpi         = f_cpi.result()
-    yield_curve = f_yc.result()
-    m2          = f_m2.result()
-    fear_score  = f_fs.result()
-
-    tickers = watchlist.get_tickers()
-    yield_spread = yield_curve.get("spread") if yield_curve.get("available") else None
-    m2_yoy         = m2.get("latest_value") if m2.get("available") else None
-    m2_consecutive = m2.get("consecutive_months", 1) if m2.get("available") else 1
-    stocks = stock_analysis.enrich_watchlist(tickers, fear_score,
-                                             yield_spread=yield_spread,
-                                             m2_yoy=m2_yoy,
-                                             m2_consecutive=m2_consecutive) if tickers else []
+    # 시장심리 지표·공포점수·점수순 watchlist 는 백그라운드에서 미리 만든 스냅샷을 읽기만 함
+    # (입력 캐시·watchlist 가 바뀌면 src.dashboard 가 다시 생성)
+    snapshot = dashboard.get()
 
     return render_template(
         "index.html",
-        fear_greed=fear_greed,
-        vix=vix,
-        market_rsi=market_rsi,
-        cpi=cpi,
-        yield_curve=yield_curve,
-        m2=m2,
-        fear_score=fear_score,
-        stocks=stocks,
+        fear_greed=snapshot["fear_greed"],
+        vix=snapshot["vix"],
+        market_rsi=snapshot["market_rsi"],
+        cpi=snapshot["cpi"],
+        yield_curve=snapshot["yield_curve"],
+        m2=snapshot["m2"],
+        fear_score=snapshot["fear_score"],
+        stocks=snapshot["stocks"],
+        grades=scoring.GRADES,
+        grade_default=scoring.GRADE_DEFAULT,
     )
 
 
 @app.route("/stock/<ticker>")
 def stock_detail(ticker):
-    # 공포점수, 금리차, M2, 종목데이터 4개 동시 조회
-    with ThreadPoolExecutor(max_workers=4) as ex:
-        f_fs   = ex.submit(market_sentiment.get_fear_score)
-        f_yc   = ex.submit(market_sentiment.get_yield_curve)
-        f_m2   = ex.submit(market_sentiment.get_m2)
-        f_data = ex.submit(stock_analysis.get_stock_data, ticker.upper())
-
-    fear_score  = f_fs.result()
-    yield_curve = f_yc.result()
-    m2          = f_m2.result()
-    stock_data  = f_data.result()
-
-    from src.scoring import calc_recommendation_score
-    yield_spread = yield_curve.get("spread") if yield_curve.get("available") else None
-    m2_yoy         = m2.get("latest_value") if m2.get("available") else None
-    m2_consecutive = m2.get("consecutive_months", 1) if m2.get("available") else 1
-    score = calc_recommendation_score(fear_score, stock_data,
-                                      yield_spread=yield_spread,
-                                      m2_yoy=m2_yoy,
-                                      m2_consecutive=m2_consecutive)
+    # 공포점수 입력 3개, 금리차, M2, 종목데이터 동시 조회 → 공포점수 → 추천 점수
+    results, timings = taskgraph.run("stock_detail", {
+        "fear_greed":  (market_sentiment.get_fear_greed, []),
+        "vix":         (market_sentiment.get_vix, []),
+        "market_rsi":  (market_sentiment.get_market_rsi, []),
+        "yield_curve": (market_sentiment.get_yield_curve, []),
+        "m2":          (market_sentiment.get_m2, []),
+        "stock":       (lambda: stock_analysis.get_stock_data(ticker.upper()), []),
+        "fear_score":  (market_sentiment.calc_fear_score, ["fear_greed", "vix", "market_rsi"]),
+        "score":       (_score_stock, ["stock", "fear_score", "yield_curve", "m2"]),
+    })
+    g.server_timing = timings
 
     return render_template(
         "stock_detail.html",
-        stock=stock_data,
-        score=score,
-        fear_score=fear_score,
-        yield_curve=yield_curve,
+        stock=results["stock"],
+        score=results["score"],
+        fear_score=results["fear_score"],
+        yield_curve=results["yield_curve"],
+    )
+
+
+def _score_stock(stock_data, fear_score, yield_curve, m2) -> dict:
+    from src.scoring import calc_recommendation_score, macro_inputs
+    return calc_recommendation_score(fear_score, stock_data, **macro_inputs(yield_curve, m2))
+
+
+@app.after_request
+def _add_server_timing(response):
+    # 계산 그래프 노드별 시간 → Server-Timing 헤더 (브라우저 개발자 도구에서 확인)
+    timings = g.pop("server_timing", None)
+    if timings:
+        response.headers["Server-Timing"] = taskgraph.server_timing(timings)
+    return response
+
+
+@app.route("/screener")
+def screener_page():
+    """
+    유니버스 스크리너 — 백그라운드 크롤러가 채점해 둔 screener 테이블을 정렬·필터 조회.
+
+    파라미터 (모두 선택):
+        sort     (str):   total_score(기본) | ath_drawdown_pct | fundamental_score | technical_score |
+                          rsi | forward_pe | buy_ratio_pct | ticker
+        order    (str):   desc(기본) | asc
+        grade    (str):   등급 (예: "★ 강력 매수")
+        sector   (str):   섹터 (예: "Technology")
+        drawdown (float): ATH 대비 최소 낙폭 % (예: 20 → -20% 이하)
+    """
+    filters = {
+        "sort":         request.args.get("sort", "total_score"),
+        "order":        request.args.get("order", "desc"),
+        "grade":        request.args.get("grade", "").strip() or None,
+        "sector":       request.args.get("sector", "").strip() or None,
+        "min_drawdown": request.args.get("drawdown", type=float),
+    }
+    return render_template(
+        "screener.html",
+        rows=screener.query(**filters),
+        filters=filters,
+        facets=screener.facets(),
+        status=screener.status(),
     )
 
 
@@ -108,12 +137,14 @@ def watchlist_add():
     name = ticker
     try:
         import yfinance as yf
-        info = yf.Ticker(ticker).info or {}
+        # 사용자 입력 티커 — 오타면 키가 거의 없는 info 가 정상 응답이므로 throttle 판정 없이 종목명만 시도
+        info = rate_limit.call(lambda: yf.Ticker(ticker).info or {})
         name = info.get("longName") or info.get("shortName") or ticker
     except Exception:
         pass
 
     if watchlist.add(ticker, name, asset_type, memo):
+        dashboard.request_rebuild()
         flash(f"{ticker} ({name}) 추가됐습니다.", "success")
     else:
         flash(f"{ticker} 는 이미 등록된 종목입니다.", "error")
@@ -126,6 +157,7 @@ def watchlist_delete():
     ticker = request.form.get("ticker", "").strip().upper()
     if ticker:
         watchlist.delete(ticker)
+        dashboard.request_rebuild()
         flash(f"{ticker} 삭제됐습니다.", "success")
     return redirect(url_for("watchlist_page"))
 
@@ -133,93 +165,158 @@ def watchlist_delete():
 @app.route("/api/prices")
 def api_prices():
     """
-    Watchlist 전체 종목의 현재가를 JSON으로 반환 (AJAX 전용).
-    프리마켓·애프터마켓 포함, 10초 캐시.
+    종목 현재가를 JSON으로 반환 (AJAX 전용).
+    프리마켓·애프터마켓 포함, 종목별 10초 캐시.
+
+    파라미터:
+        tickers (str, 선택): 쉼표 구분 티커 (예: "AAPL,MSFT"). 없으면 Watchlist 전체.
+        since   (int, 선택): 이전 응답의 X-Prices-Version. 이후 값이 바뀐 종목만 반환.
+                  버전은 시세를 조회한 워커가 매기므로, 다른 워커의 시세가 늦게 보여도 빠지지 않게
+                  since - PRICES_SINCE_SLACK_SEC 이후 버전을 모두 반환 (같은 값을 다시 받아도 화면은 그대로).
 
     응답 예시:
         {
-            "AAPL": {"price": 255.78, "prev_close": 254.0, "change_pct": 0.70},
-            "MSFT": {"price": 400.17, "prev_close": 401.32, "change_pct": -0.29}
+            "AAPL": {"price": 255.78, "prev_close": 254.0, "change_pct": 0.70, "version": 1760000000000},
+            "MSFT": {"price": 400.17, "prev_close": 401.32, "change_pct": -0.29, "version": 1759999990000}
         }
+    헤더:
+        X-Prices-Version: 응답 종목 중 최신 버전 (다음 요청의 since 값)
+        ETag: 종목별 버전 전체 + 종목 구성 — If-None-Match 가 일치하면 304 (장 마감 후 등 변동 없을 때)
+              (최신 버전만 쓰면 그보다 낮은 버전의 늦게 보인 시세가 304 에 묻힘)
     """
-    tickers = watchlist.get_tickers()
+    tickers = _request_tickers()
     if not tickers:
         return jsonify({})
 
-    from src.stock_analysis import get_batch_prices
-    prices = get_batch_prices(tickers)
-    return jsonify(prices)
+    from src.stock_analysis import get_batch_quotes
+    quotes = get_batch_quotes(tickers)
+    version = max(q.get("version", 0) for q in quotes.values())
+    tickers_tag = "%08x" % zlib.crc32(",".join(quotes).encode())
+    versions_tag = "%08x" % zlib.crc32(",".join(str(q.get("version", 0)) for q in quotes.values()).encode())
+    etag = f"{versions_tag}-{tickers_tag}"
+
+    # since 델타는 종목 구성이 같을 때만 (이전 ETag의 종목 구성과 다르면 전체 반환)
+    since = request.args.get("since", type=int)
+    same_set = any(tag.endswith("-" + tickers_tag)
+                   for tag in request.if_none_match.as_set(include_weak=True))
+    if since is not None and same_set:
+        floor = since - int(config.PRICES_SINCE_SLACK_SEC * 1000)
+        quotes = {t: q for t, q in quotes.items() if q.get("version", 0) > floor}
+
+    # 실패 표시({"price": None})는 응답에서 None
+    prices = {t: q if q.get("price") is not None else None for t, q in quotes.items()}
+    response = jsonify(prices)
+    response.headers["X-Prices-Version"] = str(version)
+    response.set_etag(etag, weak=True)
+    return response.make_conditional(request)
+
+
+@app.route("/api/stream/prices")
+def api_stream_prices():
+    """
+    종목 현재가 실시간 스트림 (Server-Sent Events).
+    서버 poller 1개가 구독 종목을 주기마다 1번 조회해 모든 연결에 전달 (탭별 폴링 대체).
+
+    파라미터: /api/prices 와 동일 (tickers 없으면 Watchlist 전체)
+    이벤트:   event: prices / data: {"AAPL": {"price": ..., "prev_close": ..., "change_pct": ...}}
+              주기적으로 ": heartbeat" 주석, 최대 유지 시간 후 연결 종료 → 브라우저가 자동 재연결
+    프로세스당 연결 수 한도(PRICE_STREAM_MAX_SUBSCRIBERS) 초과 시 503
+      → EventSource 가 재연결 없이 닫히고 페이지는 /api/prices 폴링으로 전환
+    """
+    sub_id = price_stream.subscribe(_request_tickers())
+    if sub_id is None:
+        return Response("price stream capacity reached, poll /api/prices", status=503,
+                        mimetype="text/plain", headers={"Retry-After": "60"})
+    return Response(
+        price_stream.stream(sub_id),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",   # 프록시(nginx 등) 버퍼링 비활성화
+        },
+    )
+
+
+def _request_tickers() -> list[str]:
+    """요청 파라미터 tickers (쉼표 구분) → 티커 목록. 없으면 Watchlist 전체."""
+    param = request.args.get("tickers", "").strip()
+    if param:
+        # 상세 페이지 등에서 필요한 종목만 요청 (최대 50개)
+        return [t.strip().upper() for t in param.split(",") if t.strip()][:50]
+    return watchlist.get_tickers()
 
 
 @app.route("/api/search")
 def api_search():
     """
-    키워드로 종목을 검색하는 API.
-    Yahoo Finance 검색 엔드포인트를 사용해 실시간 검색 결과 반환.
+    키워드로 종목을 검색하는 API (워치리스트 입력창 자동완성).
+    로컬 심볼 색인에서 티커 접두어 → 종목명 순으로 찾고, 로컬에 없는 검색어만 Yahoo 검색 (결과 캐시).
 
     파라미터:
-        q (str): 검색 키워드 (예: "apple", "AAPL", "삼성")
+        q (str): 검색 키워드 (예: "apple", "AAPL", "bank of")
 
     응답 예시:
         [
-            {"ticker": "AAPL", "name": "Apple Inc.", "exchange": "NMS", "type": "EQUITY"},
-            {"ticker": "AAPL.BA", "name": "Apple Inc.", "exchange": "BUE", "type": "EQUITY"},
+            {"ticker": "AAPL", "name": "Apple Inc.", "exchange": "NASDAQ", "asset_type": "stock"},
             ...
         ]
     """
     query = request.args.get("q", "").strip()
     if len(query) < 1:
         return jsonify([])
-
-    try:
-        # Yahoo Finance 비공개 검색 API 호출
-        url = "https://query1.finance.yahoo.com/v1/finance/search"
-        params = {
-            "q": query,          # 검색어
-            "quotesCount": 8,    # 최대 종목 수
-            "newsCount": 0,      # 뉴스 결과 제외
-            "listsCount": 0,     # 리스트 결과 제외
-        }
-        headers = {
-            # Yahoo Finance가 일반 브라우저 요청처럼 인식하게 처리
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        resp = requests.get(url, params=params, headers=headers, timeout=5)
-        data = resp.json()
-
-        results = []
-        for q in data.get("quotes", []):
-            # 주식(EQUITY)과 ETF만 필터링, 거래소 코드 없는 항목 제외
-            q_type = q.get("quoteType", "")
-            if q_type not in ("EQUITY", "ETF"):
-                continue
-
-            # 종목 유형 판별 (etf / stock)
-            asset_type = "etf" if q_type == "ETF" else "stock"
-
-            results.append({
-                "ticker":     q.get("symbol", ""),
-                "name":       q.get("longname") or q.get("shortname") or q.get("symbol", ""),
-                "exchange":   q.get("exchange", ""),
-                "asset_type": asset_type,
-            })
-
-        return jsonify(results)
-
-    except Exception as e:
-        # 검색 실패 시 빈 배열 반환 (UI에서 오류 없이 처리)
-        return jsonify([])
+    return jsonify(symbols.search(query))
 
 
 @app.route("/api/refresh")
 def api_refresh():
-    """L1(메모리) + L2(DB) 캐시 전체 무효화 후 메인으로 리다이렉트."""
-    from src.db import cache_clear
-    cache_clear()   # 메모리·DB 캐시 모두 삭제
+    """
+    캐시 무효화 후 리다이렉트. 값은 지우지 않고 만료로 표시 → 다음 요청부터 기존 값을 보여주며
+    키별로 1번씩 백그라운드 갱신 (전체 삭제 후 한꺼번에 재조회하던 부하 방지).
+    모든 gunicorn 워커의 L1에도 CACHE_INVALIDATION_POLL_SEC 이내에 반영된다.
+
+    파라미터:
+        ticker (str, 선택): 해당 종목만 (예: "AAPL") → 종목 상세로 이동
+        scope  (str, 선택): "sentiment" (시장심리 지표) | "stocks" (전 종목) | "all" (기본)
+    """
+    from src.db import cache_invalidate
+    ticker = request.args.get("ticker", "").strip().upper()
+    scope  = request.args.get("scope", "all")
+
+    if ticker:
+        cache_invalidate(stock_analysis.cache_patterns(ticker))
+        flash(f"{ticker} 데이터가 갱신됩니다.", "success")
+        return redirect(url_for("stock_detail", ticker=ticker))
+
+    if scope == "sentiment":
+        patterns = list(market_sentiment.CACHE_KEYS)
+    elif scope == "stocks":
+        patterns = stock_analysis.cache_patterns()
+    else:
+        patterns = ["*"]
+    cache_invalidate(patterns)
+    dashboard.request_rebuild()
     flash("데이터가 갱신됩니다. 잠시 후 페이지를 새로고침하세요.", "success")
     return redirect(url_for("index"))
 
 
+@app.route("/api/stats")
+def api_stats():
+    """캐시·DB 내부 동작 지표 JSON (운영 모니터링용)."""
+    from src.db import cache_stats, cache_write_stats
+    return jsonify({
+        "l1_cache":     cache_stats(),
+        "cache_writes": cache_write_stats(),
+        "price_stream": price_stream.stats(),
+        "compute_pool": compute_pool.stats(),
+        "thread_pools": thread_pool.stats(),
+        "http":         http_client.stats(),
+        "yahoo":        rate_limit.stats(),
+        "taskgraph":    taskgraph.stats(),
+        "screener":     screener.status(),
+        "symbols":      symbols.stats(),
+    })
+
+
 if __name__ == "__main__":
     init_db()
     app.run(debug=config.FLASK_DEBUG, port=config.FLASK_PORT)
@@ -9,6 +9,28 @@ load_dotenv(os.path.join(BASE_DIR, ".env"))
 FRED_API_KEY = os.getenv("FRED_API_KEY", "")
 DB_PATH = os.getenv("DB_PATH", os.path.join(BASE_DIR, "data", "invest.db"))
 
+# DB 연결 풀 — PostgreSQL: ThreadedConnectionPool 크기 / SQLite: 스레드별 영구 연결(WAL)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", 1))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", 10))
+DB_POOL_WAIT_SEC = float(os.getenv("DB_POOL_WAIT_SEC", 10))      # 풀 고갈 시 최대 대기
+DB_POOL_PING_SEC = int(os.getenv("DB_POOL_PING_SEC", 60))        # 이 시간 이상 유휴 연결은 사용 전 SELECT 1 확인
+DB_SQLITE_BUSY_TIMEOUT = float(os.getenv("DB_SQLITE_BUSY_TIMEOUT", 10))
+
+# L2 캐시 write-behind 큐 — 워커 1개가 모아서 multi-row upsert
+CACHE_WRITE_QUEUE_MAX = int(os.getenv("CACHE_WRITE_QUEUE_MAX", 1000))       # 대기 가능한 최대 쓰기 수
+CACHE_WRITE_BATCH_MAX = int(os.getenv("CACHE_WRITE_BATCH_MAX", 100))        # 트랜잭션당 최대 행 수
+CACHE_WRITE_LINGER_SEC = float(os.getenv("CACHE_WRITE_LINGER_SEC", 0.05))   # 배치 모으는 시간
+CACHE_WRITE_ENQUEUE_WAIT = float(os.getenv("CACHE_WRITE_ENQUEUE_WAIT", 0.5))  # 큐 가득 찼을 때 대기 후 포기
+
+# L1 인메모리 캐시 예산 — 초과 시 LRU 제거, TTL 지난 항목은 주기적으로 정리
+L1_MAX_ENTRIES = int(os.getenv("L1_MAX_ENTRIES", 2000))
+L1_MAX_BYTES = int(os.getenv("L1_MAX_BYTES", 64 * 1024 * 1024))   # JSON 직렬화 길이 기준
+L1_SWEEP_SEC = int(os.getenv("L1_SWEEP_SEC", 60))                 # 만료 항목 정리 주기
+
+# 캐시 미스 병합 (single-flight) — 워커 간 임대 유지 시간 / 대기 워커의 L2 폴링 주기
+SINGLEFLIGHT_LEASE_SEC = float(os.getenv("SINGLEFLIGHT_LEASE_SEC", 30))
+SINGLEFLIGHT_POLL_SEC = float(os.getenv("SINGLEFLIGHT_POLL_SEC", 0.25))
+
 FLASK_DEBUG = os.getenv("FLASK_DEBUG", "false").lower() == "true"
 FLASK_PORT = int(os.getenv("FLASK_PORT", 5000))
 
@@ -19,6 +41,100 @@ CACHE_TTL = {
     "cpi":         86400,
     "m2":          86400,   # 월간 데이터, 하루 1회 갱신
     "yield_curve": 3600,
-    "stock":       int(os.getenv("CACHE_TTL_STOCK", 21600)),
+    # 종목 데이터 레이어 (변경 주기별)
+    "profile":      int(os.getenv("CACHE_TTL_PROFILE", 604800)),       # 회사명·섹터: 7일
+    "fundamentals": int(os.getenv("CACHE_TTL_FUNDAMENTALS", 86400)),   # 재무지표·목표가: 1일
+    "analyst":      int(os.getenv("CACHE_TTL_ANALYST", 259200)),       # 투자의견 등급: 3일
+    "technical":    int(os.getenv("CACHE_TTL_STOCK", 21600)),          # 현재가·낙폭·지표·차트: 6시간
     "price":      int(os.getenv("CACHE_TTL_PRICE", 10)),    # 현재가 전용: 10초 캐시 (AJAX 갱신 주기와 동일)
+    "symbol_search": int(os.getenv("SYMBOL_SEARCH_TTL", 86400)),   # 로컬 색인에 없는 검색어의 Yahoo 검색 결과
+}
+
+# stale-while-revalidate: TTL이 지나도 이 시간(초) 동안은 만료 값을 즉시 반환하고
+# 백그라운드에서 1회 갱신. 한도를 넘으면 요청이 upstream 조회를 기다린다 (0 = 사용 안 함).
+CACHE_MAX_STALE = {
+    "fear_greed":  int(os.getenv("CACHE_MAX_STALE_SENTIMENT", 21600)),
+    "vix":         int(os.getenv("CACHE_MAX_STALE_SENTIMENT", 21600)),
+    "market_rsi":  int(os.getenv("CACHE_MAX_STALE_SENTIMENT", 21600)),
+    "cpi":         604800,  # 월간 데이터: 1주일까지 허용
+    "m2":          604800,
+    "yield_curve": int(os.getenv("CACHE_MAX_STALE_SENTIMENT", 21600)),
+    "profile":      2592000,   # 30일
+    "fundamentals": 604800,
+    "analyst":      604800,
+    "technical":    int(os.getenv("CACHE_MAX_STALE_STOCK", 86400)),
+    "price":       0,       # 현재가는 항상 최신 조회
 }
+SWR_REFRESH_WORKERS = int(os.getenv("SWR_REFRESH_WORKERS", 2))   # 백그라운드 갱신 스레드 수
+
+# 캐시 워머 — watchlist·시장심리 캐시를 만료 직전에 백그라운드 갱신 (python -m src.warmer 로 단독 실행 가능)
+CACHE_WARMER_ENABLED = os.getenv("CACHE_WARMER_ENABLED", "true").lower() == "true"
+CACHE_WARM_INTERVAL_SEC = int(os.getenv("CACHE_WARM_INTERVAL_SEC", 60))     # 만료 임박 항목 확인 주기
+CACHE_WARM_LEAD_SEC = int(os.getenv("CACHE_WARM_LEAD_SEC", 600))            # 만료 몇 초 전에 갱신할지
+CACHE_WARM_SPACING_SEC = float(os.getenv("CACHE_WARM_SPACING_SEC", 2))      # 갱신 사이 간격 (요청 분산)
+
+# 일봉 이력 로컬 저장소 (price_bars) 보관 기간 — ATH·52주 고점·지표 계산 구간
+PRICE_HISTORY_YEARS = int(os.getenv("PRICE_HISTORY_YEARS", 5))
+
+# /api/prices?since= 델타 여유 시간 — 다른 워커가 먼저 버전을 매긴 시세가 이 프로세스에 늦게 보이는 시간
+# (L1 현재가 TTL + L2 쓰기 지연 + 서버 간 시계 오차). since 보다 이만큼 이전 버전부터 다시 보낸다.
+PRICES_SINCE_SLACK_SEC = float(os.getenv("PRICES_SINCE_SLACK_SEC", CACHE_TTL["price"] + 5))
+
+# 현재가 SSE 스트림 (/api/stream/prices) — 프로세스당 poller 1개가 구독 종목 합집합을 주기 조회
+PRICE_STREAM_INTERVAL_SEC = float(os.getenv("PRICE_STREAM_INTERVAL_SEC", 10))    # 가격 조회 주기
+PRICE_STREAM_HEARTBEAT_SEC = float(os.getenv("PRICE_STREAM_HEARTBEAT_SEC", 15))  # 무응답 시 heartbeat 간격
+PRICE_STREAM_MAX_SEC = int(os.getenv("PRICE_STREAM_MAX_SEC", 300))               # 연결 최대 유지 시간 (이후 재연결)
+PRICE_STREAM_RETRY_MS = int(os.getenv("PRICE_STREAM_RETRY_MS", 3000))            # 브라우저 재연결 대기 (ms)
+# 스트림 연결 1개가 gunicorn 스레드 1개를 점유 → 프로세스당 연결 수 상한 (Procfile --threads 의 절반 이하 권장)
+# 한도를 넘은 탭은 /api/prices 10초 폴링으로 동작
+PRICE_STREAM_MAX_SUBSCRIBERS = int(os.getenv("PRICE_STREAM_MAX_SUBSCRIBERS", 16))
+
+# 캐시 무효화 로그 확인 주기 — 다른 워커의 /api/refresh 를 이 간격 안에 L1에 반영
+CACHE_INVALIDATION_POLL_SEC = float(os.getenv("CACHE_INVALIDATION_POLL_SEC", 2))
+
+# CPU 연산 프로세스 풀 — 지표·낙폭 계산을 요청 스레드에서 분리 (워커 프로세스마다 별도 풀)
+COMPUTE_POOL_SIZE = int(os.getenv("COMPUTE_POOL_SIZE", 2))                    # 0 이면 풀 없이 직접 계산
+COMPUTE_POOL_TIMEOUT_SEC = float(os.getenv("COMPUTE_POOL_TIMEOUT_SEC", 30))   # 작업 1건 최대 대기
+
+# I/O 동시 조회용 공용 스레드 풀 (계산 그래프·종목 일괄 조회·FRED) — 용도별 1개, 워커 프로세스마다 별도
+IO_POOL_SIZE = int(os.getenv("IO_POOL_SIZE", 32))     # 풀당 최대 스레드 (gunicorn --threads 와 맞춤)
+
+# 외부 HTTP 호출 (CNN·FRED·Yahoo 검색) — 호스트별 keep-alive 세션 공용
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))   # 연결 타임아웃 (초)
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 10))           # 응답 읽기 타임아웃 (초)
+HTTP_SEARCH_TIMEOUT = float(os.getenv("HTTP_SEARCH_TIMEOUT", 5))        # 종목 검색 (타이핑 중 호출이라 짧게)
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 2))                        # 연결 오류·429·5xx 재시도 횟수
+HTTP_BACKOFF_SEC = float(os.getenv("HTTP_BACKOFF_SEC", 0.5))            # 재시도 간격 (0.5, 1, 2 ... 초)
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 8))              # 호스트당 최대 연결 수
+
+# FRED 관측값 로컬 저장소 (fred_observations) — 최초 조회 기간, 이후에는 마지막 저장일 이후만 조회
+FRED_HISTORY_YEARS = int(os.getenv("FRED_HISTORY_YEARS", 5))
+
+# 대시보드 스냅샷 (/ 화면) — 입력 캐시·watchlist 변경 시 백그라운드 재생성, 요청은 읽기만
+DASHBOARD_CHECK_SEC = float(os.getenv("DASHBOARD_CHECK_SEC", 5))          # 입력 변경 확인 주기
+DASHBOARD_MAX_AGE_SEC = int(os.getenv("DASHBOARD_MAX_AGE_SEC", 300))      # 변경이 없어도 이 시간마다 재생성
+DASHBOARD_LEASE_SEC = int(os.getenv("DASHBOARD_LEASE_SEC", 60))           # 재생성 담당 프로세스 임대 (확인 주기마다 연장)
+
+# 유니버스 스크리너 (/screener) — 구성 종목 파일의 종목을 백그라운드 크롤러가 Yahoo 요청 예산 안에서 갱신
+# (python -m src.screener 로 단독 실행 가능, 여러 워커 중 1곳만 임대로 담당)
+SCREENER_ENABLED = os.getenv("SCREENER_ENABLED", "true").lower() == "true"
+SCREENER_UNIVERSE_FILE = os.getenv("SCREENER_UNIVERSE_FILE", os.path.join(BASE_DIR, "data", "universe_dow30.csv"))
+SCREENER_YAHOO_BUDGET_PER_HOUR = int(os.getenv("SCREENER_YAHOO_BUDGET_PER_HOUR", 300))   # 시간당 최대 Yahoo 요청 수
+SCREENER_BATCH_SIZE = int(os.getenv("SCREENER_BATCH_SIZE", 10))                # 한 번에 갱신할 종목 수
+SCREENER_REFRESH_SEC = int(os.getenv("SCREENER_REFRESH_SEC", 21600))           # 종목 데이터 재조회 주기
+SCREENER_INTERVAL_SEC = int(os.getenv("SCREENER_INTERVAL_SEC", 60))            # 갱신할 종목이 없을 때 확인 주기
+SCREENER_PAGE_LIMIT = int(os.getenv("SCREENER_PAGE_LIMIT", 200))               # 화면 최대 표시 행 수
+
+# Yahoo Finance 호출 제한 — 모든 yfinance 호출 공용 토큰 버킷 + 차단기 (워커 프로세스별)
+YAHOO_RATE_PER_SEC = float(os.getenv("YAHOO_RATE_PER_SEC", 5))                 # 초당 요청 수 (throttle 감지 시 자동 감속)
+YAHOO_BURST = int(os.getenv("YAHOO_BURST", 20))                                 # 한꺼번에 보낼 수 있는 최대 요청 수
+YAHOO_TOKEN_WAIT_SEC = float(os.getenv("YAHOO_TOKEN_WAIT_SEC", 2))              # 워머·크롤러의 토큰 대기 한도 (요청 스레드는 대기 없이 캐시 값)
+YAHOO_BREAKER_THRESHOLD = int(os.getenv("YAHOO_BREAKER_THRESHOLD", 3))          # 연속 throttle 몇 번에 차단
+YAHOO_BREAKER_COOLDOWN_SEC = float(os.getenv("YAHOO_BREAKER_COOLDOWN_SEC", 30))      # 차단 후 시험 호출까지 대기
+YAHOO_BREAKER_MAX_COOLDOWN_SEC = float(os.getenv("YAHOO_BREAKER_MAX_COOLDOWN_SEC", 600))  # 대기 시간 상한
+
+# 종목 검색 (/api/search) — 상장 종목 파일을 메모리 색인으로 검색, 로컬에 없는 검색어만 Yahoo 조회
+# (python -m src.symbols 로 NASDAQ Trader 심볼 디렉터리 전체를 받아 파일 교체)
+SYMBOLS_FILE = os.getenv("SYMBOLS_FILE", os.path.join(BASE_DIR, "data", "symbols.csv"))
+SYMBOL_SEARCH_TTL = CACHE_TTL["symbol_search"]                          # Yahoo 검색 결과 캐시 시간
+SYMBOL_SEARCH_PURGE_SEC = int(os.getenv("SYMBOL_SEARCH_PURGE_SEC", 3600))  # 만료된 검색 결과 삭제 주기
@@ -0,0 +1,159 @@
+"""
+watchlist 전체 기술적 지표 일괄 계산 — (날짜 × 종목) NumPy 행렬 1회 연산.
+
+종목마다 pandas 지표 계산을 따로 돌리면 GIL 때문에 스레드 풀이 CPU를 나눠 쓰지 못한다.
+종가·고가를 행렬로 모은 뒤 전 종목을 한 번에 계산한다:
+  MA20/60/120 (누적합 차분), RSI(14), MACD(12,26,9), ATH, 52주 고점, 낙폭
+RSI·EMA 같은 시간축 재귀는 행 단위 루프 1회이고, 각 행은 전 종목 벡터 연산.
+
+  - 종가 행렬은 열마다 그 종목의 실제 거래일 종가만 아래쪽으로 모은 것 (위쪽은 NaN, 계산에서 제외)
+    → 같은 묶음의 다른 종목 거래일(코인의 주말, 해외 종목의 다른 휴장일)이 지표에 섞이지 않음
+  - 고가 행렬은 날짜 합집합 기준 (ATH 날짜·52주 구간 = 종목 자기 이력)
+  - 결과는 종목별 src.indicators 증분 엔진 (pandas_ta 0.3.14b 식) 과 같다
+"""
+import numpy as np
+
+from src import compute_pool
+from src.indicators import CHART_DAYS, MA_WINDOWS, MACD_FAST, MACD_SIGNAL, MACD_SLOW, RSI_LENGTH
+
+
+def compute(histories: dict, prices: dict) -> dict:
+    """
+    histories: {ticker: 일봉 DataFrame (price_store.get_history 형식)}
+    prices:    {ticker: 현재가} — 낙폭 계산 기준
+
+    반환: {ticker: {"rsi", "macd_bullish", "ma_signal", "ma_series",
+                    "ath", "ath_date", "high_52w", "ath_drawdown_pct", "high_52w_drawdown_pct"}}
+    계산은 compute_pool 프로세스에서 실행 (날짜·종가·고가 배열만 전달).
+    """
+    series = {
+        t: (h.index.values.astype("datetime64[D]"),
+            h["Close"].to_numpy(dtype=float), h["High"].to_numpy(dtype=float))
+        for t, h in histories.items() if not h.empty
+    }
+    if not series:
+        return {}
+    return compute_pool.run(compute_arrays, series, prices)
+
+
+def compute_arrays(series: dict, prices: dict) -> dict:
+    """
+    series: {ticker: (날짜 datetime64[D], 종가, 고가)} — 종목별 1차원 배열
+    compute 와 같은 결과. compute_pool 작업 함수 (DataFrame 없이 배열만 사용).
+    """
+    tickers = list(series)
+    dates = np.unique(np.concatenate([d for d, _, _ in series.values()]))
+    high = np.full((len(dates), len(tickers)), np.nan)
+    listed = np.zeros((len(dates), len(tickers)), dtype=bool)    # 종목별 이력에 있는 날짜
+    closes = [c[~np.isnan(c)] for _, c, _ in series.values()]     # 종목별 종가 (indicators 와 같이 NaN 제외)
+    counts = np.array([len(c) for c in closes])
+    close = np.full((max(counts.max(), 1), len(tickers)), np.nan)
+    for j, ((d, _, h), c) in enumerate(zip(series.values(), closes)):
+        rows = np.searchsorted(dates, d)
+        high[rows, j] = h
+        listed[rows, j] = True
+        close[len(close) - len(c):, j] = c                      # 마지막 행 = 종목별 최신 종가
+
+    # ── 이동평균 ──
+    mas = {w: _rolling_mean(close, w) for w in MA_WINDOWS}
+    last_price = close[-1]
+    ma20, ma60 = mas[20][-1], mas[60][-1]
+    bullish = (last_price > ma20) & (ma20 > ma60)    # 황금 배열 (상승 추세)
+    bearish = (last_price < ma20) & (ma20 < ma60)    # 역배열 (하락 추세)
+
+    # ── RSI · MACD ──
+    rsi = _rsi_last(close, RSI_LENGTH)
+    macd = _ema(close, MACD_FAST) - _ema(close, MACD_SLOW)
+    signal = _ema(macd, MACD_SIGNAL)
+    macd_bullish = macd[-1] > signal[-1]             # NaN 비교는 False
+
+    # ── 고점 · 낙폭 ──
+    ath = np.nanmax(high, axis=0)
+    ath_idx = np.nanargmax(high, axis=0)
+    # 52주 = 종목별 이력 기준 최근 252봉 (상장 폐지·거래 중단 종목도 자기 이력 기준)
+    recent = listed & (np.cumsum(listed[::-1], axis=0)[::-1] <= CHART_DAYS)
+    high_52w = np.nanmax(np.where(recent, high, np.nan), axis=0)
+    price = np.array([prices.get(t) or np.nan for t in tickers], dtype=float)
+    price = np.where(np.isnan(price), last_price, price)
+    ath_dd = (price - ath) / ath * 100
+    high_dd = (price - high_52w) / high_52w * 100
+
+    result = {}
+    for j, ticker in enumerate(tickers):
+        own = slice(len(close) - counts[j], None)
+        result[ticker] = {
+            "rsi":          None if np.isnan(rsi[j]) else round(float(rsi[j]), 1),
+            "macd_bullish": bool(macd_bullish[j]),
+            "ma_signal":    "bullish" if bullish[j] else "bearish" if bearish[j] else "neutral",
+            "ma_series":    {f"ma{w}": _to_list(mas[w][own, j][-CHART_DAYS:]) for w in MA_WINDOWS},
+            "ath":                   round(float(ath[j]), 2),
+            "ath_date":              str(dates[ath_idx[j]]),
+            "high_52w":              round(float(high_52w[j]), 2),
+            "ath_drawdown_pct":      round(float(ath_dd[j]), 1),
+            "high_52w_drawdown_pct": round(float(high_dd[j]), 1),
+        }
+    return result
+
+
+def rsi(close: np.ndarray, length: int = RSI_LENGTH) -> float | None:
+    """종가 1차원 배열의 마지막 RSI. 데이터 부족 시 None (compute_pool 작업 함수)."""
+    value = _rsi_last(np.asarray(close, dtype=float).reshape(-1, 1), length)[0]
+    return None if np.isnan(value) else float(value)
+
+
+# ── 행렬 연산 ─────────────────────────────────
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """열별 단순 이동평균 (누적합 차분). 구간에 NaN이 있으면 NaN."""
+    valid = ~np.isnan(x)
+    zero = np.zeros((1, x.shape[1]))
+    csum = np.vstack([zero, np.cumsum(np.where(valid, x, 0.0), axis=0)])
+    ccnt = np.vstack([zero, np.cumsum(valid, axis=0)])
+    out = np.full(x.shape, np.nan)
+    if x.shape[0] >= window:
+        total = csum[window:] - csum[:-window]
+        count = ccnt[window:] - ccnt[:-window]
+        out[window - 1:] = np.where(count == window, total / window, np.nan)
+    return out
+
+
+def _ema(x: np.ndarray, length: int) -> np.ndarray:
+    """열별 EMA — 첫 length개 유효값의 단순평균으로 시작 (pandas_ta sma 시드)."""
+    alpha = 2.0 / (length + 1)
+    n = x.shape[1]
+    value = np.full(n, np.nan)
+    seed_sum = np.zeros(n)
+    seed_cnt = np.zeros(n)
+    out = np.empty(x.shape)
+    for i, row in enumerate(x):
+        ok = ~np.isnan(row)
+        seeded = ~np.isnan(value)
+        value = np.where(ok & seeded, alpha * row + (1 - alpha) * value, value)
+        seeding = ok & ~seeded
+        seed_sum += np.where(seeding, row, 0.0)
+        seed_cnt += seeding
+        value = np.where(seeding & (seed_cnt == length), seed_sum / length, value)
+        out[i] = value
+    return out
+
+
+def _rsi_last(close: np.ndarray, length: int) -> np.ndarray:
+    """열별 마지막 RSI — 상승·하락폭의 adjust=True ewm(alpha=1/length)."""
+    decay = 1.0 - 1.0 / length
+    n = close.shape[1]
+    gain = np.zeros(n)
+    loss = np.zeros(n)
+    count = np.zeros(n)
+    for d in np.diff(close, axis=0):
+        ok = ~np.isnan(d)
+        gain = np.where(ok, np.where(d > 0, d, 0.0) + decay * gain, gain)
+        loss = np.where(ok, np.where(d < 0, -d, 0.0) + decay * loss, loss)
+        count += ok
+    total = gain + loss
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rsi = 100.0 * gain / total
+    return np.where((count >= length) & (total > 0), rsi, np.nan)
+
+
+def _to_list(arr: np.ndarray, digits=2) -> list:
+    arr = arr.round(digits)
+    return np.where(np.isnan(arr), None, arr).tolist()
@@ -0,0 +1,240 @@
+"""
+추천 점수 일괄 계산 — 종목 특성 컬럼 표(종목 수 N) → 점수 배열, 종목 루프 없음.
+
+scoring.calc_recommendation_score 와 같은 규칙을 if/elif 대신 np.select 구간표로 계산한다.
+유니버스 스크리닝처럼 수천 종목을 한 번에 점수 매길 때 사용 (결과는 스칼라 함수와 동일).
+
+입력 표: {컬럼명: 길이 N 배열·리스트} 또는 pandas DataFrame. 컬럼명은 get_stock_data 키와 같다.
+  - 없는 컬럼은 전부 None 으로 간주 (ma_signal 만 "neutral")
+  - 숫자 컬럼의 None 은 NaN 으로 변환 → 구간 비교에서 모두 False (스칼라의 None 처리와 동일)
+  - DataFrame 의 NaN 은 키 누락으로 간주 (dict 리스트로 만든 DataFrame 과 원래 dict 의 결과가 같게)
+    · is_etf·fcf_positive 의 NaN → False, ma_signal 의 NaN → "neutral"
+      (pandas 문자열 컬럼은 None 도 NaN 으로 바꾸므로 ma_signal 의 None 은 누락과 구분되지 않음)
+    · NaN 때문에 float 로 바뀐 정수 컬럼은 이유 텍스트에 정수로 표기 ("Buy 70%")
+거시 지표(공포점수·금리차·M2)는 전 종목 공통 스칼라.
+"""
+import numpy as np
+
+from src import scoring
+
+def score_table(table, fear_score: int, yield_spread=None, m2_yoy=None,
+                m2_consecutive: int = 1) -> dict:
+    """
+    반환: {"total_score", "fear_score", "drawdown_score", "fundamental_score", "technical_score",
+           "recession_penalty", "m2_adjustment", "is_etf", "grade", "grade_color", "reason"}
+    각 값은 길이 N 배열. fundamental_score 는 ETF 행이 NaN (스칼라 함수의 None).
+    """
+    n = _length(table)
+    is_etf = _truthy(table, "is_etf", n)
+    dd = _num(table, "ath_drawdown_pct", n)
+
+    drawdown = np.where(is_etf, _etf_drawdown_score(dd), _drawdown_score(dd))
+    fundamental = _fundamental_score(table, n)
+    technical = _technical_score(table, n)
+
+    total = np.where(
+        is_etf,
+        np.round(fear_score * 0.35 + drawdown * 0.35 + technical * 0.30),
+        np.round(fear_score * 0.25 + drawdown * 0.30 + fundamental * 0.25 + technical * 0.20),
+    )
+    # 거시 지표 조정은 전 종목 공통
+    recession_penalty = scoring.calc_recession_penalty(yield_spread)
+    m2_adjustment = scoring.calc_m2_adjustment(m2_yoy, m2_consecutive)
+    total = np.clip(total - recession_penalty + m2_adjustment, 0, 100).astype(int)
+
+    # 등급 구간표는 스칼라 함수와 공용 (scoring.GRADES)
+    reached = [total >= min_score for min_score, _, _ in scoring.GRADES]
+    grade = np.select(reached, [label for _, label, _ in scoring.GRADES], scoring.GRADE_DEFAULT[0])
+    grade_color = np.select(reached, [color for _, _, color in scoring.GRADES], scoring.GRADE_DEFAULT[1])
+
+    return {
+        "total_score":       total,
+        "fear_score":        np.full(n, fear_score),
+        "drawdown_score":    drawdown,
+        "fundamental_score": np.where(is_etf, np.nan, fundamental),
+        "technical_score":   technical,
+        "recession_penalty": np.full(n, recession_penalty),
+        "m2_adjustment":     np.full(n, m2_adjustment),
+        "is_etf":            is_etf,
+        "grade":             grade,
+        "grade_color":       grade_color,
+        "reason":            _reasons(table, n, is_etf, fear_score, recession_penalty, m2_adjustment),
+    }
+
+
+def rows(result: dict) -> list[dict]:
+    """score_table 결과 → 종목별 dict 리스트 (calc_recommendation_score 반환 형식)."""
+    out = []
+    for i in range(len(result["total_score"])):
+        fundamental = result["fundamental_score"][i]
+        out.append({
+            "total_score":       int(result["total_score"][i]),
+            "fear_score":        int(result["fear_score"][i]),
+            "drawdown_score":    int(result["drawdown_score"][i]),
+            "fundamental_score": None if np.isnan(fundamental) else int(fundamental),
+            "technical_score":   int(result["technical_score"][i]),
+            "recession_penalty": int(result["recession_penalty"][i]),
+            "m2_adjustment":     int(result["m2_adjustment"][i]),
+            "is_etf":            bool(result["is_etf"][i]),
+            "grade":             str(result["grade"][i]),
+            "grade_color":       str(result["grade_color"][i]),
+            "reason":            str(result["reason"][i]),
+        })
+    return out
+
+
+# ── 하위 점수 (scoring.calc_* 와 같은 구간) ──────
+def _drawdown_score(dd: np.ndarray) -> np.ndarray:
+    d = np.abs(dd)
+    return np.select([d >= 50, d >= 30, d >= 20, d >= 10], [100, 75, 50, 25], 0)
+
+
+def _etf_drawdown_score(dd: np.ndarray) -> np.ndarray:
+    d = np.abs(dd)
+    return np.select([d >= 20, d >= 15, d >= 10, d >= 5], [100, 75, 50, 25], 0)
+
+
+def _technical_score(table, n: int) -> np.ndarray:
+    rsi = _num(table, "rsi", n)
+    rsi_pt = np.select([np.isnan(rsi), rsi <= 30, rsi <= 40, rsi <= 50, rsi > 70],
+                       [0, 40, 25, 10, 0], 5)
+    macd_pt = np.where(_is_true(table, "macd_bullish", n), 30, 0)
+    signal = _obj(table, "ma_signal", n, default="neutral")
+    ma_pt = np.select([signal == "bullish", signal == "neutral"], [30, 15], 0)
+    return np.minimum(rsi_pt + macd_pt + ma_pt, 100)
+
+
+def _fundamental_score(table, n: int) -> np.ndarray:
+    """ETF 행도 주식 규칙으로 계산된 값 (호출자가 ETF 행을 NaN 처리)."""
+    buy_ratio = _num(table, "buy_ratio_pct", n)
+    score = np.select([buy_ratio >= 70, buy_ratio >= 50], [30, 15], 0)
+
+    # 밸류에이션: PEG 우선, 없으면 Forward PE
+    peg = _num(table, "peg", n)
+    fpe = _num(table, "forward_pe", n)
+    peg_ok = peg > 0
+    fpe_ok = ~peg_ok & (fpe > 0)
+    score += np.select(
+        [peg_ok & (peg < 1), peg_ok & (peg <= 2), peg_ok,
+         fpe_ok & (fpe < 15), fpe_ok & (fpe < 20), fpe_ok & (fpe < 25)],
+        [30, 20, 5, 25, 20, 15], 0)
+
+    score += np.where(_truthy(table, "fcf_positive", n), 20, 0)
+
+    eps = _num(table, "eps_growth_pct", n)
+    score += np.select([eps > 15, eps > 10], [15, 10], 0)
+    score += np.where(_num(table, "revenue_growth_pct", n) > 10, 5, 0)
+
+    roe = _num(table, "roe", n)
+    score += np.select([roe > 20, roe > 15], [10, 5], 0)
+
+    # 재무 건전성 보너스/패널티
+    de = _num(table, "debt_to_equity", n)
+    cr = _num(table, "current_ratio", n)
+    health = np.select([de < 0.3, de > 5.0, de > 2.0], [5, -10, -5], 0)
+    health += np.select([cr > 2.0, cr < 1.0], [5, -5], 0)
+    return np.clip(score + health, 0, 100)
+
+
+def _reasons(table, n: int, is_etf: np.ndarray, fear_score: int,
+             recession_penalty: int, m2_adjustment: int) -> np.ndarray:
+    """추천 이유 텍스트 — 공통 조각(시장·거시)은 1번만 만들고 종목별 조각(ATH·Buy/3년수익)만 행마다 연결."""
+    head = []
+    if fear_score >= 60:
+        head.append("시장 공포 구간")
+    elif fear_score >= 40:
+        head.append("시장 불안 구간")
+
+    tail = []
+    if recession_penalty >= 25:
+        tail.append("⚠ 금리 심각 역전(-25)")
+    elif recession_penalty >= 15:
+        tail.append("⚠ 금리 역전(-15)")
+    elif recession_penalty >= 5:
+        tail.append("금리차 플랫(-5)")
+
+    if m2_adjustment >= 10:
+        tail.append("💧 M2 과잉 유동성(+10)")
+    elif m2_adjustment >= 5:
+        tail.append("💧 M2 유동성 풍부(+5)")
+    elif m2_adjustment <= -15:
+        tail.append("⚠ M2 심각 수축(-15)")
+    elif m2_adjustment <= -7:
+        tail.append("⚠ M2 수축(-7)")
+
+    ath = _labeled(table, "ath_drawdown_pct", n, "ATH %s%%")
+    ret = np.where(is_etf, _labeled(table, "three_year_return", n, "3년수익 %s%%"),
+                   _labeled(table, "buy_ratio_pct", n, "Buy %s%%"))
+    out = np.empty(n, dtype=object)
+    out[:] = [" + ".join(head + [p for p in row if p] + tail) or "-" for row in zip(ath, ret)]
+    return out
+
+
+# ── 컬럼 변환 ─────────────────────────────────
+def _length(table) -> int:
+    if hasattr(table, "columns"):
+        return len(table)
+    return len(next(iter(table.values()), []))
+
+
+def _obj(table, name: str, n: int, default=None) -> np.ndarray:
+    if name not in table:
+        return np.full(n, default, dtype=object)
+    col = np.asarray(table[name], dtype=object)
+    if default is not None and hasattr(table, "columns"):
+        missing = np.fromiter((_is_nan(v) for v in col), dtype=bool, count=n)
+        if missing.any():
+            col = col.copy()
+            col[missing] = default
+    return col
+
+
+def _num(table, name: str, n: int) -> np.ndarray:
+    """숫자 컬럼 (None → NaN)."""
+    return _obj(table, name, n).astype(float)
+
+
+def _truthy(table, name: str, n: int) -> np.ndarray:
+    """스칼라 함수의 `if value:` 와 같은 판정 (NaN 은 누락 값 → False)."""
+    col = np.asarray(table[name]) if name in table else np.zeros(n, dtype=bool)
+    if col.dtype == bool:
+        return col
+    if col.dtype.kind == "f":
+        return ~np.isnan(col) & (col != 0)
+    return np.fromiter((bool(v) and not _is_nan(v) for v in col), dtype=bool, count=n)
+
+
+def _is_true(table, name: str, n: int) -> np.ndarray:
+    """스칼라 함수의 `value is True` 와 같은 판정 (None·False·누락은 False)."""
+    col = np.asarray(table[name]) if name in table else np.zeros(n, dtype=bool)
+    if col.dtype == bool:
+        return col
+    return np.fromiter((v is True for v in col), dtype=bool, count=n)
+
+
+def _labeled(table, name: str, n: int, fmt: str) -> np.ndarray:
+    """값이 있는 행만 fmt % 값 (int·float 표기는 원래 값 그대로), 없으면 빈 문자열."""
+    col = _obj(table, name, n)
+    values = col.astype(float)
+    present = ~np.isnan(values)
+    out = np.full(n, "", dtype=object)
+    if present.any():
+        items = col[present]
+        if _upcast_int(table, name, present, values):
+            items = values[present].astype(np.int64)
+        out[present] = [fmt % v for v in items]
+    return out
+
+
+def _upcast_int(table, name: str, present: np.ndarray, values: np.ndarray) -> bool:
+    """DataFrame 에서 NaN 때문에 float 로 바뀐 정수 컬럼인지 (NaN 이 있고 나머지 값이 모두 정수)."""
+    if not hasattr(table, "columns") or name not in table or table[name].dtype.kind != "f":
+        return False
+    if present.all():
+        return False
+    kept = values[present]
+    return bool(np.all(kept == np.floor(kept)))
+
+
+def _is_nan(v) -> bool:
+    return isinstance(v, float) and v != v
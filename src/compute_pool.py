@@ -0,0 +1,139 @@
+"""
+CPU 연산 전용 프로세스 풀 — 지표·낙폭 계산을 요청 스레드(GIL)에서 분리.
+
+upstream 조회(I/O)는 지금처럼 스레드에서 하고, 계산만 별도 프로세스로 보낸다.
+동시 요청이 몰려도 지표 계산이 /watchlist 같은 가벼운 요청의 GIL을 붙잡지 않는다.
+
+  - 풀은 앱 시작 시 미리 띄워 두고 (start) 프로세스 수명 동안 재사용
+  - 작업 인자·결과는 NumPy 배열·float 리스트·dict 등 작은 값만 (DataFrame 피클링 X)
+  - 작업 함수는 모듈 최상위 함수여야 함 (자식 프로세스에서 import 해서 실행)
+  - COMPUTE_POOL_SIZE=0 이면 풀 없이 호출 스레드에서 바로 실행
+  - 자식 프로세스가 죽으면(BrokenProcessPool) 풀을 닫고 이후 작업은 모두 직접 실행
+    (다시 fork 하지 않음 — 이미 스레드가 돌고 있는 프로세스에서 fork 는 안전하지 않음)
+
+자식 프로세스는 fork 로 만들어 이미 로드된 모듈을 그대로 물려받는다 (spawn·forkserver 는
+__main__ 을 다시 import 하므로 python app.py / python -m src.warmer 에서 자식이 기동 중 죽음).
+fork 가 없는 플랫폼(Windows run.bat)은 풀 없이 직접 실행한다.
+start() 는 DB 연결·백그라운드 스레드가 생기기 전에 1번만 호출하고, 그 뒤에는 풀을 새로 만들지 않는다.
+작업 함수는 순수 계산만 하고 DB·캐시·잠금을 건드리지 않는다.
+"""
+import atexit
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import config
+
+log = logging.getLogger(__name__)
+
+_executor = None
+_broken = False             # BrokenProcessPool 이후 → 프로세스 수명 동안 직접 실행
+_lock = threading.Lock()
+_stats = {"tasks": 0, "inline": 0, "errors": 0, "total_ms": 0.0}
+
+
+def start():
+    """풀 생성 + 워커 프로세스 미리 기동 (첫 요청이 프로세스 생성·import 를 기다리지 않게)."""
+    global _executor
+    if config.COMPUTE_POOL_SIZE <= 0:
+        return
+    if "fork" not in multiprocessing.get_all_start_methods():
+        log.info("compute pool disabled: fork start method unavailable, computing inline")
+        return
+    with _lock:
+        if _executor is not None or _broken:
+            return
+        ctx = multiprocessing.get_context("fork")
+        _executor = ProcessPoolExecutor(max_workers=config.COMPUTE_POOL_SIZE, mp_context=ctx)
+        futures = [_executor.submit(_warm) for _ in range(config.COMPUTE_POOL_SIZE)]
+    for f in futures:
+        try:
+            f.result(timeout=config.COMPUTE_POOL_TIMEOUT_SEC)
+        except BrokenProcessPool as e:
+            _disable(e)
+            return
+        except Exception as e:
+            log.warning("compute pool warm-up failed: %s", e)
+
+
+def run(fn, *args):
+    """fn(*args) 를 풀에서 실행하고 결과 반환 (예외는 호출자에게 그대로 전달). 풀이 없으면 직접 실행."""
+    started = time.monotonic()
+    with _lock:
+        executor = _executor
+    future = None
+    if executor is not None:
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool as e:
+            _disable(e)
+        except RuntimeError:
+            pass            # 다른 스레드가 방금 풀을 닫음 (shutdown 이후 submit)
+    if future is None:
+        _count("inline")
+        return fn(*args)
+
+    try:
+        result = future.result(timeout=config.COMPUTE_POOL_TIMEOUT_SEC)
+    except BrokenProcessPool as e:
+        _disable(e)
+        _count("inline")
+        return fn(*args)
+    except Exception:
+        _count("errors")
+        raise
+    with _lock:
+        _stats["tasks"] += 1
+        _stats["total_ms"] += (time.monotonic() - started) * 1000
+    return result
+
+
+def stats() -> dict:
+    with _lock:
+        tasks = _stats["tasks"]
+        return {
+            "size":        config.COMPUTE_POOL_SIZE,
+            "running":     _executor is not None,
+            "broken":      _broken,
+            "tasks":       tasks,
+            "inline":      _stats["inline"],
+            "errors":      _stats["errors"],
+            "avg_ms":      round(_stats["total_ms"] / tasks, 2) if tasks else None,
+        }
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown)
+
+
+def _disable(error: Exception):
+    """풀이 깨지면 닫고 직접 실행으로 전환 (재생성하지 않음)."""
+    global _executor, _broken
+    with _lock:
+        executor, _executor = _executor, None
+        first, _broken = not _broken, True
+    if first:
+        log.warning("compute pool broken, computing inline from now on: %s", error)
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _count(field: str):
+    with _lock:
+        _stats[field] += 1
+
+
+def _warm():
+    # 계산 모듈 import (numpy·pandas 로딩) 를 기동 시점에 끝내 둔다
+    import src.batch_analytics  # noqa: F401
+    return True
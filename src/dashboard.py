@@ -0,0 +1,146 @@
+"""
+대시보드 스냅샷 — / 화면 값(시장심리 블록 + 점수순 watchlist)을 미리 계산해 둔 객체.
+
+index() 는 스냅샷을 읽기만 하고 계산은 백그라운드 스레드가 맡는다.
+그래서 화면 응답 시간이 watchlist 종목 수와 무관하다.
+백그라운드 스레드는 워커 프로세스마다 돌지만, 입력 확인·재생성은 DB 임대(dashboard)를 가진
+프로세스 1개만 한다. 나머지는 L2 스냅샷 갱신 시각만 확인해 바뀌었을 때 L1 으로 다시 읽는다.
+다시 만드는 경우 (임대 보유 프로세스):
+  - 입력 캐시(시장심리 6개 + 종목 레이어)의 L2 갱신 시각 또는 watchlist 종목 목록이 바뀜
+  - watchlist 추가·삭제, /api/refresh 직후 (request_rebuild — 요청을 받은 프로세스가 임대와 무관하게 1회)
+  - 마지막 생성 후 DASHBOARD_MAX_AGE_SEC 경과 (같은 초 안에 두 번 갱신된 경우 등 누락 대비)
+스냅샷은 캐시(dashboard 키)에 저장 → 재시작·새 워커도 첫 요청부터 바로 읽는다.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+
+import config
+from src import market_sentiment, scoring, singleflight, stock_analysis, taskgraph, watchlist
+from src.db import cache_get_entry, cache_get_raw, cache_set, cache_versions, lease_acquire
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "dashboard"
+_LEASE_KEY = "dashboard"
+_VERSION = 1
+_wake = threading.Event()
+_thread = None
+_seen = None                # 이 프로세스가 마지막으로 읽은 스냅샷의 L2 갱신 시각
+
+
+def get() -> dict:
+    """현재 스냅샷. 아직 없으면(최초 1회) 직접 생성."""
+    snapshot = cache_get_raw(SNAPSHOT_KEY)
+    if snapshot is None or snapshot.get("v") != _VERSION:
+        snapshot = singleflight.do(SNAPSHOT_KEY, build)
+    return snapshot
+
+
+def build() -> dict:
+    """입력 조회 → 공포점수 → 종목별 추천 점수 → 스냅샷 저장."""
+    tickers = watchlist.get_tickers()
+    # 계산 전에 기록 → 계산 도중 바뀐 입력은 다음 확인 때 다시 반영
+    fingerprint = _fingerprint(tickers)
+
+    results, timings = taskgraph.run("dashboard", {
+        "fear_greed":  (market_sentiment.get_fear_greed, []),
+        "vix":         (market_sentiment.get_vix, []),
+        "market_rsi":  (market_sentiment.get_market_rsi, []),
+        "cpi":         (market_sentiment.get_cpi, []),
+        "yield_curve": (market_sentiment.get_yield_curve, []),
+        "m2":          (market_sentiment.get_m2, []),
+        "fear_score":  (market_sentiment.calc_fear_score, ["fear_greed", "vix", "market_rsi"]),
+        "stock_data":  (lambda: stock_analysis.get_stock_data_many(tickers) if tickers else {}, []),
+        "stocks":      (lambda *args: _score_watchlist(tickers, *args),
+                        ["stock_data", "fear_score", "yield_curve", "m2"]),
+    })
+
+    snapshot = {
+        "v":           _VERSION,
+        "fear_greed":  results["fear_greed"],
+        "vix":         results["vix"],
+        "market_rsi":  results["market_rsi"],
+        "cpi":         results["cpi"],
+        "yield_curve": results["yield_curve"],
+        "m2":          results["m2"],
+        "fear_score":  results["fear_score"],
+        # 화면에서 쓰지 않는 차트 이력은 제외 (스냅샷 크기 축소)
+        "stocks":      [{k: v for k, v in s.items() if k != "price_history"} for s in results["stocks"]],
+        "fingerprint": fingerprint,
+        "built_at":    time.time(),
+        "build_ms":    round(sum(timings.values()), 1),
+    }
+    cache_set(SNAPSHOT_KEY, snapshot)
+    return snapshot
+
+
+def request_rebuild():
+    """입력 변경을 알림 → 백그라운드 스레드가 곧바로 다시 생성."""
+    _wake.set()
+
+
+def start():
+    """백그라운드 재생성 스레드 시작 (프로세스당 1회)."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _thread = threading.Thread(target=_run_forever, name="dashboard", daemon=True)
+    _thread.start()
+
+
+# ── 내부 ──────────────────────────────────────
+def _run_forever():
+    while True:
+        forced = _wake.wait(config.DASHBOARD_CHECK_SEC)
+        _wake.clear()
+        try:
+            if forced or (_is_leader() and _needs_rebuild(cache_get_raw(SNAPSHOT_KEY))):
+                singleflight.do(SNAPSHOT_KEY, build)
+            else:
+                _reload()
+        except Exception as e:
+            log.warning("dashboard rebuild failed: %s", e)
+
+
+def _is_leader() -> bool:
+    """재생성 임대 획득/연장. 다른 프로세스가 담당 중이면 False."""
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        return lease_acquire(_LEASE_KEY, owner, config.DASHBOARD_LEASE_SEC)
+    except Exception:
+        return False
+
+
+def _reload():
+    """다른 프로세스가 만든 스냅샷이 L2 에 있으면 L1 으로 다시 읽기 (갱신 시각이 바뀐 경우만)."""
+    global _seen
+    version = cache_versions([SNAPSHOT_KEY]).get(SNAPSHOT_KEY)
+    if version is not None and version != _seen:
+        cache_get_entry(SNAPSHOT_KEY, 0)    # TTL 0 → L2 확인, 더 최신이면 L1 교체
+        _seen = version
+
+
+def _needs_rebuild(snapshot: dict | None) -> bool:
+    if snapshot is None or snapshot.get("v") != _VERSION:
+        return True
+    if time.time() - snapshot["built_at"] > config.DASHBOARD_MAX_AGE_SEC:
+        return True
+    return snapshot["fingerprint"] != _fingerprint(watchlist.get_tickers())
+
+
+def _fingerprint(tickers: list[str]) -> dict:
+    """입력 상태 요약: watchlist 종목 + 입력 캐시 키별 L2 갱신 시각."""
+    keys = list(market_sentiment.CACHE_KEYS)
+    for ticker in tickers:
+        keys += [p for p in stock_analysis.cache_patterns(ticker) if not p.startswith("quote_")]
+    return {"tickers": tickers, "versions": cache_versions(keys)}
+
+
+def _score_watchlist(tickers, stock_data, fear_score, yield_curve, m2) -> list:
+    if not tickers:
+        return []
+    return stock_analysis.enrich_watchlist(tickers, fear_score, stock_data=stock_data,
+                                           **scoring.macro_inputs(yield_curve, m2))
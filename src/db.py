@@ -3,21 +3,34 @@
 
 DATABASE_URL 환경변수가 있으면 PostgreSQL(운영),
 없으면 SQLite(로컬 개발) 자동 선택.
+연결은 풀에서 빌려 쓰고 반납한다 (get_conn / put_conn).
 
 캐시 2계층:
   L1 - 프로세스 메모리 (ns 접근, 서버 재시작 시 초기화)
   L2 - DB (SQLite 또는 PostgreSQL, 재시작 후에도 유지)
+       쓰기는 단일 write-behind 워커가 큐를 모아 배치 upsert
 """
+import atexit
 import json
+import logging
 import os
+import queue
 import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 import config
 
+log = logging.getLogger(__name__)
+
 # ── L1 인메모리 캐시 (네트워크 왕복 없이 즉시 반환) ──
-_mem: dict = {}          # {key: {"data": ..., "ts": datetime}}
+# LRU 순서 유지 (맨 뒤 = 최근 사용). 항목 수·바이트 한도 초과 시 앞에서부터 제거.
+_mem: OrderedDict = OrderedDict()   # {key: {"data": ..., "ts": datetime, "size": int}}
 _mem_lock = threading.Lock()
+_mem_bytes = 0                      # 항목 크기 합계 (JSON 직렬화 길이 기준 근사치)
+_mem_last_sweep = 0.0
+_mem_stats: dict = {}               # {family: {"hits", "misses", "evictions", "expired"}}
 
 # ── 드라이버 선택 ──────────────────────────────
 DATABASE_URL = os.getenv("DATABASE_URL", "")
@@ -25,29 +38,160 @@ USE_PG = bool(DATABASE_URL)
 
 if USE_PG:
     import psycopg2
+    import psycopg2.extensions
     import psycopg2.extras
+    import psycopg2.pool
     PH = "%s"   # PostgreSQL 플레이스홀더
 else:
     import sqlite3
     PH = "?"    # SQLite 플레이스홀더
 
 
+# ── 연결 풀 ────────────────────────────────────
+# PostgreSQL: 프로세스당 ThreadedConnectionPool 1개 (TCP+인증 핸드셰이크 재사용)
+# SQLite:     스레드별 영구 연결 1개 (WAL 모드 → 읽기와 쓰기가 서로 막지 않음)
+# gunicorn fork 이후 부모의 소켓을 공유하지 않도록 PID가 바뀌면 새로 생성한다.
+_pool = None
+_pool_pid = None
+_pool_slots = None               # maxconn 초과 시 PoolError 대신 대기하기 위한 세마포어
+_pool_lock = threading.Lock()
+_last_used: dict = {}            # PostgreSQL {id(conn): 마지막 반납 시각} — 유휴 연결 헬스체크용, 폐기 시 제거
+_local = threading.local()       # SQLite 스레드별 연결 (conn, pid, last: 마지막 반납 시각)
+
+
+def _pg_pool():
+    global _pool, _pool_pid, _pool_slots
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = psycopg2.pool.ThreadedConnectionPool(
+                    config.DB_POOL_MIN,
+                    config.DB_POOL_MAX,
+                    DATABASE_URL,
+                    cursor_factory=psycopg2.extras.RealDictCursor,  # dict 형식 행 반환
+                )
+                _pool_slots = threading.BoundedSemaphore(config.DB_POOL_MAX)
+                _pool_pid = pid
+                _last_used.clear()
+    return _pool
+
+
+def _is_alive(conn, last: float | None) -> bool:
+    """유휴 시간이 DB_POOL_PING_SEC 를 넘은 연결만 SELECT 1 로 확인 (매 요청 왕복 방지). last = 마지막 반납 시각."""
+    if last is None or time.monotonic() - last < config.DB_POOL_PING_SEC:
+        return True   # 방금 만든 연결이거나 최근 사용된 연결
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+        cur.fetchone()
+        if USE_PG:
+            conn.rollback()   # ping 트랜잭션 종료 (idle in transaction 방지)
+        return True
+    except Exception:
+        return False
+
+
+def _sqlite_connect():
+    os.makedirs(os.path.dirname(config.DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(config.DB_PATH, timeout=config.DB_SQLITE_BUSY_TIMEOUT)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")      # 쓰기 중에도 읽기 가능
+    conn.execute("PRAGMA synchronous=NORMAL")    # WAL에서 안전한 수준, fsync 횟수 감소
+    return conn
+
+
 # ── 연결 ──────────────────────────────────────
 def get_conn():
+    """풀에서 연결을 빌려온다. 사용 후 반드시 put_conn()으로 반납."""
     if USE_PG:
-        # PostgreSQL: RealDictCursor로 dict 형식 행 반환
-        conn = psycopg2.connect(DATABASE_URL)
-        conn.cursor_factory = psycopg2.extras.RealDictCursor
-        return conn
+        pool = _pg_pool()
+        if not _pool_slots.acquire(timeout=config.DB_POOL_WAIT_SEC):
+            raise psycopg2.pool.PoolError("DB 연결 풀 대기 시간 초과")
+        try:
+            # 끊긴 연결(DB 재시작·네트워크 단절)은 폐기하고 다음 연결 시도 → 결국 새로 연결
+            for _attempt in range(config.DB_POOL_MAX):
+                conn = pool.getconn()
+                if not conn.closed and _is_alive(conn, _last_used.get(id(conn))):
+                    return conn
+                _last_used.pop(id(conn), None)
+                pool.putconn(conn, close=True)
+            return pool.getconn()
+        except Exception:
+            _pool_slots.release()
+            raise
     else:
-        # SQLite: 로컬 파일 DB
-        os.makedirs(os.path.dirname(config.DB_PATH), exist_ok=True)
-        conn = sqlite3.connect(config.DB_PATH)
-        conn.row_factory = sqlite3.Row
+        # SQLite: 스레드별 연결 재사용 (fork 이후엔 새로 연결)
+        # 반납 시각도 스레드 로컬에 둠 → 스레드가 끝나면 연결과 함께 사라짐
+        conn = getattr(_local, "conn", None)
+        if conn is not None and (_local.pid != os.getpid() or not _is_alive(conn, _local.last)):
+            try:
+                conn.close()
+            except Exception:
+                pass
+            conn = None
+        if conn is None:
+            conn = _sqlite_connect()
+            _local.conn = conn
+            _local.pid = os.getpid()
+            _local.last = None
         return conn
 
 
+def put_conn(conn):
+    """get_conn()으로 빌린 연결 반납. 커밋되지 않은 트랜잭션은 롤백."""
+    if USE_PG:
+        close = bool(conn.closed)
+        if not close and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except Exception:
+                close = True   # 롤백도 실패하면 손상된 연결로 보고 폐기
+        _last_used[id(conn)] = time.monotonic()
+        try:
+            _pg_pool().putconn(conn, close=close)
+        finally:
+            # 풀이 닫은 연결 (손상·DB_POOL_MIN 초과분) 은 헬스체크 기록도 제거
+            if conn.closed:
+                _last_used.pop(id(conn), None)
+            _pool_slots.release()
+    else:
+        if conn.in_transaction:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+        if getattr(_local, "conn", None) is conn:
+            _local.last = time.monotonic()
+
+
+def close_pool():
+    """프로세스 종료 시 풀의 모든 연결 정리."""
+    if USE_PG:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+            _last_used.clear()
+    else:
+        conn = getattr(_local, "conn", None)
+        if conn is not None:
+            conn.close()
+            _local.conn = None
+
+
+atexit.register(close_pool)
+
+
 # ── 테이블 초기화 ──────────────────────────────
+# 스크리너 정렬·필터 컬럼 인덱스 (/screener 화면은 인덱스 범위 조회만 하도록)
+_SCREENER_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_screener_score ON screener (total_score DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_screener_sector ON screener (sector, total_score DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_screener_grade ON screener (grade, total_score DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_screener_drawdown ON screener (ath_drawdown_pct)",
+    "CREATE INDEX IF NOT EXISTS idx_screener_fetched ON screener (fetched_at)",
+]
+
+
 def init_db():
     conn = get_conn()
     try:
@@ -70,6 +214,74 @@ def init_db():
                     updated_at  TIMESTAMP DEFAULT NOW()
                 )
             """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS cache_lease (
+                    key         TEXT PRIMARY KEY,
+                    owner       TEXT NOT NULL,
+                    expires_at  DOUBLE PRECISION NOT NULL
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS cache_invalidation (
+                    id          BIGSERIAL PRIMARY KEY,
+                    pattern     TEXT NOT NULL,
+                    created_at  DOUBLE PRECISION NOT NULL
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS price_bars (
+                    ticker      TEXT NOT NULL,
+                    date        DATE NOT NULL,
+                    open        DOUBLE PRECISION,
+                    high        DOUBLE PRECISION,
+                    low         DOUBLE PRECISION,
+                    close       DOUBLE PRECISION,
+                    volume      BIGINT,
+                    PRIMARY KEY (ticker, date)
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS fred_observations (
+                    series_id   TEXT NOT NULL,
+                    date        DATE NOT NULL,
+                    value       DOUBLE PRECISION NOT NULL,
+                    PRIMARY KEY (series_id, date)
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS screener (
+                    ticker              TEXT PRIMARY KEY,
+                    name                TEXT,
+                    sector              TEXT DEFAULT '',
+                    is_etf              INTEGER,
+                    current_price       DOUBLE PRECISION,
+                    ath_drawdown_pct    DOUBLE PRECISION,
+                    rsi                 DOUBLE PRECISION,
+                    macd_bullish        INTEGER,
+                    ma_signal           TEXT,
+                    buy_ratio_pct       DOUBLE PRECISION,
+                    peg                 DOUBLE PRECISION,
+                    forward_pe          DOUBLE PRECISION,
+                    fcf_positive        INTEGER,
+                    eps_growth_pct      DOUBLE PRECISION,
+                    revenue_growth_pct  DOUBLE PRECISION,
+                    roe                 DOUBLE PRECISION,
+                    debt_to_equity      DOUBLE PRECISION,
+                    current_ratio       DOUBLE PRECISION,
+                    three_year_return   DOUBLE PRECISION,
+                    total_score         INTEGER,
+                    drawdown_score      INTEGER,
+                    fundamental_score   INTEGER,
+                    technical_score     INTEGER,
+                    grade               TEXT,
+                    grade_color         TEXT,
+                    reason              TEXT,
+                    error               TEXT,
+                    fetched_at          DOUBLE PRECISION
+                )
+            """)
+            for ddl in _SCREENER_INDEXES:
+                cur.execute(ddl)
         else:
             cur.executescript("""
                 CREATE TABLE IF NOT EXISTS watchlist (
@@ -85,21 +297,192 @@ def init_db():
                     data        TEXT NOT NULL,
                     updated_at  TEXT DEFAULT (datetime('now'))
                 );
+                CREATE TABLE IF NOT EXISTS cache_lease (
+                    key         TEXT PRIMARY KEY,
+                    owner       TEXT NOT NULL,
+                    expires_at  REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS cache_invalidation (
+                    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                    pattern     TEXT NOT NULL,
+                    created_at  REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS price_bars (
+                    ticker      TEXT NOT NULL,
+                    date        TEXT NOT NULL,
+                    open        REAL,
+                    high        REAL,
+                    low         REAL,
+                    close       REAL,
+                    volume      INTEGER,
+                    PRIMARY KEY (ticker, date)
+                );
+                CREATE TABLE IF NOT EXISTS fred_observations (
+                    series_id   TEXT NOT NULL,
+                    date        TEXT NOT NULL,
+                    value       REAL NOT NULL,
+                    PRIMARY KEY (series_id, date)
+                );
+                CREATE TABLE IF NOT EXISTS screener (
+                    ticker              TEXT PRIMARY KEY,
+                    name                TEXT,
+                    sector              TEXT DEFAULT '',
+                    is_etf              INTEGER,
+                    current_price       REAL,
+                    ath_drawdown_pct    REAL,
+                    rsi                 REAL,
+                    macd_bullish        INTEGER,
+                    ma_signal           TEXT,
+                    buy_ratio_pct       REAL,
+                    peg                 REAL,
+                    forward_pe          REAL,
+                    fcf_positive        INTEGER,
+                    eps_growth_pct      REAL,
+                    revenue_growth_pct  REAL,
+                    roe                 REAL,
+                    debt_to_equity      REAL,
+                    current_ratio       REAL,
+                    three_year_return   REAL,
+                    total_score         INTEGER,
+                    drawdown_score      INTEGER,
+                    fundamental_score   INTEGER,
+                    technical_score     INTEGER,
+                    grade               TEXT,
+                    grade_color         TEXT,
+                    reason              TEXT,
+                    error               TEXT,
+                    fetched_at          REAL
+                );
             """)
+            for ddl in _SCREENER_INDEXES:
+                cur.execute(ddl)
         conn.commit()
     finally:
-        conn.close()
+        put_conn(conn)
+
+
+# ── L1 관리 (LRU + TTL 만료) ───────────────────
+# 키 패밀리: "technical_AAPL" → "technical". 패밀리별 TTL(+stale 허용)로 만료 항목을 주기적으로 제거하고
+# 적중/실패/제거 횟수를 집계한다. 접두어가 긴 것부터 검사.
+# 단일 키("vix" 등 CACHE_TTL 에 있는 키)는 키 자체가 패밀리, 나머지는 모두 "other"
+# → 패밀리 수가 키 수만큼 늘어나지 않음
+_FAMILY_PREFIXES = ("profile_", "fundamentals_", "analyst_", "technical_", "quote_", "price_",
+                    "symbol_search_", "ind_")
+_FAMILY_TTL_KEY = {"quote": "price"}   # CACHE_TTL 키가 패밀리명과 다른 경우
+
+
+def _key_family(key: str) -> str:
+    for prefix in _FAMILY_PREFIXES:
+        if key.startswith(prefix):
+            return prefix[:-1]
+    return key if key in config.CACHE_TTL else "other"
+
+
+def _family_expiry(family: str) -> int | None:
+    """L1 보관 한도 = TTL + stale 허용 시간 (stale-while-revalidate 로 계속 서빙)."""
+    ttl_key = _FAMILY_TTL_KEY.get(family, family)
+    ttl = config.CACHE_TTL.get(ttl_key)
+    if ttl is None:
+        return None
+    return ttl + config.CACHE_MAX_STALE.get(ttl_key, 0)
+
+
+def _mem_count(key: str, field: str, n: int = 1):
+    family = _key_family(key)
+    with _mem_lock:
+        stats = _mem_stats.get(family)
+        if stats is None:
+            stats = _mem_stats[family] = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+        stats[field] += n
+
+
+def _mem_lookup(key: str) -> dict | None:
+    """L1 조회 + LRU 순서 갱신."""
+    with _mem_lock:
+        entry = _mem.get(key)
+        if entry is not None:
+            _mem.move_to_end(key)
+    return entry
+
+
+def _mem_put(key: str, data, ts: datetime, size: int):
+    """L1 저장. 예산(항목 수·바이트) 초과 시 LRU 제거, 주기적으로 만료 항목 정리."""
+    global _mem_bytes
+    evicted = []
+    with _mem_lock:
+        old = _mem.pop(key, None)
+        if old is not None:
+            _mem_bytes -= old["size"]
+        _mem[key] = {"data": data, "ts": ts, "size": size}
+        _mem_bytes += size
+        while len(_mem) > 1 and (len(_mem) > config.L1_MAX_ENTRIES
+                                 or _mem_bytes > config.L1_MAX_BYTES):
+            old_key, old = _mem.popitem(last=False)
+            _mem_bytes -= old["size"]
+            evicted.append(old_key)
+    for old_key in evicted:
+        _mem_count(old_key, "evictions")
+    _mem_sweep()
+
+
+def _mem_sweep(force: bool = False):
+    """보관 한도가 지난 L1 항목 제거 (L1_SWEEP_SEC 마다 1회). L2에는 남아 있어 fallback 가능."""
+    global _mem_bytes, _mem_last_sweep
+    if not force and time.monotonic() - _mem_last_sweep < config.L1_SWEEP_SEC:
+        return
+    now = datetime.utcnow()
+    expired = []
+    with _mem_lock:
+        _mem_last_sweep = time.monotonic()
+        for key, entry in list(_mem.items()):
+            expiry = _family_expiry(_key_family(key))
+            if expiry is not None and now - entry["ts"] > timedelta(seconds=expiry):
+                del _mem[key]
+                _mem_bytes -= entry["size"]
+                expired.append(key)
+    for key in expired:
+        _mem_count(key, "expired")
+
+
+def cache_stats() -> dict:
+    """L1 사용량 + 키 패밀리별 적중/실패/제거 횟수."""
+    with _mem_lock:
+        return {
+            "entries":     len(_mem),
+            "bytes":       _mem_bytes,
+            "max_entries": config.L1_MAX_ENTRIES,
+            "max_bytes":   config.L1_MAX_BYTES,
+            "families":    {f: dict(v) for f, v in _mem_stats.items()},
+        }
 
 
 # ── 캐시 조회 ──────────────────────────────────
 def cache_get(key: str, ttl_seconds: int) -> dict | None:
     """캐시에서 데이터 조회. L1(메모리) → L2(DB) 순으로 확인. TTL 초과 시 None."""
+    entry = cache_get_entry(key, ttl_seconds)
+    if entry is None or not entry["fresh"]:
+        return None
+    return entry["data"]
+
+
+def cache_get_entry(key: str, ttl_seconds: int) -> dict | None:
+    """
+    TTL과 무관하게 캐시 값과 나이를 함께 반환 (stale-while-revalidate 용).
+
+    반환: {"data": ..., "age": 경과 초, "fresh": age < ttl} / 캐시 없으면 None
+    L1이 TTL 안이면 즉시 반환, 아니면 L2 확인 (다른 워커가 먼저 갱신했을 수 있음).
+    """
+    _sync_invalidations()
+    now = datetime.utcnow()
+
     # L1: 메모리 캐시 우선 확인 (네트워크 왕복 없음)
-    with _mem_lock:
-        entry = _mem.get(key)
+    entry = _mem_lookup(key)
     if entry:
-        if datetime.utcnow() - entry["ts"] < timedelta(seconds=ttl_seconds):
-            return entry["data"]
+        age = (now - entry["ts"]).total_seconds()
+        if age < ttl_seconds:
+            _mem_count(key, "hits")
+            return {"data": entry["data"], "age": age, "fresh": True}
+    _mem_count(key, "misses")
 
     # L2: DB 조회
     conn = get_conn()
@@ -110,73 +493,198 @@ def cache_get(key: str, ttl_seconds: int) -> dict | None:
         )
         row = cur.fetchone()
     finally:
-        conn.close()
+        put_conn(conn)
 
-    if row is None:
-        return None
+    if row is not None:
+        updated = row["updated_at"]
+        # SQLite는 문자열 반환, PostgreSQL은 datetime 반환
+        if isinstance(updated, str):
+            updated = datetime.fromisoformat(updated)
+        updated = updated.replace(tzinfo=None)
+        # L1 값이 더 최신이면 (L2 쓰기 대기 중) L1 유지
+        if entry is None or updated > entry["ts"]:
+            data = json.loads(row["data"])
+            # L1 캐시에 저장 (다음 요청은 메모리에서 즉시 반환)
+            _mem_put(key, data, updated, len(row["data"]))
+            age = (now - updated).total_seconds()
+            return {"data": data, "age": age, "fresh": age < ttl_seconds}
 
-    updated = row["updated_at"]
-    # SQLite는 문자열 반환, PostgreSQL은 datetime 반환
-    if isinstance(updated, str):
-        updated = datetime.fromisoformat(updated)
-    if datetime.utcnow() - updated.replace(tzinfo=None) > timedelta(seconds=ttl_seconds):
-        return None
+    if entry:
+        return {"data": entry["data"], "age": (now - entry["ts"]).total_seconds(), "fresh": False}
+    return None
 
-    data = json.loads(row["data"])
-    # L1 캐시에 저장 (다음 요청은 메모리에서 즉시 반환)
-    with _mem_lock:
-        _mem[key] = {"data": data, "ts": updated.replace(tzinfo=None)}
-    return data
+
+# ── L2 쓰기 큐 (write-behind) ──────────────────
+# cache_set 은 L1만 즉시 갱신하고 L2 쓰기는 큐에 넣는다.
+# 프로세스당 워커 스레드 1개가 큐를 모아 한 트랜잭션의 multi-row upsert로 기록.
+# 같은 키가 배치 안에 여러 번 있으면 마지막 값만 기록 (중간 값은 superseded).
+_STOP = object()
+_write_q: queue.Queue = queue.Queue(maxsize=config.CACHE_WRITE_QUEUE_MAX)
+_writer = None
+_writer_lock = threading.Lock()
+_write_stats = {
+    "written":        0,      # DB에 기록된 행 수
+    "batches":        0,      # 커밋된 트랜잭션 수
+    "superseded":     0,      # 같은 배치 내 최신 값으로 대체되어 생략된 쓰기
+    "dropped":        0,      # 큐가 가득 차 버려진 쓰기 (L1에는 반영됨)
+    "errors":         0,
+    "last_error":     None,
+    "batch_ms_last":  None,   # 마지막 배치 트랜잭션 소요 시간
+    "batch_ms_avg":   None,   # 배치 소요 시간 지수이동평균
+    "lag_ms_last":    None,   # 마지막 배치의 가장 오래된 항목: 큐 투입 → 커밋까지
+}
+_write_stats_lock = threading.Lock()
+
+
+def _ensure_writer():
+    """워커 스레드 지연 시작 (gunicorn fork 이후 각 워커 프로세스에서 1개)."""
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_writer_loop, name="cache-writer", daemon=True)
+            _writer.start()
+
+
+def _writer_loop():
+    stop = False
+    while not stop:
+        item = _write_q.get()
+        if item is _STOP:
+            stop = True
+            batch = {}
+        else:
+            batch = {item[0]: item[1:]}
+
+        # 첫 항목 이후 LINGER 동안 (또는 종료 시 큐가 빌 때까지) 추가 항목 수집
+        deadline = time.monotonic() + config.CACHE_WRITE_LINGER_SEC
+        while len(batch) < config.CACHE_WRITE_BATCH_MAX:
+            try:
+                if stop:
+                    item = _write_q.get_nowait()
+                else:
+                    item = _write_q.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                continue
+            if item[0] in batch:
+                with _write_stats_lock:
+                    _write_stats["superseded"] += 1
+            batch[item[0]] = item[1:]
+
+        if batch:
+            _write_batch(batch)
+
+
+def _write_batch(batch: dict):
+    """{key: (serialized, updated_at, enqueued_at)} → 한 트랜잭션 upsert."""
+    started = time.monotonic()
+    oldest = min(v[2] for v in batch.values())
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor()
+        if USE_PG:
+            psycopg2.extras.execute_values(
+                cur,
+                """INSERT INTO cache (key, data, updated_at) VALUES %s
+                   ON CONFLICT (key) DO UPDATE SET
+                       data = EXCLUDED.data,
+                       updated_at = EXCLUDED.updated_at""",
+                [(k, v[0], v[1]) for k, v in batch.items()],
+                page_size=len(batch),
+            )
+        else:
+            values = ", ".join(["(?, ?, ?)"] * len(batch))
+            params = []
+            for k, v in batch.items():
+                params += [k, v[0], v[1].strftime("%Y-%m-%d %H:%M:%S")]
+            cur.execute(
+                f"""INSERT INTO cache (key, data, updated_at) VALUES {values}
+                    ON CONFLICT(key) DO UPDATE SET
+                        data = excluded.data,
+                        updated_at = excluded.updated_at""",
+                params,
+            )
+        conn.commit()
+    except Exception as e:
+        log.warning("cache write failed (%d keys): %s", len(batch), e)
+        with _write_stats_lock:
+            _write_stats["errors"] += 1
+            _write_stats["last_error"] = str(e)
+        return
+    finally:
+        if conn is not None:
+            put_conn(conn)
+
+    done = time.monotonic()
+    batch_ms = round((done - started) * 1000, 1)
+    with _write_stats_lock:
+        _write_stats["written"] += len(batch)
+        _write_stats["batches"] += 1
+        _write_stats["batch_ms_last"] = batch_ms
+        prev = _write_stats["batch_ms_avg"]
+        _write_stats["batch_ms_avg"] = batch_ms if prev is None else round(prev * 0.9 + batch_ms * 0.1, 1)
+        _write_stats["lag_ms_last"] = round((done - oldest) * 1000, 1)
+
+
+def flush_cache_writes(timeout: float = 5.0):
+    """대기 중인 L2 쓰기를 모두 기록하고 워커 종료 (프로세스 종료 시 자동 호출)."""
+    global _writer
+    writer = _writer
+    if writer is None or not writer.is_alive():
+        return
+    try:
+        _write_q.put(_STOP, timeout=timeout)
+    except queue.Full:
+        return
+    writer.join(timeout)
+    _writer = None
+
+
+atexit.register(flush_cache_writes)   # close_pool 보다 먼저 실행됨 (atexit는 역순)
+
+
+def cache_write_stats() -> dict:
+    """write-behind 큐 상태: 대기 깊이, 처리량, 지연 시간."""
+    with _write_stats_lock:
+        stats = dict(_write_stats)
+    stats["queue_depth"] = _write_q.qsize()
+    stats["queue_max"] = config.CACHE_WRITE_QUEUE_MAX
+    return stats
 
 
 # ── 캐시 저장 ──────────────────────────────────
 def cache_set(key: str, data: dict):
-    """캐시에 데이터 저장 (L1 메모리 + L2 DB upsert)."""
+    """캐시에 데이터 저장 (L1 메모리 즉시 + L2 DB write-behind 큐)."""
     now = datetime.utcnow()
 
-    # L1: 메모리 즉시 업데이트
-    with _mem_lock:
-        _mem[key] = {"data": data, "ts": now}
-
-    # L2: DB 비동기 저장 (별도 스레드 — 응답 지연 없음)
-    def _write_db():
-        conn = get_conn()
-        try:
-            cur = conn.cursor()
-            serialized = json.dumps(data, ensure_ascii=False, default=str)
-            if USE_PG:
-                cur.execute(
-                    """INSERT INTO cache (key, data, updated_at)
-                       VALUES (%s, %s, NOW())
-                       ON CONFLICT (key) DO UPDATE SET
-                           data = EXCLUDED.data,
-                           updated_at = EXCLUDED.updated_at""",
-                    (key, serialized),
-                )
-            else:
-                cur.execute(
-                    """INSERT INTO cache (key, data, updated_at)
-                       VALUES (?, ?, datetime('now'))
-                       ON CONFLICT(key) DO UPDATE SET
-                           data = excluded.data,
-                           updated_at = excluded.updated_at""",
-                    (key, serialized),
-                )
-            conn.commit()
-        except Exception:
-            pass
-        finally:
-            conn.close()
+    # L2: 직렬화만 호출 스레드에서 하고 DB 기록은 워커에 위임 (응답 지연 없음)
+    serialized = json.dumps(data, ensure_ascii=False, default=str)
 
-    threading.Thread(target=_write_db, daemon=True).start()
+    # L1: 메모리 즉시 업데이트 (직렬화 길이를 크기 예산 계산에 사용)
+    _mem_put(key, data, now, len(serialized))
+    _ensure_writer()
+    try:
+        _write_q.put((key, serialized, now, time.monotonic()),
+                     timeout=config.CACHE_WRITE_ENQUEUE_WAIT)
+    except queue.Full:
+        # 백로그 한도 초과: L2 쓰기만 포기 (L1에는 이미 반영됨)
+        with _write_stats_lock:
+            _write_stats["dropped"] += 1
 
 
 # ── 캐시 전체 삭제 ─────────────────────────────
 def cache_clear():
-    """L1 메모리 캐시 + L2 DB 캐시 전체 삭제. 수동 갱신 시 사용."""
+    """L1(현재 프로세스) + L2 DB 캐시 전체 삭제 (초기화용). 수동 갱신은 cache_invalidate 사용."""
     # L1 메모리 캐시 삭제
+    global _mem_bytes
     with _mem_lock:
         _mem.clear()
+        _mem_bytes = 0
 
     # L2 DB 캐시 삭제 (SQLite·PostgreSQL 모두 호환, 연결 명시적 종료)
     conn = get_conn()
@@ -185,14 +693,146 @@ def cache_clear():
         cur.execute("DELETE FROM cache")
         conn.commit()
     finally:
-        conn.close()
+        put_conn(conn)
+
+
+def cache_purge(prefix: str, max_age_sec: int) -> int:
+    """접두어 키 중 max_age_sec 보다 오래된 항목 삭제 (L1 + L2). 검색어별 키처럼 계속 늘어나는 키 정리용."""
+    global _mem_bytes
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_sec)
+    with _mem_lock:
+        for key in [k for k, v in _mem.items() if k.startswith(prefix) and v["ts"] < cutoff]:
+            _mem_bytes -= _mem.pop(key)["size"]
+
+    # LIKE 의 "_"·"%" 는 와일드카드 → 이스케이프
+    like = prefix.replace("\\", "\\\\").replace("_", "\\_").replace("%", "\\%") + "%"
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"DELETE FROM cache WHERE key LIKE {PH} ESCAPE '\\' AND updated_at < {PH}",
+            (like, cutoff if USE_PG else cutoff.strftime("%Y-%m-%d %H:%M:%S")),
+        )
+        deleted = cur.rowcount
+        conn.commit()
+    finally:
+        put_conn(conn)
+    return deleted
+
+
+# ── 선택 무효화 + 워커 간 L1 동기화 ─────────────
+# 무효화는 L2 값을 지우지 않고 updated_at 을 TTL 이전으로 당겨 '만료됨'으로 표시한다.
+# → 다음 요청은 기존 값을 stale-while-revalidate 로 받고 갱신은 키별 1회 (한꺼번에 재조회 X)
+# 다른 워커의 L1은 cache_invalidation 로그를 주기적으로 읽어 해당 항목을 제거한다.
+_INVALIDATION_RETENTION_SEC = 86400   # 무효화 로그 보관 기간
+_inval_last_id = None                 # 이 프로세스가 반영한 마지막 로그 id (None = 미초기화)
+_inval_last_poll = 0.0
+_inval_lock = threading.Lock()
+
+
+def cache_invalidate(patterns: list[str]) -> int:
+    """
+    패턴에 맞는 캐시를 만료 표시 + 모든 워커의 L1에서 제거. 대상 L2 행 수 반환.
+    패턴: 정확한 키("vix"), 접두어("technical_*"), 전체("*")
+    """
+    now = datetime.utcnow()
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        updates = []
+        for pattern in patterns:
+            if pattern.endswith("*"):
+                # LIKE의 "_"는 임의 문자와도 맞으므로 결과를 _pattern_match 로 다시 거른다
+                cur.execute(f"SELECT key FROM cache WHERE key LIKE {PH}", (pattern[:-1] + "%",))
+            else:
+                cur.execute(f"SELECT key FROM cache WHERE key = {PH}", (pattern,))
+            for row in cur.fetchall():
+                key = row["key"]
+                ttl = _family_ttl(key)
+                if ttl is None or not _pattern_match(key, pattern):
+                    continue   # TTL 없는 내부 상태(지표 엔진 등)는 유지
+                stale_at = now - timedelta(seconds=ttl + 1)
+                if not USE_PG:
+                    stale_at = stale_at.strftime("%Y-%m-%d %H:%M:%S")
+                updates.append((stale_at, key, stale_at))
+        if updates:
+            cur.executemany(
+                f"UPDATE cache SET updated_at = {PH} WHERE key = {PH} AND updated_at > {PH}",
+                updates,
+            )
+        ts = time.time()
+        cur.executemany(
+            f"INSERT INTO cache_invalidation (pattern, created_at) VALUES ({PH}, {PH})",
+            [(pattern, ts) for pattern in patterns],
+        )
+        cur.execute(f"DELETE FROM cache_invalidation WHERE created_at < {PH}",
+                    (ts - _INVALIDATION_RETENTION_SEC,))
+        conn.commit()
+    finally:
+        put_conn(conn)
+
+    _mem_drop(patterns)
+    return len(updates)
+
+
+def _sync_invalidations():
+    """다른 워커가 기록한 무효화 로그를 읽어 L1에서 제거 (CACHE_INVALIDATION_POLL_SEC 마다 1회)."""
+    global _inval_last_id, _inval_last_poll
+    if time.monotonic() - _inval_last_poll < config.CACHE_INVALIDATION_POLL_SEC:
+        return
+    if not _inval_lock.acquire(blocking=False):
+        return   # 다른 스레드가 확인 중
+    try:
+        _inval_last_poll = time.monotonic()
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            if _inval_last_id is None:
+                # 프로세스 시작 시점 이전 로그는 반영할 필요 없음 (L1이 비어 있음)
+                cur.execute("SELECT MAX(id) AS max_id FROM cache_invalidation")
+                row = cur.fetchone()
+                _inval_last_id = (row["max_id"] if row else None) or 0
+                return
+            cur.execute(
+                f"SELECT id, pattern FROM cache_invalidation WHERE id > {PH} ORDER BY id",
+                (_inval_last_id,),
+            )
+            rows = cur.fetchall()
+        finally:
+            put_conn(conn)
+        if rows:
+            _mem_drop([row["pattern"] for row in rows])
+            _inval_last_id = rows[-1]["id"]
+    except Exception as e:
+        log.warning("cache invalidation sync failed: %s", e)
+    finally:
+        _inval_lock.release()
+
+
+def _mem_drop(patterns: list[str]):
+    """패턴에 맞는 L1 항목 제거 (다음 조회는 L2의 만료 표시된 값)."""
+    global _mem_bytes
+    with _mem_lock:
+        for key in [k for k in _mem if any(_pattern_match(k, p) for p in patterns)]:
+            _mem_bytes -= _mem.pop(key)["size"]
+
+
+def _pattern_match(key: str, pattern: str) -> bool:
+    if pattern.endswith("*"):
+        return key.startswith(pattern[:-1])
+    return key == pattern
+
+
+def _family_ttl(key: str) -> int | None:
+    family = _key_family(key)
+    return config.CACHE_TTL.get(_FAMILY_TTL_KEY.get(family, family))
 
 
 # ── 캐시 원본 조회 (TTL 무시) ──────────────────
 def cache_get_raw(key: str) -> dict | None:
     """TTL 무시하고 캐시 데이터 조회 (fallback용). L1 메모리 우선."""
-    with _mem_lock:
-        entry = _mem.get(key)
+    _sync_invalidations()
+    entry = _mem_lookup(key)
     if entry:
         return entry["data"]
 
@@ -202,5 +842,56 @@ def cache_get_raw(key: str) -> dict | None:
         cur.execute(f"SELECT data FROM cache WHERE key = {PH}", (key,))
         row = cur.fetchone()
     finally:
-        conn.close()
+        put_conn(conn)
     return json.loads(row["data"]) if row else None
+
+
+def cache_versions(keys: list[str]) -> dict:
+    """L2 캐시 키별 갱신 시각 {key: "YYYY-MM-DD HH:MM:SS"} (값은 읽지 않음). 없는 키는 제외."""
+    if not keys:
+        return {}
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT key, updated_at FROM cache WHERE key IN ({', '.join([PH] * len(keys))})",
+            tuple(keys),
+        )
+        rows = cur.fetchall()
+    finally:
+        put_conn(conn)
+    return {r["key"]: str(r["updated_at"])[:19] for r in rows}
+
+
+# ── 워커 간 임대 (lease) ───────────────────────
+# gunicorn 워커끼리 같은 키의 upstream 조회를 1번만 하도록 DB 행을 잠금처럼 사용.
+# 만료 시각(epoch 초)이 지난 임대는 다른 워커가 가져갈 수 있다 (보유 워커 비정상 종료 대비).
+def lease_acquire(key: str, owner: str, lease_seconds: float) -> bool:
+    """임대 획득 시 True. 다른 소유자의 유효한 임대가 있으면 False."""
+    now = time.time()
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"""INSERT INTO cache_lease (key, owner, expires_at) VALUES ({PH}, {PH}, {PH})
+                ON CONFLICT (key) DO UPDATE SET
+                    owner = EXCLUDED.owner,
+                    expires_at = EXCLUDED.expires_at
+                WHERE cache_lease.expires_at < {PH} OR cache_lease.owner = {PH}""",
+            (key, owner, now + lease_seconds, now, owner),
+        )
+        acquired = cur.rowcount == 1
+        conn.commit()
+    finally:
+        put_conn(conn)
+    return acquired
+
+
+def lease_release(key: str, owner: str):
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(f"DELETE FROM cache_lease WHERE key = {PH} AND owner = {PH}", (key, owner))
+        conn.commit()
+    finally:
+        put_conn(conn)
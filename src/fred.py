@@ -0,0 +1,134 @@
+"""
+FRED 관측값 로컬 저장소 — fred_observations 테이블 (series_id, date 기준).
+
+시리즈마다 "최근 N개" 를 매번 새로 받지 않고, 받은 관측값을 모두 저장해 두고
+마지막 저장일 이후 구간만 조회한다 (observation_start).
+  - 최초 1회만 FRED_HISTORY_YEARS 년치 조회
+  - 이후에는 마지막 저장일 _OVERLAP_DAYS 전부터 조회 → 최근 값 수정(revision)도 반영
+  - 월간 지표(CPI·M2)는 발표일마다 관측값 1~3개짜리 작은 응답
+  - 여러 시리즈는 동시에 조회 (get_series_many)
+YoY·금리차 같은 파생 값은 로컬 시리즈로 계산한다 (yoy, latest_common).
+"""
+import logging
+from datetime import date, timedelta
+
+import config
+from src import http_client, thread_pool
+from src.db import get_conn, put_conn, PH, USE_PG
+
+if USE_PG:
+    import psycopg2.extras
+
+log = logging.getLogger(__name__)
+
+_OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
+_OVERLAP_DAYS = 90         # delta 조회 시 겹쳐 받는 기간 (최근 관측값 수정 반영)
+
+
+def load_series(series_id: str) -> list[tuple[str, float]]:
+    """저장된 관측값 [(YYYY-MM-DD, 값), ...] (날짜 오름차순)."""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT date, value FROM fred_observations WHERE series_id = {PH} ORDER BY date",
+            (series_id,),
+        )
+        rows = cur.fetchall()
+    finally:
+        put_conn(conn)
+    return [(str(r["date"]), float(r["value"])) for r in rows]
+
+
+def save_series(series_id: str, observations: list[tuple[str, float]]):
+    """관측값 upsert (수정된 값은 덮어씀)."""
+    if not observations:
+        return
+    rows = [(series_id, d, v) for d, v in observations]
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        upsert = """INSERT INTO fred_observations (series_id, date, value)
+                    VALUES {values}
+                    ON CONFLICT (series_id, date) DO UPDATE SET value = EXCLUDED.value"""
+        if USE_PG:
+            psycopg2.extras.execute_values(cur, upsert.format(values="%s"), rows, page_size=500)
+        else:
+            cur.executemany(upsert.format(values="(?, ?, ?)"), rows)
+        conn.commit()
+    finally:
+        put_conn(conn)
+
+
+def get_series(series_id: str) -> list[tuple[str, float]]:
+    """
+    시리즈 전체 관측값 (로컬 저장소 + 마지막 저장일 이후 delta 조회), 날짜 오름차순.
+    delta 조회가 실패하면 저장된 값 그대로 반환. 저장된 값도 없으면 예외.
+    """
+    stored = load_series(series_id)
+    if stored:
+        start = date.fromisoformat(stored[-1][0]) - timedelta(days=_OVERLAP_DAYS)
+    else:
+        start = date.today() - timedelta(days=365 * config.FRED_HISTORY_YEARS)
+
+    try:
+        delta = _fetch(series_id, start)
+    except Exception as e:
+        if not stored:
+            raise
+        log.warning("FRED %s delta fetch failed, using stored series: %s", series_id, e)
+        return stored
+
+    save_series(series_id, delta)
+    merged = dict(stored)
+    merged.update(delta)
+    return sorted(merged.items())
+
+
+def get_series_many(series_ids: list[str]) -> dict:
+    """여러 시리즈 동시 조회 {series_id: 관측값 리스트}. 실패한 시리즈는 예외 객체."""
+    ex = thread_pool.get("fred")
+    futures = {sid: ex.submit(get_series, sid) for sid in series_ids}
+    result = {}
+    for sid, f in futures.items():
+        try:
+            result[sid] = f.result()
+        except Exception as e:
+            result[sid] = e
+    return result
+
+
+# ── 파생 값 ───────────────────────────────────
+def yoy(observations: list[tuple[str, float]], periods: int = 12) -> list[tuple[str, float]]:
+    """전년 동기 대비 변화율 (%) 시리즈 [(날짜, %), ...] (날짜 오름차순). periods = 1년 관측값 수."""
+    return [
+        (observations[i][0], round((observations[i][1] / observations[i - periods][1] - 1) * 100, 2))
+        for i in range(periods, len(observations))
+        if observations[i - periods][1]
+    ]
+
+
+def latest_common(a: list[tuple[str, float]], b: list[tuple[str, float]]) -> tuple | None:
+    """두 시리즈 모두 값이 있는 가장 최근 날짜의 (날짜, a값, b값). 없으면 None."""
+    values_b = dict(b)
+    for d, value_a in reversed(a):
+        if d in values_b:
+            return d, value_a, values_b[d]
+    return None
+
+
+# ── 내부 ──────────────────────────────────────
+def _fetch(series_id: str, start: date) -> list[tuple[str, float]]:
+    resp = http_client.get(
+        _OBSERVATIONS_URL,
+        params={
+            "series_id":         series_id,
+            "api_key":           config.FRED_API_KEY,
+            "observation_start": start.isoformat(),
+            "sort_order":        "asc",
+            "file_type":         "json",
+        },
+    )
+    resp.raise_for_status()
+    # 결측값은 "." 로 표시됨
+    return [(o["date"], float(o["value"])) for o in resp.json()["observations"] if o["value"] != "."]
@@ -0,0 +1,106 @@
+"""
+공용 HTTP 클라이언트 — CNN·Alternative.me·FRED·Yahoo 검색 호출.
+
+호출마다 requests.get 으로 새 연결(TLS 핸드셰이크)을 맺지 않고
+호스트별 requests.Session 의 keep-alive 연결 풀을 재사용한다.
+
+  - 호스트당 동시 연결 수 제한 (HTTP_POOL_MAXSIZE, 초과 시 연결 반납까지 대기)
+  - 연결·읽기 타임아웃 기본값 통일 (HTTP_CONNECT_TIMEOUT / HTTP_READ_TIMEOUT)
+  - 연결 오류·429·5xx 는 지수 backoff 로 재시도 (GET만, Retry-After 헤더 준수)
+  - 호스트별 요청 수·오류 수·평균/최대 지연 집계 → /api/stats
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import config
+
+_sessions: dict = {}        # {host: requests.Session}
+_lock = threading.Lock()
+_stats: dict = {}           # {host: {"requests", "errors", "total_ms", "max_ms", "last_status"}}
+
+
+def get(url: str, params: dict | None = None, headers: dict | None = None,
+        timeout: float | tuple | None = None) -> requests.Response:
+    """
+    GET 요청 (호스트별 세션 재사용). 응답 상태 검사는 호출자가 (raise_for_status).
+    timeout 생략 시 (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT).
+    """
+    host = urlsplit(url).netloc
+    session = _session(host)
+    if timeout is None:
+        timeout = (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+
+    started = time.monotonic()
+    try:
+        resp = session.get(url, params=params, headers=headers, timeout=timeout)
+    except Exception:
+        _record(host, started, None)
+        raise
+    _record(host, started, resp.status_code)
+    return resp
+
+
+def stats() -> dict:
+    """호스트별 요청 지표 (재시도 포함 지연)."""
+    with _lock:
+        return {
+            host: {
+                "requests":    s["requests"],
+                "errors":      s["errors"],
+                "avg_ms":      round(s["total_ms"] / s["requests"], 1) if s["requests"] else None,
+                "max_ms":      round(s["max_ms"], 1),
+                "last_status": s["last_status"],
+            }
+            for host, s in _stats.items()
+        }
+
+
+def close():
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+# ── 내부 ──────────────────────────────────────
+def _session(host: str) -> requests.Session:
+    session = _sessions.get(host)
+    if session is not None:
+        return session
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            retry = Retry(
+                total=config.HTTP_RETRIES,
+                backoff_factor=config.HTTP_BACKOFF_SEC,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({"GET"}),
+                respect_retry_after_header=True,
+                raise_on_status=False,      # 마지막 응답을 그대로 반환 (raise_for_status 로 판단)
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.HTTP_POOL_MAXSIZE,
+                                  pool_block=True, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+    return session
+
+
+def _record(host: str, started: float, status: int | None):
+    elapsed_ms = (time.monotonic() - started) * 1000
+    with _lock:
+        s = _stats.setdefault(host, {"requests": 0, "errors": 0, "total_ms": 0.0,
+                                     "max_ms": 0.0, "last_status": None})
+        s["requests"] += 1
+        s["total_ms"] += elapsed_ms
+        s["max_ms"] = max(s["max_ms"], elapsed_ms)
+        s["last_status"] = status
+        if status is None or status >= 400:
+            s["errors"] += 1
@@ -0,0 +1,210 @@
+"""
+증분 기술적 지표 엔진 — RSI(14), MACD(12,26,9), MA20/60/120.
+
+종목별 지표 상태(Wilder RSI 가중합, MACD EMA, 이동평균 구간 합계)를 캐시에 저장해 두고
+새 일봉이 생기면 그 봉만 반영한다 (봉당 O(1)). 5년치 전체를 매번 다시 계산하지 않는다.
+
+  - 마지막 봉은 장중 미완성일 수 있으므로 상태에 확정하지 않고 복사본에 임시 반영
+  - 반영할 봉이 많으면(최초 계산·전체 재계산) compute_pool 프로세스에서 계산
+  - 저장 상태의 마지막 봉 종가가 이력과 다르면(수정주가 재조회) 전체 재계산
+  - 계산식은 pandas_ta 0.3.14b 와 동일:
+      RSI  = rma(상승폭) / (rma(상승폭) + rma(하락폭)) × 100,  rma = ewm(alpha=1/14, adjust=True)
+      EMA  = 첫 length개 단순평균으로 시작하는 ewm(span=length, adjust=False)
+      MACD = EMA12 - EMA26,  Signal = MACD의 EMA9 (MACD 유효 구간부터)
+"""
+import copy
+import math
+
+import pandas as pd
+
+from src import compute_pool
+from src.db import cache_get_raw, cache_set
+
+RSI_LENGTH = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+MA_WINDOWS = (20, 60, 120)
+CHART_DAYS = 252           # 차트용 MA 시리즈 보관 길이 (1년)
+_STATE_VERSION = 1
+_CLOSE_TOLERANCE = 1e-6    # 확정 봉 종가 비교 허용 오차 (상대)
+_OFFLOAD_MIN_BARS = 200    # 이 이상 반영할 때만 프로세스 풀 사용 (적으면 전달 비용이 더 큼)
+
+
+# ── 상태 초기화·갱신 ───────────────────────────
+def _new_state() -> dict:
+    return {
+        "v": _STATE_VERSION,
+        "last_date": None,
+        "last_close": None,
+        # Wilder RSI: adjust=True ewm = 가중합 / 가중치합
+        "rsi": {"gain": 0.0, "loss": 0.0, "weight": 0.0, "count": 0},
+        "ema_fast": _new_ema(MACD_FAST),
+        "ema_slow": _new_ema(MACD_SLOW),
+        "ema_signal": _new_ema(MACD_SIGNAL),
+        "macd": None,
+        # 이동평균: 최근 120개 종가 + 구간별 합계
+        "window": [],
+        "sums": {str(w): 0.0 for w in MA_WINDOWS},
+        "ma_series": {str(w): [] for w in MA_WINDOWS},
+    }
+
+
+def _new_ema(length: int) -> dict:
+    return {"length": length, "value": None, "seed_sum": 0.0, "seed_count": 0}
+
+
+def _ema_step(ema: dict, x: float):
+    """SMA 시드 후 재귀 EMA. 시드 전에는 None."""
+    length = ema["length"]
+    if ema["value"] is None:
+        ema["seed_sum"] += x
+        ema["seed_count"] += 1
+        if ema["seed_count"] == length:
+            ema["value"] = ema["seed_sum"] / length
+        return ema["value"]
+    alpha = 2.0 / (length + 1)
+    ema["value"] = alpha * x + (1 - alpha) * ema["value"]
+    return ema["value"]
+
+
+def _step(state: dict, close: float):
+    """종가 1개 반영 (상태를 직접 수정)."""
+    # RSI: 전일 대비 변화량 → 상승폭·하락폭의 adjust=True ewm
+    prev = state["last_close"]
+    if prev is not None:
+        diff = close - prev
+        decay = 1.0 - 1.0 / RSI_LENGTH
+        r = state["rsi"]
+        r["gain"] = max(diff, 0.0) + decay * r["gain"]
+        r["loss"] = max(-diff, 0.0) + decay * r["loss"]
+        r["weight"] = 1.0 + decay * r["weight"]
+        r["count"] += 1
+
+    # MACD: 두 EMA가 모두 유효해진 뒤부터 Signal EMA 시작
+    fast = _ema_step(state["ema_fast"], close)
+    slow = _ema_step(state["ema_slow"], close)
+    if fast is not None and slow is not None:
+        state["macd"] = fast - slow
+        _ema_step(state["ema_signal"], state["macd"])
+
+    # 이동평균: 구간 합계에 새 값 더하고 빠지는 값 빼기
+    window = state["window"]
+    window.append(close)
+    for w in MA_WINDOWS:
+        key = str(w)
+        state["sums"][key] += close
+        if len(window) > w:
+            state["sums"][key] -= window[-w - 1]
+        series = state["ma_series"][key]
+        series.append(state["sums"][key] / w if len(window) >= w else None)
+        if len(series) > CHART_DAYS:
+            del series[0]
+    if len(window) > max(MA_WINDOWS):
+        del window[0]
+
+    state["last_close"] = close
+
+
+# ── 공개 API ──────────────────────────────────
+def update(ticker: str, closes: pd.Series) -> dict:
+    """
+    일봉 종가 시리즈(날짜 오름차순)에 맞춰 지표 상태를 갱신하고 최신 지표 반환.
+
+    반환:
+        {
+            "rsi": 45.2, "macd": 1.23, "macd_signal": 0.98, "macd_bullish": True,
+            "ma20": ..., "ma60": ..., "ma120": ..., "ma_signal": "bullish",
+            "ma_series": {"ma20": [...], "ma60": [...], "ma120": [...]},  # 최근 252일 (차트용)
+        }
+    """
+    key = f"ind_{ticker}"
+    closes = closes.dropna()
+    dates = closes.index.strftime("%Y-%m-%d").tolist()
+    values = closes.astype(float).tolist()
+    if not values:
+        return _outputs(_new_state())
+
+    # L1 캐시는 객체를 공유하므로 복사본에서 갱신
+    state = copy.deepcopy(cache_get_raw(key))
+    start = _resume_index(state, dates, values)
+    if start is None:
+        state = _new_state()   # 상태 없음·버전 변경·이력 재작성 → 전체 재계산
+        start = 0
+
+    # 마지막 봉 직전까지 확정 반영 (새 확정 봉이 있을 때만 저장)
+    committed = len(values) - 1
+    if committed - start >= _OFFLOAD_MIN_BARS:
+        state, outputs = compute_pool.run(advance, state, values, start)
+    else:
+        state, outputs = advance(state, values, start)
+    if start < committed:
+        state["last_date"] = dates[committed - 1]
+        cache_set(key, state)
+    return outputs
+
+
+def advance(state: dict, values: list, start: int) -> tuple[dict, dict]:
+    """
+    values[start:-1] 을 상태에 확정 반영하고, 마지막 봉은 복사본에 임시 반영한 지표 계산.
+    반환: (확정 상태, 지표) — 캐시 접근 없는 순수 계산 (compute_pool 작업 함수).
+    """
+    for close in values[start:len(values) - 1]:
+        _step(state, close)
+
+    # 마지막 봉(장중 미완성 가능)은 복사본에 임시 반영
+    provisional = copy.deepcopy(state)
+    _step(provisional, values[-1])
+    return state, _outputs(provisional)
+
+
+def _resume_index(state: dict | None, dates: list, values: list) -> int | None:
+    """저장 상태를 이어서 쓸 수 있으면 다음에 반영할 위치, 아니면 None."""
+    if not state or state.get("v") != _STATE_VERSION or state.get("last_date") is None:
+        return None
+    try:
+        i = dates.index(state["last_date"])
+    except ValueError:
+        return None
+    last_close = state["last_close"]
+    if abs(values[i] - last_close) > abs(last_close) * _CLOSE_TOLERANCE:
+        return None
+    return i + 1
+
+
+def _outputs(state: dict) -> dict:
+    r = state["rsi"]
+    rsi = None
+    if r["count"] >= RSI_LENGTH and r["weight"] > 0:
+        total = r["gain"] + r["loss"]
+        if total > 0:
+            rsi = round(100.0 * r["gain"] / total, 1)
+
+    macd = state["macd"]
+    signal = state["ema_signal"]["value"]
+    macd_bullish = bool(macd is not None and signal is not None and macd > signal)
+
+    latest = {w: state["ma_series"][str(w)][-1] if state["ma_series"][str(w)] else None
+              for w in MA_WINDOWS}
+    price = state["last_close"]
+    ma_signal = "neutral"
+    if price is not None and latest[20] is not None and latest[60] is not None:
+        if price > latest[20] and latest[20] > latest[60]:
+            ma_signal = "bullish"   # 황금 배열 (상승 추세)
+        elif price < latest[20] and latest[20] < latest[60]:
+            ma_signal = "bearish"   # 역배열 (하락 추세)
+
+    return {
+        "rsi":          rsi,
+        "macd":         macd,
+        "macd_signal":  signal,
+        "macd_bullish": macd_bullish,
+        "ma20":         latest[20],
+        "ma60":         latest[60],
+        "ma120":        latest[120],
+        "ma_signal":    ma_signal,
+        "ma_series":    {f"ma{w}": [_round(v) for v in state["ma_series"][str(w)]]
+                         for w in MA_WINDOWS},
+    }
+
+
+def _round(val, digits=2):
+    return round(val, digits) if val is not None and not math.isnan(val) else None
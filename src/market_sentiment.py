@@ -1,11 +1,11 @@
-import requests
 import yfinance as yf
-import pandas_ta as ta
 import pandas as pd
 from datetime import datetime
 
 import config
-from src.db import cache_get, cache_set, cache_get_raw
+from src.db import cache_set, cache_get_raw
+from src.singleflight import cached_fetch
+from src import batch_analytics, compute_pool, fred, http_client, rate_limit
 
 
 _CNN_HEADERS = {
@@ -16,6 +16,9 @@ _CNN_HEADERS = {
 }
 _CNN_FG_URL = "https://production.dataviz.cnn.io/index/fearandgreed/graphdata"
 
+# 시장심리 지표 캐시 키 (선택 무효화 scope=sentiment 대상)
+CACHE_KEYS = ("fear_greed", "vix", "market_rsi", "cpi", "m2", "yield_curve")
+
 
 def _fg_color(value: float) -> str:
     if value <= 25:
@@ -43,14 +46,16 @@ def _fg_label(value: float) -> str:
 
 def get_fear_greed() -> dict:
     """CNN Fear & Greed Index (주식시장 기반). Alternative.me를 fallback으로 사용."""
-    key = "fear_greed"
-    cached = cache_get(key, config.CACHE_TTL["fear_greed"])
-    if cached:
-        return cached
+    return cached_fetch("fear_greed", config.CACHE_TTL["fear_greed"], fetch_fear_greed,
+                        max_stale=config.CACHE_MAX_STALE["fear_greed"])
 
+
+def fetch_fear_greed() -> dict:
+    """Fear & Greed upstream 조회 → 캐시 저장 (캐시 확인 없음)."""
+    key = "fear_greed"
     # 1차: CNN
     try:
-        resp = requests.get(_CNN_FG_URL, headers=_CNN_HEADERS, timeout=10)
+        resp = http_client.get(_CNN_FG_URL, headers=_CNN_HEADERS)
         resp.raise_for_status()
         fg = resp.json()["fear_and_greed"]
 
@@ -73,7 +78,7 @@ def get_fear_greed() -> dict:
 
     # 2차 fallback: Alternative.me
     try:
-        resp = requests.get("https://api.alternative.me/fng/?limit=5", timeout=10)
+        resp = http_client.get("https://api.alternative.me/fng/?limit=5")
         resp.raise_for_status()
         items = resp.json()["data"]
         value = int(items[0]["value"])
@@ -97,13 +102,15 @@ def get_fear_greed() -> dict:
 
 
 def get_vix() -> dict:
-    key = "vix"
-    cached = cache_get(key, config.CACHE_TTL["vix"])
-    if cached:
-        return cached
+    return cached_fetch("vix", config.CACHE_TTL["vix"], fetch_vix,
+                        max_stale=config.CACHE_MAX_STALE["vix"])
+
 
+def fetch_vix() -> dict:
+    """^VIX upstream 조회 → 캐시 저장 (캐시 확인 없음)."""
+    key = "vix"
     try:
-        hist = yf.Ticker("^VIX").history(period="1mo")
+        hist = rate_limit.call(lambda: yf.Ticker("^VIX").history(period="1mo"))
         if hist.empty:
             raise ValueError("VIX 데이터 없음")
 
@@ -143,18 +150,20 @@ def get_vix() -> dict:
 
 
 def get_market_rsi() -> dict:
-    key = "market_rsi"
-    cached = cache_get(key, config.CACHE_TTL["market_rsi"])
-    if cached:
-        return cached
+    return cached_fetch("market_rsi", config.CACHE_TTL["market_rsi"], fetch_market_rsi,
+                        max_stale=config.CACHE_MAX_STALE["market_rsi"])
+
 
+def fetch_market_rsi() -> dict:
+    """S&P500·NASDAQ RSI upstream 조회 → 캐시 저장 (캐시 확인 없음)."""
+    key = "market_rsi"
     def _rsi(ticker: str) -> dict:
         try:
-            hist = yf.Ticker(ticker).history(period="3mo")
+            hist = rate_limit.call(lambda: yf.Ticker(ticker).history(period="3mo"))
             if hist.empty:
                 raise ValueError
-            rsi_series = ta.rsi(hist["Close"], length=14)
-            rsi = round(float(rsi_series.dropna().iloc[-1]), 1)
+            # RSI(14) 계산은 프로세스 풀에서 (종가 배열만 전달)
+            rsi = round(compute_pool.run(batch_analytics.rsi, hist["Close"].to_numpy(dtype=float)), 1)
             if rsi < 30:
                 level = "oversold"
             elif rsi > 70:
@@ -175,55 +184,40 @@ def get_market_rsi() -> dict:
 
 
 def get_cpi() -> dict:
-    key = "cpi"
-    cached = cache_get(key, config.CACHE_TTL["cpi"])
-    if cached:
-        return cached
+    return cached_fetch("cpi", config.CACHE_TTL["cpi"], fetch_cpi,
+                        max_stale=config.CACHE_MAX_STALE["cpi"])
+
 
+def fetch_cpi() -> dict:
+    """FRED CPIAUCSL upstream 조회 → 캐시 저장 (캐시 확인 없음)."""
+    key = "cpi"
     if not config.FRED_API_KEY:
         return {"available": False, "reason": "FRED_API_KEY not set"}
 
     try:
-        resp = requests.get(
-            "https://api.stlouisfed.org/fred/series/observations",
-            params={
-                "series_id":  "CPIAUCSL",
-                "api_key":    config.FRED_API_KEY,
-                "sort_order": "desc",
-                "limit":      15,   # YoY 계산용 최소 13개 + 여유분
-                "file_type":  "json",
-            },
-            timeout=10,
-        )
-        resp.raise_for_status()
-        obs = resp.json()["observations"]
+        # 로컬 관측값 저장소 + 마지막 저장일 이후만 조회
+        obs = fred.get_series("CPIAUCSL")
 
         # YoY 변화율 계산 (전년 동월 대비)
-        values = [float(o["value"]) for o in obs if o["value"] != "."]
-        dates  = [o["date"][:7] for o in obs if o["value"] != "."]
-
-        latest_val  = values[0]
-        prev_val    = values[1]
-        yoy_val     = values[0]
-        yoy_prev    = values[12] if len(values) > 12 else None
-
-        yoy_rate      = round((yoy_val / yoy_prev - 1) * 100, 2) if yoy_prev else None
-        yoy_rate_prev = round((values[1] / values[13] - 1) * 100, 2) if len(values) > 13 else None
+        yoy = fred.yoy(obs)
+        yoy_rate      = yoy[-1][1] if yoy else None
+        yoy_rate_prev = yoy[-2][1] if len(yoy) > 1 else None
 
         if yoy_rate and yoy_rate_prev:
             trend = "down" if yoy_rate < yoy_rate_prev else "up"
         else:
             trend = "flat"
 
+        # 최근 12개월 지수 (최신순)
         history = [
-            {"date": d, "value": round(v, 2)}
-            for d, v in zip(dates[:12], values[:12])
+            {"date": d[:7], "value": round(v, 2)}
+            for d, v in reversed(obs[-12:])
         ]
 
         result = {
             "available":    True,
             "latest_value": yoy_rate,
-            "latest_date":  dates[0],
+            "latest_date":  obs[-1][0][:7],
             "prev_value":   yoy_rate_prev,
             "trend":        trend,
             "history":      history,
@@ -257,39 +251,23 @@ def get_m2() -> dict:
             "updated":      "...",
         }
     """
-    key = "m2"
-    cached = cache_get(key, config.CACHE_TTL["m2"])
-    if cached:
-        return cached
+    return cached_fetch("m2", config.CACHE_TTL["m2"], fetch_m2,
+                        max_stale=config.CACHE_MAX_STALE["m2"])
 
+
+def fetch_m2() -> dict:
+    """FRED M2SL upstream 조회 → 캐시 저장 (캐시 확인 없음)."""
+    key = "m2"
     if not config.FRED_API_KEY:
         return {"available": False, "reason": "FRED_API_KEY not set"}
 
     try:
-        resp = requests.get(
-            "https://api.stlouisfed.org/fred/series/observations",
-            params={
-                "series_id":  "M2SL",           # M2 통화량 (십억 달러, 계절조정)
-                "api_key":    config.FRED_API_KEY,
-                "sort_order": "desc",
-                "limit":      26,               # YoY 14개월치 계산: 14 + 12 = 26개 필요
-                "file_type":  "json",
-            },
-            timeout=10,
-        )
-        resp.raise_for_status()
-        obs = resp.json()["observations"]
+        # M2 통화량 (십억 달러, 계절조정) — 로컬 관측값 저장소 + 마지막 저장일 이후만 조회
+        obs = fred.get_series("M2SL")
 
-        # 유효한 값만 추출
-        values = [float(o["value"]) for o in obs if o["value"] != "."]
-        dates  = [o["date"][:7] for o in obs if o["value"] != "."]
-
-        # ── 최대 14개월치 YoY 시리즈 계산 ──
-        # yoy[i] = (values[i] / values[i+12] - 1) × 100  (전년 동월 대비)
-        yoy_series = []
-        for i in range(min(14, len(values) - 12)):
-            yoy_val = round((values[i] / values[i + 12] - 1) * 100, 2)
-            yoy_series.append({"date": dates[i], "yoy": yoy_val})
+        # ── 최근 14개월 YoY 시리즈 (최신순) ──
+        # yoy = (이번 달 / 전년 동월 - 1) × 100
+        yoy_series = [{"date": d[:7], "yoy": v} for d, v in reversed(fred.yoy(obs)[-14:])]
 
         yoy_rate      = yoy_series[0]["yoy"] if yoy_series else None
         yoy_rate_prev = yoy_series[1]["yoy"] if len(yoy_series) > 1 else None
@@ -334,7 +312,7 @@ def get_m2() -> dict:
         result = {
             "available":          True,
             "latest_value":       yoy_rate,
-            "latest_date":        dates[0],
+            "latest_date":        obs[-1][0][:7],
             "prev_value":         yoy_rate_prev,
             "trend":              trend,
             "level":              level,
@@ -368,11 +346,13 @@ def get_yield_curve() -> dict:
             "available":   True,
         }
     """
-    key = "yield_curve"
-    cached = cache_get(key, config.CACHE_TTL.get("yield_curve", 3600))
-    if cached:
-        return cached
+    return cached_fetch("yield_curve", config.CACHE_TTL.get("yield_curve", 3600), fetch_yield_curve,
+                        max_stale=config.CACHE_MAX_STALE["yield_curve"])
+
 
+def fetch_yield_curve() -> dict:
+    """FRED DGS10·DGS2 (fallback: yfinance) upstream 조회 → 캐시 저장 (캐시 확인 없음)."""
+    key = "yield_curve"
     def _classify(spread: float) -> tuple:
         """금리차 → (status, label) 분류"""
         if spread > 0.5:
@@ -387,23 +367,16 @@ def get_yield_curve() -> dict:
     # ── 1차: FRED API ──
     if config.FRED_API_KEY:
         try:
-            def _fred(series_id):
-                r = requests.get(
-                    "https://api.stlouisfed.org/fred/series/observations",
-                    params={
-                        "series_id": series_id,
-                        "api_key":   config.FRED_API_KEY,
-                        "sort_order": "desc",
-                        "limit":     5,
-                        "file_type": "json",
-                    },
-                    timeout=10,
-                )
-                obs = [o for o in r.json()["observations"] if o["value"] != "."]
-                return round(float(obs[0]["value"]), 3)
-
-            rate_10y = _fred("DGS10")
-            rate_2y  = _fred("DGS2")
+            # 두 시리즈 동시 조회, 둘 다 값이 있는 가장 최근 날짜 기준 금리차
+            series = fred.get_series_many(["DGS10", "DGS2"])
+            for value in series.values():
+                if isinstance(value, Exception):
+                    raise value
+            common = fred.latest_common(series["DGS10"], series["DGS2"])
+            if common is None:
+                raise ValueError("DGS10·DGS2 공통 관측일 없음")
+            rate_10y = round(common[1], 3)
+            rate_2y  = round(common[2], 3)
             spread   = round(rate_10y - rate_2y, 3)
             status, label = _classify(spread)
             result = {
@@ -419,10 +392,10 @@ def get_yield_curve() -> dict:
 
     # ── 2차 fallback: yfinance ^TNX(10년) - ^IRX(3개월) ──
     try:
-        tnx = yf.Ticker("^TNX").fast_info     # 10년물
+        tnx = yf.Ticker("^TNX").fast_info     # 10년물 (속성 접근 시 조회)
         irx = yf.Ticker("^IRX").fast_info     # 3개월물 (2년물 대체)
-        rate_10y = round(getattr(tnx, "last_price", 0) / 10, 3)  # ^TNX는 10배 값 반환
-        rate_short = round(getattr(irx, "last_price", 0) / 10, 3)
+        rate_10y = round(rate_limit.call(getattr, tnx, "last_price", 0) / 10, 3)  # ^TNX는 10배 값 반환
+        rate_short = round(rate_limit.call(getattr, irx, "last_price", 0) / 10, 3)
         spread = round(rate_10y - rate_short, 3)
         status, label = _classify(spread)
         result = {
@@ -442,9 +415,15 @@ def get_yield_curve() -> dict:
 
 
 def get_fear_score() -> int:
+    """시장 공포 종합 점수 — 입력 지표를 조회해서 calc_fear_score 로 계산."""
+    return calc_fear_score(get_fear_greed(), get_vix(), get_market_rsi())
+
+
+def calc_fear_score(fg: dict, vix: dict, rsi: dict) -> int:
     """
     시장 공포 종합 점수 (0~100, 높을수록 공포 심화).
     CNN Fear & Greed 기준으로 보정된 임계값 사용.
+    이미 조회한 지표 dict 를 받는다 (get_fear_greed·get_vix·get_market_rsi 결과).
 
     구성:
       Fear & Greed (CNN)  최대 40점
@@ -454,7 +433,6 @@ def get_fear_score() -> int:
     score = 0
 
     # ── Fear & Greed (CNN 기준) ── max 40점
-    fg = get_fear_greed()
     if fg.get("value") is not None:
         v = fg["value"]
         if v <= 20:          # Extreme Fear
@@ -467,7 +445,6 @@ def get_fear_score() -> int:
             score += 10
 
     # ── VIX ── max 35점
-    vix = get_vix()
     if vix.get("current") is not None:
         v = vix["current"]
         if v >= 35:          # 극도 공포
@@ -480,7 +457,6 @@ def get_fear_score() -> int:
             score += 5
 
     # ── S&P500 RSI ── max 25점
-    rsi = get_market_rsi()
     sp_rsi = rsi.get("sp500", {}).get("rsi")
     if sp_rsi is not None:
         if sp_rsi <= 30:     # 과매도
@@ -0,0 +1,232 @@
+"""
+일봉(OHLCV) 로컬 저장소 — price_bars 테이블 (ticker, date 기준).
+
+최초 1회만 5년치를 내려받고, 이후에는 마지막 저장일 직전 며칠부터의 구간만 조회(delta).
+  - 겹치는 구간의 종가가 저장값과 다르면 → 수정주가(분할·배당) 반영된 것 → 전체 재조회
+  - 새로 받은 봉에 분할·배당 이벤트가 있으면 → 과거 수정주가가 바뀌므로 전체 재조회
+ATH·52주 고점·이동평균·기술적 지표는 이 로컬 이력으로 계산한다.
+"""
+from datetime import timedelta
+
+import pandas as pd
+import yfinance as yf
+
+import config
+from src import rate_limit
+from src.db import get_conn, put_conn, PH, USE_PG
+
+if USE_PG:
+    import psycopg2.extras
+
+_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+_OVERLAP_DAYS = 7          # delta 조회 시 겹쳐 받는 기간 (수정주가 변경 감지용)
+_ADJUST_TOLERANCE = 1e-4   # 겹치는 종가 상대 오차 허용치 (0.01%)
+
+
+def load_bars(ticker: str) -> pd.DataFrame:
+    """저장된 일봉 전체 (날짜 오름차순). 컬럼명은 yfinance와 동일 (Open/High/Low/Close/Volume)."""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT date, open, high, low, close, volume FROM price_bars "
+            f"WHERE ticker = {PH} ORDER BY date",
+            (ticker,),
+        )
+        rows = cur.fetchall()
+    finally:
+        put_conn(conn)
+
+    if not rows:
+        return pd.DataFrame(columns=_COLUMNS, index=pd.DatetimeIndex([]))
+    df = pd.DataFrame(
+        [(r["open"], r["high"], r["low"], r["close"], r["volume"]) for r in rows],
+        columns=_COLUMNS,
+        index=pd.DatetimeIndex([pd.Timestamp(str(r["date"])) for r in rows]),
+    )
+    return df
+
+
+def save_bars(ticker: str, bars: pd.DataFrame, replace: bool = False):
+    """일봉 upsert. replace=True면 기존 이력 삭제 후 저장 (수정주가 전체 재조회 시)."""
+    if bars.empty:
+        return
+    rows = [
+        (ticker, d.strftime("%Y-%m-%d"),
+         _num(r.Open), _num(r.High), _num(r.Low), _num(r.Close),
+         int(r.Volume) if pd.notna(r.Volume) else None)
+        for d, r in zip(bars.index, bars.itertuples(index=False))
+    ]
+    cutoff = (bars.index[-1] - pd.DateOffset(years=config.PRICE_HISTORY_YEARS, days=7)).strftime("%Y-%m-%d")
+
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        if replace:
+            cur.execute(f"DELETE FROM price_bars WHERE ticker = {PH}", (ticker,))
+        upsert = """INSERT INTO price_bars (ticker, date, open, high, low, close, volume)
+                    VALUES {values}
+                    ON CONFLICT (ticker, date) DO UPDATE SET
+                        open = EXCLUDED.open, high = EXCLUDED.high, low = EXCLUDED.low,
+                        close = EXCLUDED.close, volume = EXCLUDED.volume"""
+        if USE_PG:
+            psycopg2.extras.execute_values(cur, upsert.format(values="%s"), rows, page_size=500)
+        else:
+            cur.executemany(upsert.format(values="(?, ?, ?, ?, ?, ?, ?)"), rows)
+        # 보관 기간(5년)보다 오래된 봉 정리
+        cur.execute(f"DELETE FROM price_bars WHERE ticker = {PH} AND date < {PH}", (ticker, cutoff))
+        conn.commit()
+    finally:
+        put_conn(conn)
+
+
+def get_history(ticker: str) -> pd.DataFrame:
+    """
+    5년 일봉 이력 (로컬 저장소 + 부족분 delta 조회).
+    반환 DataFrame은 yfinance history()와 같은 컬럼, tz 없는 날짜 인덱스.
+    """
+    ticker = ticker.upper().strip()
+    stored = load_bars(ticker)
+    if stored.empty:
+        return _full_refresh(ticker)
+
+    start = _delta_start(stored).strftime("%Y-%m-%d")
+    delta = _normalize(rate_limit.call(
+        lambda: yf.Ticker(ticker).history(start=start, auto_adjust=True, actions=True)))
+    return _apply_delta(ticker, stored, delta)
+
+
+def get_history_many(tickers: list[str]) -> dict:
+    """
+    여러 종목 5년 일봉 이력 {ticker: DataFrame}.
+    종목별 history() 대신 yf.download 로 묶어서 조회:
+      저장 이력 없는 종목 → period=5y 1회
+      저장 이력 있는 종목 → 가장 이른 delta 시작일부터 1회
+    수정주가 변경이 감지된 종목만 개별 전체 재조회. 묶음 조회 실패 시 종목별 조회로 폴백.
+    """
+    tickers = list(dict.fromkeys(t.upper().strip() for t in tickers))
+    stored = {ticker: load_bars(ticker) for ticker in tickers}
+    cold = [t for t in tickers if stored[t].empty]
+    warm = [t for t in tickers if not stored[t].empty]
+    result = {}
+
+    if cold:
+        frames = _download(cold, period=f"{config.PRICE_HISTORY_YEARS}y")
+        for ticker in cold:
+            if frames is None:
+                result[ticker] = get_history(ticker)
+                continue
+            bars = frames[ticker][_COLUMNS]
+            save_bars(ticker, bars, replace=True)
+            result[ticker] = _trim(bars)
+
+    if warm:
+        start = min(_delta_start(stored[t]) for t in warm).strftime("%Y-%m-%d")
+        frames = _download(warm, start=start, actions=True)
+        for ticker in warm:
+            if frames is None:
+                result[ticker] = get_history(ticker)
+                continue
+            result[ticker] = _apply_delta(ticker, stored[ticker], frames[ticker])
+
+    return result
+
+
+def _delta_start(stored: pd.DataFrame):
+    return stored.index[-1] - timedelta(days=_OVERLAP_DAYS)
+
+
+def _apply_delta(ticker: str, stored: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """delta 봉 저장 후 병합 이력 반환. 수정주가 변경이 감지되면 전체 재조회."""
+    if delta.empty:
+        return _trim(stored)
+
+    if _needs_full_refresh(stored, delta):
+        return _full_refresh(ticker)
+
+    bars = delta[_COLUMNS]
+    save_bars(ticker, bars)
+    merged = pd.concat([stored[stored.index < bars.index[0]], bars])
+    return _trim(merged)
+
+
+def _full_refresh(ticker: str) -> pd.DataFrame:
+    hist = _normalize(rate_limit.call(
+        lambda: yf.Ticker(ticker).history(period=f"{config.PRICE_HISTORY_YEARS}y", auto_adjust=True)))
+    if hist.empty:
+        return hist
+    bars = hist[_COLUMNS]
+    save_bars(ticker, bars, replace=True)
+    return _trim(bars)
+
+
+def _download(tickers: list[str], **kwargs) -> dict | None:
+    """yf.download 묶음 조회 → {ticker: 정규화된 DataFrame}. 요청 자체가 실패하면 None."""
+    try:
+        raw = rate_limit.call(yf.download, " ".join(tickers), group_by="ticker", auto_adjust=True,
+                              progress=False, **kwargs)
+    except rate_limit.YahooThrottled:
+        raise       # throttle 중에는 종목별 조회로 폴백하지 않음 (호출부가 캐시 값 사용)
+    except Exception:
+        return None
+    if raw is None or raw.empty:
+        return None
+    return {ticker: _normalize(_split_download(raw, ticker, len(tickers))) for ticker in tickers}
+
+
+def _split_download(raw: pd.DataFrame, ticker: str, count: int) -> pd.DataFrame:
+    """묶음 응답에서 종목 1개 추출 (종목 수·yfinance 버전에 따라 컬럼 구조가 다름)."""
+    if isinstance(raw.columns, pd.MultiIndex):
+        if ticker in raw.columns.get_level_values(0):
+            df = raw[ticker]
+        elif ticker in raw.columns.get_level_values(1):
+            df = raw.xs(ticker, axis=1, level=1)
+        else:
+            return pd.DataFrame(columns=_COLUMNS)
+    elif count == 1:
+        df = raw
+    else:
+        return pd.DataFrame(columns=_COLUMNS)
+    # 다른 종목 거래일에 맞춰 채워진 빈 행 제거 (상장 전·거래정지 구간)
+    return df.dropna(subset=["Close"])
+
+
+def _needs_full_refresh(stored: pd.DataFrame, delta: pd.DataFrame) -> bool:
+    """수정주가 변경 여부: 새 봉의 분할·배당 이벤트 또는 겹치는 구간 종가 불일치."""
+    new_rows = delta[delta.index > stored.index[-1]]
+    for col in ("Stock Splits", "Dividends"):
+        if col in new_rows and (new_rows[col].fillna(0) != 0).any():
+            return True
+
+    # 마지막 저장 봉은 장중 미완성 봉이었을 수 있으므로 비교에서 제외
+    overlap = stored.index[:-1].intersection(delta.index)
+    if overlap.empty:
+        return False
+    old = stored.loc[overlap, "Close"].astype(float)
+    new = delta.loc[overlap, "Close"].astype(float)
+    rel = ((new - old).abs() / old.abs()).max()
+    return bool(rel > _ADJUST_TOLERANCE)
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """yfinance 인덱스(거래소 tz 포함 타임스탬프) → tz 없는 날짜 인덱스."""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=_COLUMNS, index=pd.DatetimeIndex([]))
+    df = df.copy()
+    idx = df.index
+    if getattr(idx, "tz", None) is not None:
+        idx = idx.tz_localize(None)
+    df.index = idx.normalize()
+    return df[~df.index.duplicated(keep="last")]
+
+
+def _trim(df: pd.DataFrame) -> pd.DataFrame:
+    """최근 PRICE_HISTORY_YEARS 년만 반환 (기존 period="5y" 와 같은 구간)."""
+    if df.empty:
+        return df
+    cutoff = df.index[-1] - pd.DateOffset(years=config.PRICE_HISTORY_YEARS)
+    return df[df.index > cutoff]
+
+
+def _num(val):
+    return float(val) if pd.notna(val) else None
@@ -0,0 +1,148 @@
+"""
+현재가 실시간 스트림 (Server-Sent Events) — /api/stream/prices.
+
+탭마다 10초 폴링하는 대신, 프로세스당 poller 스레드 1개가 구독자 전체가 원하는 종목의
+합집합을 주기마다 1번 조회(get_batch_prices)하고 결과를 각 구독자 큐로 나눠 보낸다.
+
+  - 구독자가 없으면 poller는 종료, 다음 구독 시 다시 시작
+  - 느린 클라이언트는 큐가 차면 오래된 메시지를 버리고 최신 가격만 유지
+  - 일정 간격 heartbeat 주석으로 프록시 idle 종료 방지
+  - 스트림 최대 유지 시간 후 서버가 연결을 닫으면 브라우저 EventSource가 retry 간격 후 재연결
+    (gunicorn gthread 워커의 스레드를 한 연결이 계속 점유하지 않게)
+  - 연결 1개가 워커 스레드 1개를 점유하므로 프로세스당 구독자 수를 PRICE_STREAM_MAX_SUBSCRIBERS 로 제한
+    → 한도를 넘으면 subscribe() 가 None, 라우트는 503 응답 → 페이지는 /api/prices 폴링으로 전환
+  - 응답 본문이 시작되지 않은 채 버려진 구독(클라이언트가 바로 끊음 등)은 poller 가 정리
+"""
+import itertools
+import json
+import logging
+import queue
+import threading
+import time
+
+import config
+
+log = logging.getLogger(__name__)
+
+_subscribers: dict = {}     # {id: {"tickers": set, "queue": Queue}}
+_sub_lock = threading.Lock()
+_sub_ids = itertools.count(1)
+_poller = None
+_latest: dict = {}          # 마지막 조회 결과 (신규 구독자 첫 응답용)
+_stats = {"rejected": 0, "pruned": 0}
+
+
+def subscribe(tickers: list[str]) -> int | None:
+    """
+    구독 등록 후 구독 id 반환. poller가 없으면 시작.
+    이 프로세스의 구독자가 PRICE_STREAM_MAX_SUBSCRIBERS 명이면 None (호출자는 폴링으로 안내).
+    """
+    global _poller
+    with _sub_lock:
+        _prune(time.monotonic())
+        if len(_subscribers) >= config.PRICE_STREAM_MAX_SUBSCRIBERS:
+            _stats["rejected"] += 1
+            return None
+        sub_id = next(_sub_ids)
+        _subscribers[sub_id] = {"tickers": set(tickers), "queue": queue.Queue(maxsize=2),
+                                "seen": time.monotonic()}
+        if _poller is None or not _poller.is_alive():
+            _poller = threading.Thread(target=_poll_loop, name="price-stream", daemon=True)
+            _poller.start()
+    return sub_id
+
+
+def unsubscribe(sub_id: int):
+    with _sub_lock:
+        _subscribers.pop(sub_id, None)
+
+
+def stream(sub_id: int):
+    """subscribe() 로 받은 구독의 SSE 응답 본문 제너레이터 (Flask Response 에 그대로 전달)."""
+    with _sub_lock:
+        sub = _subscribers.get(sub_id)
+    if sub is None:
+        return      # 시작 전에 정리된 구독 → 연결 종료, 브라우저가 재연결
+    q = sub["queue"]
+    deadline = time.monotonic() + config.PRICE_STREAM_MAX_SEC
+    try:
+        # 재연결 간격 지정 + 마지막 조회 결과가 있으면 즉시 전송
+        yield f"retry: {config.PRICE_STREAM_RETRY_MS}\n\n"
+        snapshot = {t: _latest[t] for t in sub["tickers"] if t in _latest}
+        if snapshot:
+            yield _event(snapshot)
+
+        while time.monotonic() < deadline and sub_id in _subscribers:
+            sub["seen"] = time.monotonic()
+            try:
+                prices = q.get(timeout=config.PRICE_STREAM_HEARTBEAT_SEC)
+            except queue.Empty:
+                yield ": heartbeat\n\n"
+                continue
+            yield _event(prices)
+    finally:
+        # 클라이언트 연결 종료(GeneratorExit) 또는 최대 유지 시간 경과
+        unsubscribe(sub_id)
+
+
+def stats() -> dict:
+    with _sub_lock:
+        return {
+            "subscribers": len(_subscribers),
+            "max_subscribers": config.PRICE_STREAM_MAX_SUBSCRIBERS,
+            **_stats,
+            "tickers": len(set().union(*(s["tickers"] for s in _subscribers.values()))),
+            "poller_alive": bool(_poller and _poller.is_alive()),
+        }
+
+
+def _event(prices: dict) -> str:
+    return f"event: prices\nid: {int(time.time() * 1000)}\ndata: {json.dumps(prices)}\n\n"
+
+
+def _poll_loop():
+    global _poller
+    from src.stock_analysis import get_batch_prices
+
+    while True:
+        with _sub_lock:
+            _prune(time.monotonic())
+            if not _subscribers:
+                _poller = None
+                return
+            tickers = sorted(set().union(*(s["tickers"] for s in _subscribers.values())))
+
+        started = time.monotonic()
+        try:
+            prices = get_batch_prices(tickers) if tickers else {}
+            _latest.update(prices)
+            _fan_out(prices)
+        except Exception as e:
+            log.warning("price stream poll failed: %s", e)
+        time.sleep(max(0.0, config.PRICE_STREAM_INTERVAL_SEC - (time.monotonic() - started)))
+
+
+def _prune(now: float):
+    """응답 본문을 읽지 않는 구독 정리 (_sub_lock 안에서 호출). 정상 스트림은 heartbeat 간격마다 seen 갱신."""
+    stale_sec = max(config.PRICE_STREAM_HEARTBEAT_SEC * 3, 60)
+    for sub_id in [i for i, s in _subscribers.items() if now - s["seen"] > stale_sec]:
+        del _subscribers[sub_id]
+        _stats["pruned"] += 1
+
+
+def _fan_out(prices: dict):
+    with _sub_lock:
+        subs = list(_subscribers.values())
+    for sub in subs:
+        payload = {t: prices.get(t) for t in sub["tickers"]}
+        q = sub["queue"]
+        # 큐가 차 있으면(느린 클라이언트) 오래된 메시지를 버리고 최신 가격만 유지
+        while True:
+            try:
+                q.put_nowait(payload)
+                break
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
@@ -0,0 +1,202 @@
+"""
+Yahoo Finance 호출 제한 — 모든 yfinance 호출(info·history·recommendations·fast_info·download)의 공용 관문.
+
+  토큰 버킷: 초당 YAHOO_RATE_PER_SEC 개 충전, 최대 YAHOO_BURST 개까지 모아 둠 (프로세스 전체 공용)
+    토큰이 없으면 요청 스레드는 기다리지 않고 바로 포기 → 호출부는 캐시 값으로 응답
+    백그라운드 작업(워머·스크리너 크롤러)만 with background(): 안에서 YAHOO_TOKEN_WAIT_SEC 까지 대기
+  적응형 감속: throttle 신호(429·YFRateLimitError)마다 충전 속도 절반,
+    정상 응답마다 설정값 쪽으로 조금씩 회복
+  차단기(circuit breaker): throttle 신호가 YAHOO_BREAKER_THRESHOLD 번 연속되면 열림
+    - 열린 동안은 upstream 호출 없이 즉시 YahooThrottled
+      → 호출부의 기존 예외 처리가 캐시·stale 값을 반환 (요청 스레드가 sleep 하며 재시도하지 않음)
+    - YAHOO_BREAKER_COOLDOWN_SEC 후 시험 호출 1건만 허용 → 그 호출이 정상이면 닫힘,
+      또 throttle 이면 대기 시간 2배 (최대 YAHOO_BREAKER_MAX_COOLDOWN_SEC)
+  약한 신호(is_suspect): 키가 거의 없는 info 응답 — throttle 일 수도 있지만 오타·상장폐지 종목의
+    정상 응답이기도 함 → 결과만 버리고(YahooThrottled) 감속·차단기에는 반영하지 않음 (stats 의 suspect)
+상태는 워커 프로세스별 (YAHOO_RATE_PER_SEC 은 워커당 값).
+
+  예) info = rate_limit.call(lambda: yf.Ticker(t).info, is_suspect=rate_limit.is_short_info)
+
+호출 수 집계: with rate_limit.counting() as spent: ... → spent["calls"] = 이 스레드에서 실제로
+  Yahoo 로 나간 호출 수 (거절된 호출·다른 스레드/워커가 대신 조회한 경우는 제외). 스크리너 예산 계산용.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+
+log = logging.getLogger(__name__)
+
+_MIN_RATE_RATIO = 0.1       # 감속 하한 (설정 속도의 10%)
+_RECOVER_RATIO = 0.1        # 정상 응답 1건당 회복량 (설정 속도의 10%)
+
+
+class YahooThrottled(Exception):
+    """차단기 열림·토큰 부족·throttle 응답 — 호출부는 캐시 값으로 대체."""
+
+
+_lock = threading.Lock()
+_bucket = {"tokens": float(config.YAHOO_BURST), "rate": config.YAHOO_RATE_PER_SEC, "updated": time.monotonic()}
+_breaker = {"failures": 0, "open_until": 0.0, "cooldown": config.YAHOO_BREAKER_COOLDOWN_SEC, "probing": False}
+_stats = {"calls": 0, "throttled": 0, "suspect": 0, "rejected": 0, "opened": 0}
+_local = threading.local()      # 스레드별: counting() 집계 대상, background() 토큰 대기 허용
+
+
+def call(fn, *args, is_throttled=None, is_suspect=None, **kwargs):
+    """
+    fn(*args, **kwargs) 를 제한 안에서 실행해 결과 반환.
+    is_throttled: 결과 → True 면 throttle 응답으로 보고 YahooThrottled (결과는 버림, 차단기 횟수 증가)
+    is_suspect:   결과 → True 면 결과를 버리고 YahooThrottled (감속·차단기에는 반영하지 않음)
+    차단기가 열려 있거나 토큰을 제때 받지 못하면 fn 을 호출하지 않고 YahooThrottled.
+    fn 의 예외는 그대로 전달 (rate limit 예외면 throttle 신호로 기록).
+    """
+    probe = _admit()
+    counter = getattr(_local, "counter", None)
+    if counter is not None:
+        counter["calls"] += 1
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        _record(probe, throttled=_is_rate_limit_error(e))
+        raise
+    if is_throttled is not None and is_throttled(result):
+        _record(probe, throttled=True)
+        raise YahooThrottled("Yahoo throttle 응답")
+    if is_suspect is not None and is_suspect(result):
+        _record(probe, throttled=True, soft=True)
+        raise YahooThrottled("Yahoo 불완전 응답")
+    _record(probe, throttled=False)
+    return result
+
+
+@contextmanager
+def background():
+    """with 블록 안의 호출은 토큰을 YAHOO_TOKEN_WAIT_SEC 까지 기다림 (워머·크롤러 전용, 요청 스레드는 즉시 포기)."""
+    outer = getattr(_local, "wait", False)
+    _local.wait = True
+    try:
+        yield
+    finally:
+        _local.wait = outer
+
+
+@contextmanager
+def counting():
+    """with 블록 안에서 이 스레드가 upstream 으로 보낸 호출 수 → {"calls": n}."""
+    outer = getattr(_local, "counter", None)
+    counter = _local.counter = {"calls": 0}
+    try:
+        yield counter
+    finally:
+        _local.counter = outer
+
+
+def is_short_info(info) -> bool:
+    """info 응답 약한 신호 판정 (is_suspect 용) — 정상 응답은 키 10개 이상.
+    throttle 시에도 {} 또는 1개 키 dict 지만 오타·상장폐지 종목의 정상 응답도 같으므로 차단기에는 쓰지 않는다."""
+    return len(info or {}) < 10
+
+
+def is_open() -> bool:
+    """차단기가 열려 있어 호출이 즉시 거절되는 상태인지 (백그라운드 작업의 주기 건너뛰기용)."""
+    with _lock:
+        return bool(_breaker["open_until"]) and (
+            time.monotonic() < _breaker["open_until"] or _breaker["probing"])
+
+
+def stats() -> dict:
+    with _lock:
+        now = time.monotonic()
+        _refill(now)
+        if not _breaker["open_until"]:
+            state = "closed"
+        elif now < _breaker["open_until"]:
+            state = "open"
+        else:
+            state = "half_open"
+        return {
+            "state":        state,
+            "open_for_sec": round(max(0.0, _breaker["open_until"] - now), 1) if state == "open" else 0,
+            "rate_per_sec": round(_bucket["rate"], 2),
+            "tokens":       round(_bucket["tokens"], 1),
+            **_stats,
+        }
+
+
+# ── 내부 ──────────────────────────────────────
+def _admit() -> bool:
+    """차단기 확인 → 토큰 1개 획득. 시험 호출(half-open)이면 True.
+    요청 스레드는 토큰이 없으면 바로 거절, background() 안에서만 YAHOO_TOKEN_WAIT_SEC 까지 대기."""
+    with _lock:
+        probe = False
+        if _breaker["open_until"]:
+            if time.monotonic() < _breaker["open_until"] or _breaker["probing"]:
+                _stats["rejected"] += 1
+                raise YahooThrottled("Yahoo 차단기 열림")
+            _breaker["probing"] = probe = True       # half-open: 시험 호출 1건만 통과
+
+    max_wait = config.YAHOO_TOKEN_WAIT_SEC if getattr(_local, "wait", False) else 0.0
+    deadline = time.monotonic() + max_wait
+    while True:
+        with _lock:
+            now = time.monotonic()
+            _refill(now)
+            if _bucket["tokens"] >= 1:
+                _bucket["tokens"] -= 1
+                return probe
+            wait = (1 - _bucket["tokens"]) / _bucket["rate"]
+            if now + wait > deadline:
+                _stats["rejected"] += 1
+                if probe:
+                    _breaker["probing"] = False
+                raise YahooThrottled("Yahoo 요청 토큰 부족")
+        time.sleep(wait)
+
+
+def _refill(now: float):
+    elapsed = now - _bucket["updated"]
+    _bucket["tokens"] = min(float(config.YAHOO_BURST), _bucket["tokens"] + elapsed * _bucket["rate"])
+    _bucket["updated"] = now
+
+
+def _record(probe: bool, throttled: bool, soft: bool = False):
+    """호출 결과 반영. 차단기를 닫거나 시험 호출 상태를 푸는 것은 시험 호출(probe) 결과만."""
+    base = config.YAHOO_RATE_PER_SEC
+    with _lock:
+        _stats["calls"] += 1
+        if probe:
+            _breaker["probing"] = False
+        if not throttled:
+            _bucket["rate"] = min(base, _bucket["rate"] + base * _RECOVER_RATIO)
+            if probe:
+                _breaker["open_until"] = 0.0
+                _breaker["cooldown"] = config.YAHOO_BREAKER_COOLDOWN_SEC
+                log.info("Yahoo circuit closed")
+            if not _breaker["open_until"]:
+                _breaker["failures"] = 0
+            return
+
+        if soft:
+            # 오타·상장폐지 종목도 같은 응답 → 집계만 (시험 호출이었으면 다음 호출이 다시 시험 호출)
+            _stats["suspect"] += 1
+            return
+        _refill(time.monotonic())
+        _bucket["rate"] = max(base * _MIN_RATE_RATIO, _bucket["rate"] / 2)
+        _stats["throttled"] += 1
+        _breaker["failures"] += 1
+        if probe:
+            # 시험 호출도 throttle → 더 오래 차단
+            _breaker["cooldown"] = min(_breaker["cooldown"] * 2, config.YAHOO_BREAKER_MAX_COOLDOWN_SEC)
+        elif _breaker["open_until"] or _breaker["failures"] < config.YAHOO_BREAKER_THRESHOLD:
+            return
+        _breaker["open_until"] = time.monotonic() + _breaker["cooldown"]
+        _stats["opened"] += 1
+        log.warning("Yahoo circuit open for %.0fs (rate %.2f/s)", _breaker["cooldown"], _bucket["rate"])
+
+
+def _is_rate_limit_error(e: Exception) -> bool:
+    message = str(e).lower()
+    return (type(e).__name__ == "YFRateLimitError"
+            or "too many requests" in message or "rate limit" in message or "429" in message)
@@ -1,3 +1,13 @@
+# 추천 등급: (최소 총점, 등급, 색상) — 높은 구간부터 확인, 어느 구간에도 못 미치면 GRADE_DEFAULT
+# batch_scoring 의 일괄 계산도 이 표를 사용 (등급 기준은 여기서만 수정)
+GRADES = [
+    (70, "★ 강력 매수", "#27ae60"),
+    (50, "매수 고려",   "#2ecc71"),
+    (30, "관망",        "#f39c12"),
+]
+GRADE_DEFAULT = ("매수 보류", "#95a5a6")
+
+
 def calc_drawdown_score(ath_drawdown_pct: float | None) -> int:
     """일반 주식 ATH 대비 낙폭 → 점수 (0~100).
     주식은 낙폭이 크기 때문에 10~50% 구간 기준 사용."""
@@ -234,6 +244,15 @@ def calc_recession_penalty(yield_spread) -> int:
         return 25
 
 
+def macro_inputs(yield_curve: dict, m2: dict) -> dict:
+    """get_yield_curve·get_m2 결과 → calc_recommendation_score 거시 지표 인자 (조회 실패 시 중립값)."""
+    return {
+        "yield_spread":   yield_curve.get("spread") if yield_curve.get("available") else None,
+        "m2_yoy":         m2.get("latest_value") if m2.get("available") else None,
+        "m2_consecutive": m2.get("consecutive_months", 1) if m2.get("available") else 1,
+    }
+
+
 def calc_recommendation_score(fear_score: int, stock_data: dict,
                                yield_spread=None, m2_yoy=None,
                                m2_consecutive: int = 1) -> dict:
@@ -276,18 +295,11 @@ def calc_recommendation_score(fear_score: int, stock_data: dict,
     m2_adjustment = calc_m2_adjustment(m2_yoy, m2_consecutive)
     total = max(0, min(100, total - recession_penalty + m2_adjustment))
 
-    if total >= 70:
-        grade = "★ 강력 매수"
-        grade_color = "#27ae60"
-    elif total >= 50:
-        grade = "매수 고려"
-        grade_color = "#2ecc71"
-    elif total >= 30:
-        grade = "관망"
-        grade_color = "#f39c12"
-    else:
-        grade = "매수 보류"
-        grade_color = "#95a5a6"
+    grade, grade_color = GRADE_DEFAULT
+    for min_score, label, color in GRADES:
+        if total >= min_score:
+            grade, grade_color = label, color
+            break
 
     # 추천 이유 텍스트
     reasons = []
@@ -0,0 +1,419 @@
+"""
+유니버스 스크리너 — 구성 종목 파일(CSV)의 전 종목을 점수 매겨 screener 테이블에 저장.
+
+  크롤러: 오래된 종목부터 SCREENER_BATCH_SIZE 개씩 종목 데이터 갱신
+    - 만료된 레이어만 조회 (technical 은 yf.download 묶음 조회, info·recommendations 는 종목별 1회)
+    - 조회 전에 예상 Yahoo 요청 수로 시간당 예산(SCREENER_YAHOO_BUDGET_PER_HOUR) 안의 종목만 고르고,
+      조회 후에는 rate_limit.counting 으로 집계한 실제 요청 수를 예산에 기록
+      배치 사이 간격을 요청 수에 비례해 둔다 (몰아서 요청하지 않음)
+    - 사용량은 캐시(screener_budget)에 기록 → 재시작·담당 워커 교체 후에도 이어서 계산
+  점수:   저장된 특성 컬럼 전체를 batch_scoring 으로 한 번에 계산 (calc_recommendation_score 와 동일 결과)
+          → 공포점수·거시 지표가 바뀌어도 Yahoo 재조회 없이 다시 매김
+  화면:   /screener 는 정렬·필터 컬럼 인덱스로 조회만 한다 (query)
+
+실행 방법:
+  앱 프로세스 내: SCREENER_ENABLED=true → app 시작 시 start()
+  별도 프로세스:  python -m src.screener
+여러 워커/프로세스가 동시에 실행해도 DB 임대(lease)로 1곳만 크롤링을 담당한다.
+
+구성 종목 파일 형식 (헤더 포함): ticker,name,sector
+"""
+import csv
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+from functools import partial
+
+import numpy as np
+
+import config
+from src import batch_scoring, compute_pool, market_sentiment, rate_limit, scoring, stock_analysis
+from src.db import cache_get_entry, cache_get_raw, cache_set, get_conn, init_db, lease_acquire, put_conn, PH
+from src.singleflight import refresh
+
+log = logging.getLogger(__name__)
+
+_LEASE_KEY = "screener"
+_BUDGET_KEY = "screener_budget"
+_WINDOW_SEC = 3600
+
+# 점수 입력 컬럼 (get_stock_data 키와 같은 이름)
+_FEATURES = ["is_etf", "current_price", "ath_drawdown_pct", "rsi", "macd_bullish", "ma_signal",
+             "buy_ratio_pct", "peg", "forward_pe", "fcf_positive", "eps_growth_pct",
+             "revenue_growth_pct", "roe", "debt_to_equity", "current_ratio", "three_year_return"]
+_BOOL_FEATURES = ("is_etf", "macd_bullish", "fcf_positive")     # DB 에는 0/1 정수로 저장
+_SCORES = ["total_score", "drawdown_score", "fundamental_score", "technical_score",
+           "grade", "grade_color", "reason"]
+_SORTABLE = {"total_score", "ath_drawdown_pct", "fundamental_score", "technical_score",
+             "rsi", "forward_pe", "buy_ratio_pct", "ticker"}
+
+_stop = threading.Event()
+_thread = None
+_spent: deque = deque()         # [(epoch 초, 요청 수), ...] 최근 1시간 사용량
+_spent_lock = threading.Lock()
+_budget_loaded = False
+
+
+# ── 조회 (/screener) ──────────────────────────
+def query(sort: str = "total_score", order: str = "desc", grade: str | None = None,
+          sector: str | None = None, min_drawdown: float | None = None,
+          limit: int | None = None) -> list[dict]:
+    """
+    점수가 매겨진 종목 목록.
+    sort: _SORTABLE 중 하나 (그 외는 total_score), order: "asc" | "desc"
+    min_drawdown: ATH 대비 최소 낙폭 % (예: 20 → -20% 이하만)
+    """
+    if sort not in _SORTABLE:
+        sort = "total_score"
+    direction = "ASC" if order == "asc" else "DESC"
+    where = ["total_score IS NOT NULL"]
+    params: list = []
+    if grade:
+        where.append(f"grade = {PH}")
+        params.append(grade)
+    if sector:
+        where.append(f"sector = {PH}")
+        params.append(sector)
+    if min_drawdown is not None:
+        where.append(f"ath_drawdown_pct <= {PH}")
+        params.append(-abs(min_drawdown))
+    params.append(limit or config.SCREENER_PAGE_LIMIT)
+
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        # 값 없는 행은 정렬 방향과 무관하게 맨 뒤 (SQLite·PostgreSQL 기본 NULL 순서가 달라 명시)
+        cur.execute(
+            f"""SELECT ticker, name, sector, is_etf, current_price, ath_drawdown_pct, rsi,
+                       forward_pe, peg, buy_ratio_pct, three_year_return, {', '.join(_SCORES)}, fetched_at
+                FROM screener WHERE {' AND '.join(where)}
+                ORDER BY {sort} IS NULL, {sort} {direction}, ticker
+                LIMIT {PH}""",
+            tuple(params),
+        )
+        rows = cur.fetchall()
+    finally:
+        put_conn(conn)
+    return [{**dict(r), "is_etf": bool(r["is_etf"])} for r in rows]
+
+
+def facets() -> dict:
+    """필터 선택지 {"sectors": [...], "grades": [...]} (점수가 있는 종목 기준)."""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT DISTINCT sector FROM screener WHERE total_score IS NOT NULL AND sector <> '' "
+                    "ORDER BY sector")
+        sectors = [r["sector"] for r in cur.fetchall()]
+        cur.execute("SELECT grade, MIN(total_score) AS floor FROM screener WHERE grade IS NOT NULL "
+                    "GROUP BY grade ORDER BY floor DESC")
+        grades = [r["grade"] for r in cur.fetchall()]
+    finally:
+        put_conn(conn)
+    return {"sectors": sectors, "grades": grades}
+
+
+def status() -> dict:
+    """유니버스 크기·점수 매긴 종목 수·갱신 대기 수·최근 1시간 Yahoo 요청 수."""
+    stale_before = time.time() - config.SCREENER_REFRESH_SEC
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"""SELECT COUNT(*) AS universe,
+                       COUNT(total_score) AS scored,
+                       SUM(CASE WHEN fetched_at IS NULL OR fetched_at < {PH} THEN 1 ELSE 0 END) AS due,
+                       COUNT(error) AS failed,
+                       MAX(fetched_at) AS last_fetched
+                FROM screener""",
+            (stale_before,),
+        )
+        row = dict(cur.fetchone())
+    finally:
+        put_conn(conn)
+    row["due"] = int(row["due"] or 0)
+    row["budget_used"] = _used()
+    row["budget_per_hour"] = config.SCREENER_YAHOO_BUDGET_PER_HOUR
+    return row
+
+
+# ── 유니버스 ──────────────────────────────────
+def load_universe(path: str | None = None) -> list[dict]:
+    """구성 종목 파일 → [{"ticker", "name", "sector"}, ...] (중복 티커 제외, 파일 순서 유지)."""
+    path = path or config.SCREENER_UNIVERSE_FILE
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    universe = {}
+    for r in rows:
+        ticker = (r.get("ticker") or "").strip().upper()
+        if ticker and ticker not in universe:
+            universe[ticker] = {"ticker": ticker,
+                                "name": (r.get("name") or ticker).strip(),
+                                "sector": (r.get("sector") or "").strip()}
+    return list(universe.values())
+
+
+def sync_universe(universe: list[dict]) -> int:
+    """screener 테이블을 구성 종목과 맞춤 (신규 행 추가, 빠진 종목 삭제). 삭제 행 수 반환."""
+    tickers = [u["ticker"] for u in universe]
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.executemany(
+            f"""INSERT INTO screener (ticker, name, sector) VALUES ({PH}, {PH}, {PH})
+                ON CONFLICT (ticker) DO NOTHING""",
+            [(u["ticker"], u["name"], u["sector"]) for u in universe],
+        )
+        cur.execute("SELECT ticker FROM screener")
+        keep = set(tickers)
+        removed = [r["ticker"] for r in cur.fetchall() if r["ticker"] not in keep]
+        if removed:
+            cur.executemany(f"DELETE FROM screener WHERE ticker = {PH}", [(t,) for t in removed])
+        conn.commit()
+    finally:
+        put_conn(conn)
+    return len(removed)
+
+
+def due_tickers(limit: int) -> list[str]:
+    """한 번도 조회하지 않았거나 SCREENER_REFRESH_SEC 이 지난 종목 (오래된 순)."""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"""SELECT ticker FROM screener
+                WHERE fetched_at IS NULL OR fetched_at < {PH}
+                ORDER BY COALESCE(fetched_at, 0), ticker LIMIT {PH}""",
+            (time.time() - config.SCREENER_REFRESH_SEC, limit),
+        )
+        rows = cur.fetchall()
+    finally:
+        put_conn(conn)
+    return [r["ticker"] for r in rows]
+
+
+# ── 크롤링 ────────────────────────────────────
+def plan(ticker: str) -> dict:
+    """
+    종목 갱신에 필요한 upstream 조회 (만료된 레이어만).
+    반환: {"technical": bool, "layers": [(캐시 키, loader), ...], "cost": 종목별 Yahoo 요청 수}
+    technical 은 묶음 조회라 배치당 1회로 따로 계산한다.
+    """
+    def expired(name: str) -> bool:
+        entry = cache_get_entry(f"{name}_{ticker}", config.CACHE_TTL[name])
+        return not (entry and entry["data"] and entry["age"] < config.CACHE_TTL[name])
+
+    layers = []
+    # profile·fundamentals 는 info 1회 조회로 함께 저장됨
+    if expired("fundamentals") or expired("profile"):
+        layers.append((f"fundamentals_{ticker}", partial(stock_analysis.fetch_info_layers, ticker)))
+    if expired("analyst"):
+        layers.append((f"analyst_{ticker}", partial(stock_analysis.fetch_analyst, ticker)))
+    return {"technical": expired("technical"), "layers": layers, "cost": len(layers)}
+
+
+def crawl(tickers: list[str]) -> int:
+    """
+    종목 데이터 갱신 → 특성 컬럼 저장. 예상 요청 수(plan)로 예산 안에 드는 앞쪽 종목만 갱신하고
+    실제로 갱신한 종목 수 반환 (예산이 없으면 0). 예산에는 실제 요청 수를 기록하므로
+    예상보다 많이 쓴 배치가 있으면 그만큼 다음 배치가 늦어진다 (초과는 최대 1배치분).
+    """
+    available = config.SCREENER_YAHOO_BUDGET_PER_HOUR - _used()
+    batch, plans, cost = [], {}, 0
+    for ticker in tickers:
+        p = plan(ticker)
+        extra = p["cost"] + (1 if p["technical"] and not any(q["technical"] for q in plans.values()) else 0)
+        if cost + extra > available:
+            break
+        batch.append(ticker)
+        plans[ticker] = p
+        cost += extra
+    if not batch:
+        return 0
+
+    # 예산에는 예상치가 아니라 실제로 나간 요청 수를 기록
+    # (분할·배당 종목 전체 재조회, 묶음 실패 시 종목별 조회 포함 / 다른 워커가 임대 중이라 건너뛴 레이어 제외)
+    with rate_limit.counting() as spent:
+        try:
+            stale_tech = [t for t in batch if plans[t]["technical"]]
+            if stale_tech:
+                stock_analysis.fetch_technical_many(stale_tech)
+            for ticker in batch:
+                for key, loader in plans[ticker]["layers"]:
+                    try:
+                        refresh(key, loader)
+                    except Exception as e:
+                        log.warning("screener fetch failed for %s: %s", key, e)
+        finally:
+            _spend(spent["calls"])
+
+    # 방금 갱신한 캐시로 조립만 (실패한 레이어를 다시 조회하지 않음 → 예산 밖 요청 없음)
+    save_features({ticker: stock_analysis.get_cached_stock_data(ticker) for ticker in batch})
+    log.info("screener crawled %d tickers (%d Yahoo requests, %d planned)", len(batch), spent["calls"], cost)
+    _stop.wait(spent["calls"] * _WINDOW_SEC / max(config.SCREENER_YAHOO_BUDGET_PER_HOUR, 1))   # 요청 분산
+    return len(batch)
+
+
+def save_features(stocks: dict):
+    """{ticker: get_stock_data 결과} → 특성 컬럼·조회 시각 저장. 조회 실패 종목은 error 기록, 점수 제거."""
+    now = time.time()
+    rows = []
+    for ticker, d in stocks.items():
+        error = d.get("error")
+        values = [None if error else _db_value(name, d.get(name)) for name in _FEATURES]
+        rows.append((d.get("name") or ticker, d.get("sector") or "", *values, error, now, ticker))
+
+    assignments = ", ".join(f"{name} = {PH}" for name in _FEATURES)
+    clear_scores = ", ".join(f"{name} = NULL" for name in _SCORES)
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        # 회사명·섹터는 조회 값이 비면 구성 종목 파일 값 유지
+        cur.executemany(
+            f"""UPDATE screener SET
+                    name = COALESCE(NULLIF({PH}, ''), name),
+                    sector = COALESCE(NULLIF({PH}, ''), sector),
+                    {assignments}, error = {PH}, fetched_at = {PH},
+                    {clear_scores}
+                WHERE ticker = {PH}""",
+            rows,
+        )
+        conn.commit()
+    finally:
+        put_conn(conn)
+
+
+def rescore() -> int:
+    """저장된 특성 컬럼 전체를 현재 공포점수·거시 지표로 일괄 채점. 채점한 종목 수 반환."""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(f"SELECT ticker, {', '.join(_FEATURES)} FROM screener "
+                    f"WHERE fetched_at IS NOT NULL AND error IS NULL")
+        rows = cur.fetchall()
+    finally:
+        put_conn(conn)
+    if not rows:
+        return 0
+
+    table = {name: [r[name] for r in rows] for name in _FEATURES}
+    for name in _BOOL_FEATURES:
+        table[name] = np.array([v == 1 for v in table[name]], dtype=bool)
+    fear_score = market_sentiment.get_fear_score()
+    macro = scoring.macro_inputs(market_sentiment.get_yield_curve(), market_sentiment.get_m2())
+    scores = batch_scoring.rows(batch_scoring.score_table(table, fear_score, **macro))
+
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.executemany(
+            f"UPDATE screener SET {', '.join(f'{name} = {PH}' for name in _SCORES)} WHERE ticker = {PH}",
+            [(*(s[name] for name in _SCORES), r["ticker"]) for r, s in zip(rows, scores)],
+        )
+        conn.commit()
+    finally:
+        put_conn(conn)
+    return len(rows)
+
+
+def run_once() -> int:
+    """구성 종목 동기화 → 예산 안에서 오래된 종목부터 갱신 → 전 종목 재채점. 갱신한 종목 수 반환."""
+    sync_universe(load_universe())
+    count = 0
+    while not _stop.is_set() and _is_leader():   # 임대 연장 (긴 주기 동안 다른 프로세스가 가져가지 않게)
+        if rate_limit.is_open():
+            break       # Yahoo throttle 중 → 예산을 쓰지 않고 다음 주기
+        due = due_tickers(config.SCREENER_BATCH_SIZE)
+        if not due:
+            break
+        crawled = crawl(due)
+        if not crawled:
+            break       # 예산 소진 → 다음 주기
+        count += crawled
+    rescore()
+    return count
+
+
+# ── 요청 예산 ─────────────────────────────────
+def _used() -> int:
+    _load_budget()
+    cutoff = time.time() - _WINDOW_SEC
+    with _spent_lock:
+        while _spent and _spent[0][0] < cutoff:
+            _spent.popleft()
+        return sum(n for _, n in _spent)
+
+
+def _spend(n: int):
+    if n <= 0:
+        return
+    with _spent_lock:
+        _spent.append((time.time(), n))
+        snapshot = [list(item) for item in _spent]
+    cache_set(_BUDGET_KEY, {"spent": snapshot})
+
+
+def _load_budget():
+    """최초 1회 캐시에 기록된 사용량 복원 (재시작·담당 워커 교체 대비)."""
+    global _budget_loaded
+    if _budget_loaded:
+        return
+    saved = cache_get_raw(_BUDGET_KEY) or {}
+    with _spent_lock:
+        if not _budget_loaded:
+            _spent.extend((ts, n) for ts, n in saved.get("spent", []))
+            _budget_loaded = True
+
+
+# ── 백그라운드 실행 ───────────────────────────
+def _is_leader() -> bool:
+    """크롤러 임대 획득/연장. 다른 프로세스가 담당 중이면 False."""
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        return lease_acquire(_LEASE_KEY, owner, config.SCREENER_INTERVAL_SEC * 3)
+    except Exception:
+        return False
+
+
+def run_forever():
+    while not _stop.is_set():
+        if _is_leader():
+            try:
+                with rate_limit.background():   # 요청 스레드와 달리 토큰을 기다려도 됨
+                    run_once()
+            except Exception as e:
+                log.warning("screener cycle failed: %s", e)
+        _stop.wait(config.SCREENER_INTERVAL_SEC)
+
+
+def start():
+    """앱 프로세스 안에서 크롤러 데몬 스레드 시작 (프로세스당 1회)."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=run_forever, name="screener", daemon=True)
+    _thread.start()
+
+
+def stop():
+    _stop.set()
+
+
+def _db_value(name: str, value):
+    if name in _BOOL_FEATURES:
+        return None if value is None else int(bool(value))
+    return value
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    compute_pool.start()
+    init_db()
+    try:
+        run_forever()
+    except KeyboardInterrupt:
+        stop()
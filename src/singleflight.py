@@ -0,0 +1,168 @@
+"""
+캐시 미스 요청 병합 (single-flight).
+
+같은 키로 동시에 들어온 캐시 미스는 upstream 조회를 1번만 실행하고
+나머지 요청은 그 결과를 공유한다. (만료 직후 동시 요청 → Yahoo rate limit 방지)
+
+  프로세스 내: 키별 Event로 대기 → 선행 호출 결과를 그대로 반환
+  워커 간:     DB cache_lease 임대를 가진 워커만 조회,
+               나머지 워커는 L2 캐시에 결과가 기록될 때까지 짧게 폴링
+
+stale-while-revalidate:
+  TTL 경과 ~ TTL+max_stale 구간의 값은 즉시 반환하고 백그라운드 갱신 1회 예약.
+  max_stale 을 넘긴 값은 기존처럼 조회 완료까지 기다린다.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from src.db import cache_get, cache_get_entry, lease_acquire, lease_release
+
+log = logging.getLogger(__name__)
+
+_calls: dict = {}        # {key: {"event": Event, "result": ..., "error": Exception | None}}
+_calls_lock = threading.Lock()
+
+_refresh_pool = None     # 백그라운드 갱신 전용 스레드 풀 (지연 생성)
+_refreshing: set = set() # 갱신 예약·진행 중인 키 (중복 예약 방지)
+_refresh_lock = threading.Lock()
+
+
+def _owner() -> str:
+    # 호스트+PID: 여러 서버(dyno)가 같은 DB를 공유해도 구분됨
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def do(key: str, fn):
+    """같은 key의 fn() 동시 호출을 1회로 병합. 대기자는 같은 결과(또는 예외)를 받는다."""
+    with _calls_lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = {"event": threading.Event(), "result": None, "error": None}
+
+    if not leader:
+        call["event"].wait()
+        if call["error"] is not None:
+            raise call["error"]
+        return call["result"]
+
+    try:
+        call["result"] = fn()
+        return call["result"]
+    except Exception as e:
+        call["error"] = e
+        raise
+    finally:
+        with _calls_lock:
+            _calls.pop(key, None)
+        call["event"].set()
+
+
+def cached_fetch(key: str, ttl_seconds: int, loader, max_stale: int = 0):
+    """
+    캐시 조회 → 미스 시 loader()를 프로세스·워커 전체에서 1회만 실행.
+    loader는 upstream 조회 후 cache_set까지 책임진다 (get_* → fetch_* 패턴).
+
+    max_stale > 0 이면 TTL이 지난 값도 max_stale 초까지는 즉시 반환하고
+    백그라운드 갱신을 예약한다. 이때 dict 결과에 신선도 정보를 덧붙인다:
+      cache_stale=True, cache_age_sec=경과 초 (템플릿 표시용)
+    """
+    if max_stale <= 0:
+        cached = cache_get(key, ttl_seconds)
+        if cached:
+            return cached
+        return do(key, lambda: _load_once(key, ttl_seconds, loader))
+
+    entry = cache_get_entry(key, ttl_seconds)
+    if entry and entry["data"]:
+        if entry["fresh"]:
+            return entry["data"]
+        if entry["age"] < ttl_seconds + max_stale:
+            _schedule_refresh(key, ttl_seconds, loader)
+            data = entry["data"]
+            if isinstance(data, dict):
+                data = {**data, "cache_stale": True, "cache_age_sec": int(entry["age"])}
+            return data
+    # 캐시 없음 또는 stale 한도 초과 → 조회 완료까지 대기
+    return do(key, lambda: _load_once(key, ttl_seconds, loader))
+
+
+def _schedule_refresh(key: str, ttl_seconds: int, loader):
+    """키당 1개만 백그라운드 갱신 예약 (이미 진행 중이면 무시)."""
+    global _refresh_pool
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+        if _refresh_pool is None:
+            _refresh_pool = ThreadPoolExecutor(max_workers=config.SWR_REFRESH_WORKERS,
+                                               thread_name_prefix="swr-refresh")
+    _refresh_pool.submit(_run_refresh, key, ttl_seconds, loader)
+
+
+def _run_refresh(key: str, ttl_seconds: int, loader):
+    try:
+        # 키당 1개 예약은 _refreshing 이 보장. 다른 워커가 갱신 중이면 기다리지 않고 포기
+        # (그 결과가 L2로 공유됨)
+        _load_once(key, ttl_seconds, loader, wait=False)
+    except Exception as e:
+        log.warning("background refresh failed for %s: %s", key, e)
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(key)
+
+
+def refresh(key: str, loader):
+    """
+    캐시 신선도와 무관하게 loader()를 강제 실행 (캐시 워머용).
+    같은 키를 다른 스레드가 조회 중이면 그 결과를 공유하고,
+    다른 워커가 임대를 가지고 있으면 기다리지 않고 None 반환.
+    """
+    return do(key, lambda: _run_leased(key, loader, wait=False))
+
+
+def _load_once(key: str, ttl_seconds: int, loader, wait: bool = True):
+    # 대기 중 다른 스레드/워커가 이미 채웠을 수 있음
+    cached = cache_get(key, ttl_seconds)
+    if cached:
+        return cached
+    return _run_leased(key, loader, wait, ttl_seconds)
+
+
+def _run_leased(key: str, loader, wait: bool, ttl_seconds: int | None = None):
+    """워커 간 임대를 얻은 경우에만 loader() 실행. wait=True면 다른 워커의 결과를 L2에서 대기."""
+    owner = _owner()
+    lease_key = f"fetch:{key}"
+    try:
+        acquired = lease_acquire(lease_key, owner, config.SINGLEFLIGHT_LEASE_SEC)
+    except Exception:
+        acquired = True    # 임대 테이블 장애 시 병합 없이 직접 조회
+
+    if not acquired and not wait:
+        return None
+    if not acquired:
+        # 다른 워커가 조회 중 → 결과가 L2에 나타나거나 임대가 풀릴 때까지 대기
+        deadline = time.monotonic() + config.SINGLEFLIGHT_LEASE_SEC
+        while time.monotonic() < deadline:
+            time.sleep(config.SINGLEFLIGHT_POLL_SEC)
+            cached = cache_get(key, ttl_seconds)
+            if cached:
+                return cached
+            try:
+                if lease_acquire(lease_key, owner, config.SINGLEFLIGHT_LEASE_SEC):
+                    break   # 선행 워커가 실패 후 임대 해제 → 직접 조회
+            except Exception:
+                break
+
+    try:
+        return loader()
+    finally:
+        try:
+            lease_release(lease_key, owner)
+        except Exception:
+            pass
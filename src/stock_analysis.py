@@ -1,257 +1,425 @@
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import numpy as np
 import yfinance as yf
 
 import config
-from src.db import cache_get, cache_set, cache_get_raw
-from src import scoring
+from src.db import cache_get, cache_get_entry, cache_set, cache_get_raw
+from src.singleflight import cached_fetch
+from src import batch_analytics, indicators, price_store, rate_limit, scoring, singleflight, thread_pool
+
+
+# ── 종목 데이터: 레이어별 캐시 ──────────────────
+# 변경 주기가 다른 데이터를 따로 캐시하고 읽을 때 하나의 dict로 조립한다.
+#   profile_<T>       회사명·섹터 등       (info)             거의 불변
+#   fundamentals_<T>  PER·ROE·목표가 등    (info)             분기 단위
+#   analyst_<T>       투자의견 등급 집계    (recommendations)  주 단위
+#   technical_<T>     현재가·낙폭·지표·차트 (일봉 저장소)       일 단위
+# profile·fundamentals 는 같은 info 응답에서 나오므로 한 번 조회로 둘 다 저장한다.
+# 보통의 만료는 technical 1개 → upstream 조회 1회 (delta 일봉).
+_LAYERS = ("profile", "fundamentals", "analyst", "technical")
+
+
+def cache_patterns(ticker: str | None = None) -> list[str]:
+    """종목 캐시 키 패턴 (선택 무효화용). ticker 없으면 전 종목."""
+    suffix = ticker.upper().strip() if ticker else "*"
+    return [f"{name}_{suffix}" for name in _LAYERS] + [f"quote_{suffix}"]
 
 
 def get_stock_data(ticker: str) -> dict:
+    """종목 데이터 (레이어별 캐시 조립). 동시 캐시 미스는 레이어별로 1회 조회로 병합."""
     ticker = ticker.upper().strip()
-    key = f"stock_{ticker}"
-    cached = cache_get(key, config.CACHE_TTL["stock"])
-    if cached:
-        return cached
+    loaders = {
+        "profile":      lambda: fetch_info_layers(ticker).get("profile"),
+        "fundamentals": lambda: fetch_info_layers(ticker).get("fundamentals"),
+        "analyst":      lambda: fetch_analyst(ticker),
+        "technical":    lambda: fetch_technical(ticker),
+    }
+    layers = {
+        name: cached_fetch(f"{name}_{ticker}", config.CACHE_TTL[name], loaders[name],
+                           max_stale=config.CACHE_MAX_STALE[name])
+        for name in _LAYERS
+    }
+    return _assemble(ticker, layers)
+
+
+def get_stock_data_many(tickers: list[str]) -> dict:
+    """
+    여러 종목 데이터 {ticker: dict}.
+    technical 레이어가 없거나 stale 한도를 넘은 종목은 fetch_technical_many 로 한 번에 조회
+    (기술적 지표는 행렬 일괄 계산), 나머지 레이어는 종목별 캐시 조회.
+    """
+    ttl = config.CACHE_TTL["technical"]
+    max_stale = config.CACHE_MAX_STALE["technical"]
+    missing = []
+    for ticker in tickers:
+        entry = cache_get_entry(f"technical_{ticker}", ttl)
+        if not (entry and entry["data"] and entry["age"] < ttl + max_stale):
+            missing.append(ticker)
 
-    try:
-        t = yf.Ticker(ticker)
+    if missing:
+        # 같은 종목 묶음의 동시 요청은 1회 조회로 병합
+        flight_key = "technical_" + "_".join(sorted(missing))
+        singleflight.do(flight_key, lambda: fetch_technical_many(missing))
+
+    # Yahoo 요청 속도는 rate_limit 토큰 버킷이 제한 (스레드 수로 조절하지 않음)
+    return dict(zip(tickers, thread_pool.get("stock_data").map(get_stock_data, tickers)))
 
-        # info 조회 — 빈 dict 반환 시 1회 재시도 (배포 서버 rate limit 대응)
-        # Yahoo Finance가 서버 IP를 일시 차단하거나 throttle 시 {} 또는 1개 키 dict 반환
+
+def get_cached_stock_data(ticker: str) -> dict:
+    """캐시된 레이어만으로 조립 (만료 여부 무시, upstream 조회 없음). 조회를 직접 관리하는 스크리너용."""
+    ticker = ticker.upper().strip()
+    return _assemble(ticker, {name: cache_get_raw(f"{name}_{ticker}") for name in _LAYERS})
+
+
+def fetch_info_layers(ticker: str) -> dict:
+    """
+    info 조회 → profile·fundamentals 레이어 저장.
+    반환: {"profile": dict, "fundamentals": dict}, 실패 시 이전 캐시 (없으면 빈 dict)
+    """
+    ticker = ticker.upper().strip()
+
+    # 빈 info({} 또는 1개 키 dict)는 throttle 또는 없는 종목 → 재시도 대기 없이 이전 캐시 반환
+    # (rate_limit 은 감속만 하고 차단기는 열지 않음, 차단 중에는 호출 자체를 건너뜀)
+    try:
+        info = rate_limit.call(lambda: yf.Ticker(ticker).info or {}, is_suspect=rate_limit.is_short_info)
+    except Exception:
         info = {}
-        for _attempt in range(2):
-            try:
-                raw = t.info or {}
-                if len(raw) >= 10:      # 정상 응답: 키 10개 이상
-                    info = raw
-                    break
-                if _attempt == 0:       # 비정상 응답 시 1초 대기 후 재시도
-                    time.sleep(1.0)
-            except Exception:
-                if _attempt == 0:
-                    time.sleep(1.0)
-                else:
-                    raise
-
-        # 가격 이력 (5년, ATH 계산용)
-        hist_5y = t.history(period="5y")
-        if hist_5y.empty:
-            raise ValueError(f"{ticker} 데이터 없음")
-
-        # 현재가: regularMarketPrice(실시간) → currentPrice → 과거 이력 종가 순으로 사용
-        raw_price = (
-            info.get("regularMarketPrice")
-            or info.get("currentPrice")
-            or float(hist_5y["Close"].iloc[-1])
-        )
-        current_price = round(float(raw_price), 2)
-
-        ath = round(float(hist_5y["High"].max()), 2)
-        ath_date = str(hist_5y["High"].idxmax().date())
-        high_52w = round(float(hist_5y["High"].iloc[-252:].max()), 2)
-
-        ath_drawdown = round((current_price - ath) / ath * 100, 1)
-        high_52w_drawdown = round((current_price - high_52w) / high_52w * 100, 1)
-
-        # 이동평균 계산 (5년 전체 기준 → 1년 차트에 정확하게 반영)
-        import pandas as pd
-        import pandas_ta as ta
-        closes_5y = hist_5y["Close"]
-        ma20  = closes_5y.rolling(20).mean()    # 20일 이동평균
-        ma60  = closes_5y.rolling(60).mean()    # 60일 이동평균
-        ma120 = closes_5y.rolling(120).mean()   # 120일 이동평균
-
-        # ── 기술적 지표 계산 ──────────────────────────────
-        # RSI(14): 상대강도지수 — 30이하 과매도, 70이상 과매수
-        rsi_series = ta.rsi(closes_5y, length=14)
-        rsi = None
-        if rsi_series is not None and len(rsi_series) > 0:
-            last_rsi = rsi_series.iloc[-1]
-            rsi = round(float(last_rsi), 1) if not pd.isna(last_rsi) else None
-
-        # MACD(12,26,9): MACD선 > Signal선이면 상승 모멘텀
-        macd_df = ta.macd(closes_5y, fast=12, slow=26, signal=9)
-        macd_bullish = False
-        if macd_df is not None and not macd_df.empty:
-            last_macd   = macd_df["MACD_12_26_9"].iloc[-1]
-            last_signal = macd_df["MACDs_12_26_9"].iloc[-1]
-            if not pd.isna(last_macd) and not pd.isna(last_signal):
-                macd_bullish = bool(last_macd > last_signal)
-
-        # MA 배열 신호: price vs MA20 vs MA60 방향 비교
-        latest_price  = float(closes_5y.iloc[-1])
-        latest_ma20   = float(ma20.iloc[-1])  if not pd.isna(ma20.iloc[-1])  else None
-        latest_ma60   = float(ma60.iloc[-1])  if not pd.isna(ma60.iloc[-1])  else None
-        ma_signal = "neutral"
-        if latest_ma20 is not None and latest_ma60 is not None:
-            if latest_price > latest_ma20 and latest_ma20 > latest_ma60:
-                ma_signal = "bullish"   # 황금 배열 (상승 추세)
-            elif latest_price < latest_ma20 and latest_ma20 < latest_ma60:
-                ma_signal = "bearish"   # 역배열 (하락 추세)
-
-        # 1년 가격·거래량·이동평균 이력 (차트용, 전체 거래일 포함)
-        hist_1y   = hist_5y.iloc[-252:]
-        ma20_1y   = ma20.iloc[-252:]
-        ma60_1y   = ma60.iloc[-252:]
-        ma120_1y  = ma120.iloc[-252:]
-
-        price_history = []
-        for i in range(len(hist_1y)):
-            row = hist_1y.iloc[i]
-            price_history.append({
-                "date":   str(hist_1y.index[i].date()),
-                "close":  round(float(row["Close"]), 2),
-                "volume": int(row["Volume"]),
-                # NaN이면 None (MA 계산 초반 구간)
-                "ma20":   round(float(ma20_1y.iloc[i]),  2) if not pd.isna(ma20_1y.iloc[i])  else None,
-                "ma60":   round(float(ma60_1y.iloc[i]),  2) if not pd.isna(ma60_1y.iloc[i])  else None,
-                "ma120":  round(float(ma120_1y.iloc[i]), 2) if not pd.isna(ma120_1y.iloc[i]) else None,
-            })
 
-        # 펀더멘탈
-        forward_pe        = _safe_round(info.get("forwardPE"))
-        trailing_pe       = _safe_round(info.get("trailingPE"))
-        eps_growth        = _safe_pct(info.get("earningsGrowth"))
-        revenue_growth    = _safe_pct(info.get("revenueGrowth"))
-        free_cash_flow    = info.get("freeCashflow")
-        fcf_positive      = bool(free_cash_flow and free_cash_flow > 0)
+    if not info:
+        # 불완전한 응답은 캐시하지 않음 (회사명 등이 비어 있는 채로 오래 남지 않게)
+        return {name: cache_get_raw(f"{name}_{ticker}") for name in ("profile", "fundamentals")}
+
+    layers = {"profile": _profile_layer(ticker, info), "fundamentals": _fundamentals_layer(info)}
+    for name, data in layers.items():
+        cache_set(f"{name}_{ticker}", data)
+    return layers
+
+
+def fetch_analyst(ticker: str) -> dict | None:
+    """recommendations 조회 → 최근 1개 기간 등급 집계 저장. 실패 시 이전 캐시."""
+    ticker = ticker.upper().strip()
+    key = f"analyst_{ticker}"
+    try:
+        rec = rate_limit.call(lambda: yf.Ticker(ticker).recommendations)
+        counts = {"strong_buy": 0, "buy": 0, "hold": 0, "sell": 0, "strong_sell": 0}
+        if rec is not None and not rec.empty:
+            latest = rec.iloc[-1]
+            counts = {
+                "strong_buy":  int(latest.get("strongBuy", 0)),
+                "buy":         int(latest.get("buy", 0)),
+                "hold":        int(latest.get("hold", 0)),
+                "sell":        int(latest.get("sell", 0)),
+                "strong_sell": int(latest.get("strongSell", 0)),
+            }
+        cache_set(key, counts)
+        return counts
+    except Exception:
+        return cache_get_raw(key)
+
+
+def fetch_technical(ticker: str) -> dict:
+    """일봉 이력(delta 조회) → 현재가·낙폭·기술적 지표·차트 레이어 저장. 실패 시 이전 캐시."""
+    ticker = ticker.upper().strip()
+    key = f"technical_{ticker}"
+    try:
+        hist_5y = _get_history(ticker)
+        current_price = round(float(hist_5y["Close"].iloc[-1]), 2)
+
+        # ── 기술적 지표 (증분 엔진) ──────────────────────
+        # RSI(14)·MACD(12,26,9)·MA20/60/120 상태를 종목별로 저장해 두고 새 봉만 반영
+        # (수정주가로 이력이 바뀌면 엔진이 전체 재계산)
+        tech = {**indicators.update(ticker, hist_5y["Close"]),
+                **_price_levels(hist_5y, current_price)}
+
+        result = _technical_layer(hist_5y, current_price, tech)
+        cache_set(key, result)
+        return result
+
+    except Exception as e:
+        return _fallback(key, e)
+
+
+def fetch_technical_many(tickers: list[str]) -> dict:
+    """
+    여러 종목 technical 레이어 조회 → 종목별 캐시 저장.
+    일봉은 price_store.get_history_many 로 묶어서 조회 (yf.download, 종목별 요청 없음),
+    지표 계산은 batch_analytics 로 전 종목을 한 번에 처리 (GIL 경합 없음).
+    """
+    results = {}
+    histories = {}
+    try:
+        fetched = price_store.get_history_many(tickers)
+    except Exception as e:
+        fetched = {}
+        for ticker in tickers:
+            results[ticker] = _fallback(f"technical_{ticker}", e)
+    for ticker, hist in fetched.items():
+        if hist.empty:
+            results[ticker] = _fallback(f"technical_{ticker}", ValueError(f"{ticker} 데이터 없음"))
+        else:
+            histories[ticker] = hist
+    if not histories:
+        return results
+
+    prices = {ticker: round(float(hist["Close"].iloc[-1]), 2) for ticker, hist in histories.items()}
+    techs = batch_analytics.compute(histories, prices)
+    for ticker, hist_5y in histories.items():
+        try:
+            result = _technical_layer(hist_5y, prices[ticker], techs[ticker])
+            cache_set(f"technical_{ticker}", result)
+            results[ticker] = result
+        except Exception as e:
+            results[ticker] = _fallback(f"technical_{ticker}", e)
+    return results
+
+
+# ── 레이어 구성 ─────────────────────────────────
+def _get_history(ticker: str):
+    # 가격 이력 (5년, ATH 계산용) — 로컬 일봉 저장소 + 마지막 저장일 이후만 delta 조회
+    hist_5y = price_store.get_history(ticker)
+    if hist_5y.empty:
+        raise ValueError(f"{ticker} 데이터 없음")
+    return hist_5y
+
+
+def _price_levels(hist_5y, current_price: float) -> dict:
+    """ATH·52주 고점과 현재가 기준 낙폭."""
+    ath = round(float(hist_5y["High"].max()), 2)
+    high_52w = round(float(hist_5y["High"].iloc[-252:].max()), 2)
+    return {
+        "ath":                   ath,
+        "ath_date":              str(hist_5y["High"].idxmax().date()),
+        "high_52w":              high_52w,
+        "ath_drawdown_pct":      round((current_price - ath) / ath * 100, 1),
+        "high_52w_drawdown_pct": round((current_price - high_52w) / high_52w * 100, 1),
+    }
+
+
+def _profile_layer(ticker: str, info: dict) -> dict:
+    return {
+        "name":     info.get("longName") or info.get("shortName") or ticker,
+        "currency": info.get("currency", "USD"),
+        "sector":   info.get("sector", ""),
+        "industry": info.get("industry", ""),
+        "is_etf":   info.get("quoteType", "").upper() == "ETF",
+    }
+
+
+def _fundamentals_layer(info: dict) -> dict:
+    # 부채비율: yfinance는 D/E를 백분율(×100)로 반환하므로 ÷100해서 실제 비율로 변환
+    # 예: yfinance 432.51 → 실제 D/E 4.33배
+    _raw_de = info.get("debtToEquity")
+    free_cash_flow = info.get("freeCashflow")
+    return {
+        "forward_pe":         _safe_round(info.get("forwardPE")),
+        "trailing_pe":        _safe_round(info.get("trailingPE")),
+        "eps_growth_pct":     _safe_pct(info.get("earningsGrowth")),
+        "revenue_growth_pct": _safe_pct(info.get("revenueGrowth")),
+        "free_cash_flow":     free_cash_flow,
+        "fcf_positive":       bool(free_cash_flow and free_cash_flow > 0),
         # ROE: 자기자본이익률 (%) — 높을수록 자본 효율성 좋음
-        roe = _safe_pct(info.get("returnOnEquity"))
+        "roe":                _safe_pct(info.get("returnOnEquity")),
         # PEG: PER ÷ EPS성장률 — 1 미만이면 성장 대비 저평가
-        peg = _safe_round(info.get("trailingPegRatio") or info.get("pegRatio"), 2)
+        "peg":                _safe_round(info.get("trailingPegRatio") or info.get("pegRatio"), 2),
         # P/S: 주가매출비율 — 낮을수록 매출 대비 저평가
-        price_to_sales = _safe_round(info.get("priceToSalesTrailing12Months"), 2)
+        "price_to_sales":     _safe_round(info.get("priceToSalesTrailing12Months"), 2),
         # 부채비율: 자본 대비 총부채 — 낮을수록 재무건전
-        # yfinance는 D/E를 백분율(×100)로 반환하므로 ÷100해서 실제 비율로 변환
-        # 예: yfinance 432.51 → 실제 D/E 4.33배
-        _raw_de = info.get("debtToEquity")
-        debt_to_equity = _safe_round(_raw_de / 100, 2) if _raw_de is not None else None
+        "debt_to_equity":     _safe_round(_raw_de / 100, 2) if _raw_de is not None else None,
         # 유동비율: 유동자산÷유동부채 — 1 이상이면 단기 채무 감당 가능
-        current_ratio  = _safe_round(info.get("currentRatio"), 2)
-
-        # 애널리스트 의견 (info 기반)
-        analyst_count   = info.get("numberOfAnalystOpinions", 0) or 0
-        target_price    = _safe_round(info.get("targetMeanPrice"))
-        upside_pct      = None
-        if target_price and current_price:
-            upside_pct = round((target_price - current_price) / current_price * 100, 1)
-
-        # recommendations DataFrame → 최근 등급 집계
-        strong_buy = buy = hold = sell = strong_sell = 0
-        buy_ratio  = None
-        try:
-            rec = t.recommendations
-            if rec is not None and not rec.empty:
-                # 최근 1개 기간
-                latest = rec.iloc[-1]
-                strong_buy   = int(latest.get("strongBuy", 0))
-                buy          = int(latest.get("buy", 0))
-                hold         = int(latest.get("hold", 0))
-                sell         = int(latest.get("sell", 0))
-                strong_sell  = int(latest.get("strongSell", 0))
-                total = strong_buy + buy + hold + sell + strong_sell
-                if total > 0:
-                    analyst_count = total
-                    buy_ratio = round((strong_buy + buy) / total * 100, 1)
-        except Exception:
-            pass
-
-        is_etf = (info.get("quoteType", "").upper() == "ETF")
-
+        "current_ratio":      _safe_round(info.get("currentRatio"), 2),
+        # 애널리스트 의견 (info 기반) — recommendations 등급이 없을 때의 의견 수
+        "analyst_count":      info.get("numberOfAnalystOpinions", 0) or 0,
+        "target_price":       _safe_round(info.get("targetMeanPrice")),
         # ETF 전용 지표
         # ytdReturn: yfinance 1.x 에서 이미 % 단위 반환 (1.22 = 1.22%)
         #            threeYearAverageReturn은 decimal (0.27 = 27%) — 단위 불일치 주의
-        ytd_return        = _safe_round(info.get("ytdReturn"), 2)
-        three_year_return = _safe_pct(info.get("threeYearAverageReturn"))
-        total_assets      = info.get("totalAssets")   # AUM (달러)
-
-        result = {
-            "ticker":          ticker,
-            "name":            info.get("longName") or info.get("shortName") or ticker,
-            "current_price":   current_price,
-            "currency":        info.get("currency", "USD"),
-            "sector":          info.get("sector", ""),
-            "industry":        info.get("industry", ""),
-            "is_etf":          is_etf,
-            "ytd_return":      ytd_return,
-            "three_year_return": three_year_return,
-            "total_assets":    total_assets,
-            # 낙폭
-            "ath":                   ath,
-            "ath_date":              ath_date,
-            "high_52w":              high_52w,
-            "ath_drawdown_pct":      ath_drawdown,
-            "high_52w_drawdown_pct": high_52w_drawdown,
-            # 펀더멘탈
-            "forward_pe":        forward_pe,
-            "trailing_pe":       trailing_pe,
-            "eps_growth_pct":    eps_growth,
-            "revenue_growth_pct": revenue_growth,
-            "free_cash_flow":    free_cash_flow,
-            "fcf_positive":      fcf_positive,
-            "roe":               roe,              # 자기자본이익률 (%)
-            "peg":               peg,              # PER/EPS성장률
-            "price_to_sales":    price_to_sales,   # 주가매출비율
-            "debt_to_equity":    debt_to_equity,   # 부채비율 (D/E)
-            "current_ratio":     current_ratio,    # 유동비율
-            # 기술적 지표
-            "rsi":               rsi,              # RSI(14) 최신값
-            "macd_bullish":      macd_bullish,     # MACD > Signal 여부
-            "ma_signal":         ma_signal,        # bullish/bearish/neutral
-            # 애널리스트
-            "analyst_count":    analyst_count,
-            "strong_buy":       strong_buy,
-            "buy":              buy,
-            "hold":             hold,
-            "sell":             sell,
-            "strong_sell":      strong_sell,
-            "buy_ratio_pct":    buy_ratio,
-            "target_price":     target_price,
-            "target_upside_pct": upside_pct,
-            # 차트
-            "price_history": price_history,
-            "updated": datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC"),
-            "error": None,
-        }
-        cache_set(key, result)
-        return result
-
-    except Exception as e:
-        fallback = cache_get_raw(key)
-        if fallback:
-            return fallback
+        "ytd_return":         _safe_round(info.get("ytdReturn"), 2),
+        "three_year_return":  _safe_pct(info.get("threeYearAverageReturn")),
+        "total_assets":       info.get("totalAssets"),   # AUM (달러)
+    }
+
+
+def _technical_layer(hist_5y, current_price: float, tech: dict) -> dict:
+    # 1년 가격·거래량·이동평균 이력 (차트용, 전체 거래일 포함)
+    # 컬럼 단위 리스트: {"date": [...], "close": [...], ...} — 행마다 dict를 만들지 않고
+    # 벡터 연산으로 반올림·NaN→None 변환 (캐시·응답 크기도 감소)
+    hist_1y = hist_5y.iloc[-252:]
+    price_history = {
+        "date":   hist_1y.index.strftime("%Y-%m-%d").tolist(),
+        "close":  _to_list(hist_1y["Close"]),
+        "volume": hist_1y["Volume"].fillna(0).astype("int64").tolist(),
+        # MA 계산 초반 구간은 None
+        "ma20":   _align(tech["ma_series"]["ma20"], len(hist_1y)),
+        "ma60":   _align(tech["ma_series"]["ma60"], len(hist_1y)),
+        "ma120":  _align(tech["ma_series"]["ma120"], len(hist_1y)),
+    }
+    return {
+        "current_price":         current_price,
+        # 낙폭
+        "ath":                   tech["ath"],
+        "ath_date":              tech["ath_date"],
+        "high_52w":              tech["high_52w"],
+        "ath_drawdown_pct":      tech["ath_drawdown_pct"],
+        "high_52w_drawdown_pct": tech["high_52w_drawdown_pct"],
+        # 기술적 지표
+        "rsi":                   tech["rsi"],            # RSI(14) — 30이하 과매도, 70이상 과매수
+        "macd_bullish":          tech["macd_bullish"],   # MACD > Signal 여부
+        "ma_signal":             tech["ma_signal"],      # bullish/bearish/neutral
+        # 차트
+        "price_history":         price_history,
+        "updated":               datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC"),
+    }
+
+
+def _assemble(ticker: str, layers: dict) -> dict:
+    """레이어 dict들 → 기존 get_stock_data 결과 형태. technical 이 없으면 오류 표시 dict."""
+    tech = layers["technical"]
+    if not tech or tech.get("error"):
         return {
-            "ticker": ticker, "name": ticker,
-            "current_price": None, "error": str(e),
+            "ticker": ticker, "name": (layers["profile"] or {}).get("name", ticker),
+            "current_price": None, "error": (tech or {}).get("error") or f"{ticker} 데이터 없음",
             "ath_drawdown_pct": None, "buy_ratio_pct": None,
             "forward_pe": None, "fcf_positive": None,
         }
+    profile = layers["profile"] or {}
+    fund = layers["fundamentals"] or {}
+    analyst = layers["analyst"] or {}
+
+    current_price = tech["current_price"]
+    target_price = fund.get("target_price")
+    upside_pct = None
+    if target_price and current_price:
+        upside_pct = round((target_price - current_price) / current_price * 100, 1)
+
+    # recommendations 등급이 있으면 그 합계를 의견 수로 사용
+    counts = [analyst.get(k, 0) for k in ("strong_buy", "buy", "hold", "sell", "strong_sell")]
+    strong_buy, buy, hold, sell, strong_sell = counts
+    analyst_count = fund.get("analyst_count", 0)
+    buy_ratio = None
+    total = sum(counts)
+    if total > 0:
+        analyst_count = total
+        buy_ratio = round((strong_buy + buy) / total * 100, 1)
+
+    result = {
+        "ticker":            ticker,
+        "name":              profile.get("name", ticker),
+        "current_price":     current_price,
+        "currency":          profile.get("currency", "USD"),
+        "sector":            profile.get("sector", ""),
+        "industry":          profile.get("industry", ""),
+        "is_etf":            profile.get("is_etf", False),
+        "ytd_return":        fund.get("ytd_return"),
+        "three_year_return": fund.get("three_year_return"),
+        "total_assets":      fund.get("total_assets"),
+        # 낙폭
+        "ath":                   tech["ath"],
+        "ath_date":              tech["ath_date"],
+        "high_52w":              tech["high_52w"],
+        "ath_drawdown_pct":      tech["ath_drawdown_pct"],
+        "high_52w_drawdown_pct": tech["high_52w_drawdown_pct"],
+        # 펀더멘탈
+        "forward_pe":         fund.get("forward_pe"),
+        "trailing_pe":        fund.get("trailing_pe"),
+        "eps_growth_pct":     fund.get("eps_growth_pct"),
+        "revenue_growth_pct": fund.get("revenue_growth_pct"),
+        "free_cash_flow":     fund.get("free_cash_flow"),
+        "fcf_positive":       fund.get("fcf_positive", False),
+        "roe":                fund.get("roe"),              # 자기자본이익률 (%)
+        "peg":                fund.get("peg"),              # PER/EPS성장률
+        "price_to_sales":     fund.get("price_to_sales"),   # 주가매출비율
+        "debt_to_equity":     fund.get("debt_to_equity"),   # 부채비율 (D/E)
+        "current_ratio":      fund.get("current_ratio"),    # 유동비율
+        # 기술적 지표
+        "rsi":               tech["rsi"],            # RSI(14) 최신값
+        "macd_bullish":      tech["macd_bullish"],   # MACD > Signal 여부
+        "ma_signal":         tech["ma_signal"],      # bullish/bearish/neutral
+        # 애널리스트
+        "analyst_count":     analyst_count,
+        "strong_buy":        strong_buy,
+        "buy":               buy,
+        "hold":              hold,
+        "sell":              sell,
+        "strong_sell":       strong_sell,
+        "buy_ratio_pct":     buy_ratio,
+        "target_price":      target_price,
+        "target_upside_pct": upside_pct,
+        # 차트
+        "price_history": tech["price_history"],
+        "updated":       tech["updated"],
+        "error":         None,
+    }
+
+    # stale-while-revalidate 로 만료 레이어를 서빙 중이면 표시 (가장 오래된 레이어 기준)
+    stale = [layer for layer in layers.values() if isinstance(layer, dict) and layer.get("cache_stale")]
+    if stale:
+        result["cache_stale"] = True
+        result["cache_age_sec"] = max(layer["cache_age_sec"] for layer in stale)
+    return result
+
+
+def _fallback(key: str, e: Exception) -> dict:
+    """조회 실패 시 이전 캐시, 없으면 오류 표시 dict (캐시하지 않음)."""
+    fallback = cache_get_raw(key)
+    if fallback:
+        return fallback
+    return {"error": str(e)}
 
 
 def get_batch_prices(tickers: list[str]) -> dict:
     """
     여러 종목 현재가를 한 번의 API 호출로 가져오는 배치 함수.
     프리마켓·애프터마켓 포함(prepost=True).
-    캐시 키: price_batch, TTL: 10초
+    캐시 키: 종목별 quote_<TICKER>, TTL: 10초
+      → 캐시에 없거나 만료된 종목만 모아서 yf.download 1회로 조회 후 병합
+        (watchlist 구성이 바뀌어도 나머지 종목 캐시는 그대로 재사용)
+
+    반환: {ticker: {"price": float, "prev_close": float, "change_pct": float, "version": int}, ...}
+          조회 실패 종목은 None
+    """
+    quotes = get_batch_quotes(tickers)
+    # 실패 표시({"price": None})는 10초간 캐시해 재시도 폭주를 막고, 응답에는 None으로 반환
+    return {t: q if q.get("price") is not None else None for t, q in quotes.items()}
 
-    반환: {ticker: {"price": float, "prev_close": float, "change_pct": float}, ...}
+
+def get_batch_quotes(tickers: list[str]) -> dict:
+    """
+    get_batch_prices 의 원본 스냅샷 — 실패 종목도 {"price": None, ...} 형태로 포함.
+    version: 값이 마지막으로 바뀐 시각 (ms). 같은 값으로 재조회되면 유지된다.
     """
     if not tickers:
         return {}
+    tickers = list(dict.fromkeys(t.upper().strip() for t in tickers))
 
-    cache_key = "price_batch_" + "_".join(sorted(tickers))
-    cached = cache_get(cache_key, config.CACHE_TTL["price"])
-    if cached:
-        return cached
+    quotes = {}
+    missing = []
+    for ticker in tickers:
+        cached = cache_get(f"quote_{ticker}", config.CACHE_TTL["price"])
+        if cached:
+            quotes[ticker] = cached
+        else:
+            missing.append(ticker)
+
+    if missing:
+        # 같은 종목 묶음의 동시 요청은 1회 다운로드로 병합
+        flight_key = "quotes_" + "_".join(sorted(missing))
+        quotes.update(singleflight.do(flight_key, lambda: _fetch_quotes(missing)))
+
+    empty = {"price": None, "prev_close": None, "change_pct": None, "version": 0}
+    return {ticker: quotes.get(ticker) or empty for ticker in tickers}
 
+
+def _fetch_quotes(tickers: list[str]) -> dict:
+    """yf.download 1회로 여러 종목 현재가 조회 → 종목별 quote_<TICKER> 캐시 저장."""
     result = {}
     try:
         # 여러 종목을 한 번에 다운로드 (prepost=True: 프리/애프터마켓 포함)
         ticker_str = " ".join(tickers)
-        hist = yf.download(
+        hist = rate_limit.call(
+            yf.download,
             ticker_str,
             period="2d",           # 2일치 (전일 종가 비교용)
             interval="1m",
@@ -277,9 +445,6 @@ def get_batch_prices(tickers: list[str]) -> dict:
                 current = round(float(df["Close"].dropna().iloc[-1]), 2)
 
                 # 전일 정규 종가: 어제 데이터의 마지막 종가
-                today = df.index[-1].date()
-                prev_df = df[df.index.normalize().date < today] if hasattr(df.index[0], 'date') else df
-                # 날짜 기준 전일 종가 계산
                 prev_close = None
                 try:
                     dates = df.index.normalize()
@@ -305,20 +470,50 @@ def get_batch_prices(tickers: list[str]) -> dict:
             except Exception:
                 result[ticker] = None
 
+    except rate_limit.YahooThrottled:
+        pass        # throttle 중에는 개별 조회 폴백도 하지 않음 (아래에서 실패 표시로 캐시)
     except Exception:
         # 배치 실패 시 개별 조회로 폴백
         for ticker in tickers:
             try:
-                fi = yf.Ticker(ticker).fast_info
-                price = getattr(fi, "last_price", None) or getattr(fi, "previous_close", None)
+                fi = yf.Ticker(ticker).fast_info   # 속성 접근 시 조회
+                price = rate_limit.call(lambda: getattr(fi, "last_price", None) or getattr(fi, "previous_close", None))
                 result[ticker] = {"price": round(float(price), 2), "prev_close": None, "change_pct": None} if price else None
             except Exception:
                 result[ticker] = None
 
-    cache_set(cache_key, result)
+    for ticker in tickers:
+        if result.get(ticker) is None:
+            result[ticker] = {"price": None, "prev_close": None, "change_pct": None}
+        result[ticker] = _with_version(ticker, result[ticker])
+        cache_set(f"quote_{ticker}", result[ticker])
     return result
 
 
+# ── 현재가 스냅샷 버전 ──────────────────────────
+# 값이 바뀐 종목만 새 버전(ms 타임스탬프)을 받는다 → /api/prices 의 ETag·?since= 델타 응답에 사용
+# 버전은 조회한 워커의 시계로 매기므로 워커 간 순서는 보장되지 않음 (PRICES_SINCE_SLACK_SEC 로 보정)
+_QUOTE_FIELDS = ("price", "prev_close", "change_pct")
+_version_lock = threading.Lock()
+_last_version = 0
+
+
+def _next_version() -> int:
+    """단조 증가 버전 (같은 ms 안에서도 증가)."""
+    global _last_version
+    with _version_lock:
+        _last_version = max(int(time.time() * 1000), _last_version + 1)
+        return _last_version
+
+
+def _with_version(ticker: str, quote: dict) -> dict:
+    """직전 스냅샷과 값이 같으면 버전 유지, 달라졌으면 새 버전."""
+    prev = cache_get_raw(f"quote_{ticker}")
+    if prev and prev.get("version") and all(prev.get(k) == quote.get(k) for k in _QUOTE_FIELDS):
+        return {**quote, "version": prev["version"]}
+    return {**quote, "version": _next_version()}
+
+
 def get_live_prices(tickers: list[str]) -> dict:
     """
     여러 종목의 현재가를 병렬로 빠르게 가져오는 함수.
@@ -332,15 +527,15 @@ def get_live_prices(tickers: list[str]) -> dict:
         if cached:
             return ticker, cached.get("price")
         try:
-            hist = yf.Ticker(ticker).history(
+            hist = rate_limit.call(lambda: yf.Ticker(ticker).history(
                 period="1d", interval="1m", prepost=True
-            )
+            ))
             price = float(hist["Close"].iloc[-1]) if not hist.empty else None
 
             if not price:
-                price = getattr(yf.Ticker(ticker).fast_info, "last_price", None)
+                price = rate_limit.call(lambda: getattr(yf.Ticker(ticker).fast_info, "last_price", None))
             if not price:
-                price = getattr(yf.Ticker(ticker).fast_info, "previous_close", None)
+                price = rate_limit.call(lambda: getattr(yf.Ticker(ticker).fast_info, "previous_close", None))
 
             if price:
                 price = round(float(price), 2)
@@ -350,30 +545,29 @@ def get_live_prices(tickers: list[str]) -> dict:
             return ticker, None
 
     # 모든 티커 병렬 조회
-    with ThreadPoolExecutor(max_workers=min(len(tickers), 8)) as ex:
-        return dict(ex.map(_fetch_one, tickers))
+    return dict(thread_pool.get("live_prices").map(_fetch_one, tickers))
 
 
 def enrich_watchlist(tickers: list[str], fear_score: int,
                      yield_spread=None, m2_yoy=None,
-                     m2_consecutive: int = 1) -> list[dict]:
+                     m2_consecutive: int = 1, stock_data: dict | None = None) -> list[dict]:
     """
     Watchlist 종목 전체 데이터 수집 + 추천 점수, 점수 내림차순 정렬.
 
-    초기 렌더링은 6시간 캐시 데이터를 병렬 조회 → 즉시 반환.
+    초기 렌더링은 6시간 캐시 데이터 → 즉시 반환, 캐시 미스 종목만 일괄 조회.
     실시간 가격은 /api/prices AJAX(10초)가 담당하므로 live_prices 불필요.
+    stock_data 를 넘기면 (get_stock_data_many 결과) 조회 없이 점수만 계산.
     """
     if not tickers:
         return []
 
-    # 모든 종목 데이터를 동시에 병렬 조회 (캐시 적중 시 즉시 반환)
-    # workers=4: 8에서 줄임 — Yahoo Finance rate limit 방지 (동시 info 요청 최소화)
-    with ThreadPoolExecutor(max_workers=min(len(tickers), 4)) as ex:
-        stock_futures = {ticker: ex.submit(get_stock_data, ticker) for ticker in tickers}
+    # 캐시 적중 종목은 즉시, 미스 종목은 한 번에 조회 (지표는 행렬 일괄 계산)
+    if stock_data is None:
+        stock_data = get_stock_data_many(tickers)
 
     results = []
     for ticker in tickers:
-        data = stock_futures[ticker].result()
+        data = stock_data[ticker]
         score_data = scoring.calc_recommendation_score(fear_score, data,
                                                        yield_spread=yield_spread,
                                                        m2_yoy=m2_yoy,
@@ -384,6 +578,18 @@ def enrich_watchlist(tickers: list[str], fear_score: int,
     return results
 
 
+def _to_list(series, digits=2) -> list:
+    """Series → 반올림된 float 리스트 (NaN은 None). JSON 직렬화용."""
+    arr = series.to_numpy(dtype=float).round(digits)
+    return np.where(np.isnan(arr), None, arr).tolist()
+
+
+def _align(values: list, n: int) -> list:
+    """지표 시리즈를 차트 길이 n에 맞춤 (앞쪽 부족분은 None)."""
+    values = values[-n:]
+    return [None] * (n - len(values)) + values
+
+
 def _safe_round(val, digits=2):
     try:
         return round(float(val), digits) if val is not None else None
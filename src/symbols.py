@@ -0,0 +1,288 @@
+"""
+종목 심볼 색인 — /api/search 타이핑 검색을 로컬에서 처리.
+
+  상장 종목 파일(SYMBOLS_FILE, ticker,name,exchange,asset_type)을 처음 검색할 때 메모리 색인으로 올림
+    - 티커: 정렬 리스트 + bisect → 접두어 검색
+    - 종목명: 단어 시작 위치부터의 소문자 접미 문자열 정렬 리스트 → 단어 접두어 검색 ("bank of" 도 가능)
+    - 종목명 전체: 소문자 연결 문자열 1개 → 부분 문자열 검색 (str.find)
+  순위: 티커 일치 > 티커 접두어(짧은 순) > 종목명 단어 접두어 > 종목명 부분 문자열
+
+  로컬에 결과가 하나도 없는 검색어만 Yahoo 검색을 호출하고 결과를 캐시(symbol_search_*)에 저장
+    - Yahoo 호출은 rate_limit 관문을 거침 → 차단기가 열려 있으면 기다리지 않고 빈 결과
+    - 같은 검색어 동시 요청은 single-flight 로 1회만 호출
+    - 검색어마다 키가 생기므로 TTL 이 지난 결과는 SYMBOL_SEARCH_PURGE_SEC 마다 L1·L2 에서 삭제
+
+상장 종목 파일 갱신 (NASDAQ Trader 심볼 디렉터리 전체 → SYMBOLS_FILE 교체):
+  python -m src.symbols
+"""
+import bisect
+import csv
+import heapq
+import logging
+import os
+import threading
+import time
+
+import config
+from src import http_client, rate_limit
+from src.db import cache_purge, cache_set
+from src.singleflight import cached_fetch
+
+log = logging.getLogger(__name__)
+
+_YAHOO_SEARCH_URL = "https://query1.finance.yahoo.com/v1/finance/search"
+_LISTING_URLS = {
+    "nasdaq": "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt",
+    "other":  "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt",
+}
+# otherlisted.txt 의 거래소 코드
+_EXCHANGES = {"A": "NYSE American", "N": "NYSE", "P": "NYSE Arca", "Z": "Cboe BZX", "V": "IEX"}
+_NAME_SUFFIXES = (" common stock", " ordinary shares", " common shares", " american depositary shares")
+_MAX_QUERY_LEN = 50
+_END = "\uffff"        # 접두어 범위 상한 (어떤 문자보다 큼)
+
+_lock = threading.Lock()
+_index: dict | None = None  # 교체는 통째로 (검색 중인 스레드는 이전 색인을 계속 사용)
+_last_purge = 0.0
+
+
+def search(query: str, limit: int = 8) -> list[dict]:
+    """
+    검색어 → [{"ticker", "name", "exchange", "asset_type"}, ...] (최대 limit 개).
+    로컬 색인에 없을 때만 Yahoo 검색 (결과 캐시, 실패 시 빈 리스트).
+    """
+    query = query.strip()[:_MAX_QUERY_LEN]
+    if not query:
+        return []
+    results = _search_local(_get_index(), query, limit)
+    if results:
+        return results
+    return _search_remote(query)[:limit]
+
+
+def reload() -> int:
+    """상장 종목 파일을 다시 읽어 색인 교체. 종목 수 반환."""
+    global _index
+    index = _build(_load(config.SYMBOLS_FILE))
+    with _lock:
+        _index = index
+    return len(index["tickers"])
+
+
+def stats() -> dict:
+    index = _index
+    return {"loaded": index is not None, "symbols": len(index["tickers"]) if index else 0}
+
+
+# ── 로컬 색인 ─────────────────────────────────
+def _get_index() -> dict:
+    global _index
+    index = _index
+    if index is None:
+        with _lock:
+            if _index is None:
+                _index = _build(_load(config.SYMBOLS_FILE))
+            index = _index
+    return index
+
+
+def _load(path: str) -> list[dict]:
+    """상장 종목 파일 → [{"ticker", "name", "exchange", "asset_type"}, ...] (중복 티커 제외)."""
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    except OSError as e:
+        log.warning("symbol listing unavailable (%s): %s", path, e)
+        return []
+    entries = {}
+    for r in rows:
+        ticker = (r.get("ticker") or "").strip().upper()
+        if ticker and ticker not in entries:
+            entries[ticker] = {"ticker":     ticker,
+                               "name":       (r.get("name") or ticker).strip(),
+                               "exchange":   (r.get("exchange") or "").strip(),
+                               "asset_type": "etf" if (r.get("asset_type") or "").strip().lower() == "etf"
+                                             else "stock"}
+    return list(entries.values())
+
+
+def _build(entries: list[dict]) -> dict:
+    by_ticker = {e["ticker"]: e for e in entries}
+    words = []          # (종목명 단어 시작부터의 소문자 문자열, 단어 순번, 티커)
+    names = []
+    for e in entries:
+        name = e["name"].lower()
+        names.append(name)
+        pos = 0
+        for i, word in enumerate(name.split()):
+            pos = name.index(word, pos)
+            words.append((name[pos:], i, e["ticker"]))
+            pos += len(word)
+    words.sort()
+
+    offsets, start = [], 0
+    for name in names:
+        offsets.append(start)
+        start += len(name) + 1
+    return {
+        "tickers":   sorted(by_ticker),
+        "by_ticker": by_ticker,
+        "words":     words,
+        "blob":      "\n".join(names),          # 부분 문자열 검색용 (줄 = 종목 1개)
+        "offsets":   offsets,
+        "order":     [e["ticker"] for e in entries],
+    }
+
+
+def _search_local(index: dict, query: str, limit: int) -> list[dict]:
+    by_ticker = index["by_ticker"]
+    upper, lower = query.upper(), query.lower()
+    found = []
+
+    def add(tickers):
+        for t in tickers:
+            if t not in found:
+                found.append(t)
+                if len(found) >= limit:
+                    return True
+        return False
+
+    # 1) 티커 일치 → 2) 티커 접두어 (짧은 티커 우선)
+    tickers = index["tickers"]
+    lo = bisect.bisect_left(tickers, upper)
+    hi = bisect.bisect_left(tickers, upper + _END, lo)
+    if add(heapq.nsmallest(limit, tickers[lo:hi], key=len)):
+        return [by_ticker[t] for t in found]
+
+    # 3) 종목명 단어 접두어 (앞쪽 단어·짧은 종목명 우선)
+    words = index["words"]
+    lo = bisect.bisect_left(words, (lower,))
+    hi = bisect.bisect_left(words, (lower + _END,), lo)
+    matches = heapq.nsmallest(limit * 2, words[lo:hi], key=lambda w: (w[1], len(by_ticker[w[2]]["name"])))
+    if add(w[2] for w in matches):
+        return [by_ticker[t] for t in found]
+
+    # 4) 종목명 부분 문자열
+    blob, offsets, order = index["blob"], index["offsets"], index["order"]
+    pos = blob.find(lower)
+    while pos >= 0:
+        row = bisect.bisect_right(offsets, pos) - 1
+        if add((order[row],)):
+            break
+        pos = blob.find(lower, offsets[row + 1] if row + 1 < len(offsets) else len(blob))
+    return [by_ticker[t] for t in found]
+
+
+# ── Yahoo 검색 (로컬에 없는 검색어) ─────────────
+def _search_remote(query: str) -> list[dict]:
+    key = f"symbol_search_{query.lower()}"
+    try:
+        return cached_fetch(key, config.SYMBOL_SEARCH_TTL, lambda: _fetch_remote(key, query))["results"]
+    except Exception as e:
+        # throttle·타임아웃 → 빈 결과 (타이핑 중 다음 입력에서 다시 시도)
+        log.info("symbol search fallback failed for %r: %s", query, e)
+        return []
+
+
+def _fetch_remote(key: str, query: str) -> dict:
+    def get():
+        resp = http_client.get(
+            _YAHOO_SEARCH_URL,
+            params={"q": query, "quotesCount": 8, "newsCount": 0, "listsCount": 0},
+            # Yahoo Finance가 일반 브라우저 요청처럼 인식하게 처리
+            headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"},
+            timeout=config.HTTP_SEARCH_TIMEOUT,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    data = rate_limit.call(get)
+    results = []
+    for q in data.get("quotes", []):
+        # 주식(EQUITY)과 ETF만
+        q_type = q.get("quoteType", "")
+        if q_type not in ("EQUITY", "ETF"):
+            continue
+        results.append({
+            "ticker":     q.get("symbol", ""),
+            "name":       q.get("longname") or q.get("shortname") or q.get("symbol", ""),
+            "exchange":   q.get("exchange", ""),
+            "asset_type": "etf" if q_type == "ETF" else "stock",
+        })
+    # 결과 없음도 저장 → 같은 검색어로 다시 Yahoo 를 부르지 않음
+    value = {"results": results}
+    cache_set(key, value)
+    _purge_expired()
+    return value
+
+
+def _purge_expired():
+    """TTL 이 지난 검색 결과 삭제 (프로세스당 SYMBOL_SEARCH_PURGE_SEC 마다 1회, 새 검색어 조회 시점에)."""
+    global _last_purge
+    now = time.monotonic()
+    with _lock:
+        if now - _last_purge < config.SYMBOL_SEARCH_PURGE_SEC:
+            return
+        _last_purge = now
+    try:
+        cache_purge("symbol_search_", config.SYMBOL_SEARCH_TTL)
+    except Exception as e:
+        log.warning("symbol search cache purge failed: %s", e)
+
+
+# ── 상장 종목 파일 갱신 ──────────────────────────
+def refresh_listing(path: str | None = None) -> int:
+    """NASDAQ Trader 심볼 디렉터리(NASDAQ·NYSE·NYSE Arca 등 전체) → 상장 종목 파일 교체 후 색인 다시 읽기."""
+    path = path or config.SYMBOLS_FILE
+    entries = {}
+    for source, url in _LISTING_URLS.items():
+        resp = http_client.get(url)
+        resp.raise_for_status()
+        for row in csv.DictReader(resp.text.splitlines(), delimiter="|"):
+            entry = _parse_listing_row(source, row)
+            if entry and entry["ticker"] not in entries:
+                entries[entry["ticker"]] = entry
+    if not entries:
+        raise RuntimeError("empty symbol directory")
+
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["ticker", "name", "exchange", "asset_type"])
+        writer.writeheader()
+        writer.writerows(entries[t] for t in sorted(entries))
+    os.replace(tmp, path)
+    return reload()
+
+
+def _parse_listing_row(source: str, row: dict) -> dict | None:
+    """심볼 디렉터리 1행 → 색인 항목. 테스트 종목·우선주·파일 생성 시각 행은 제외."""
+    symbol = (row.get("Symbol") or row.get("ACT Symbol") or "").strip()
+    if not symbol or symbol.startswith("File Creation Time") or row.get("Test Issue") == "Y":
+        return None
+    if any(c in symbol for c in "$^=+"):
+        return None
+    if source == "nasdaq":
+        exchange = "NASDAQ"
+    else:
+        exchange = _EXCHANGES.get(row.get("Exchange", ""), row.get("Exchange", ""))
+    return {
+        "ticker":     symbol.replace(".", "-"),     # Yahoo 표기 (BRK.B → BRK-B)
+        "name":       _clean_name(row.get("Security Name") or symbol),
+        "exchange":   exchange,
+        "asset_type": "etf" if row.get("ETF") == "Y" else "stock",
+    }
+
+
+def _clean_name(name: str) -> str:
+    """'Apple Inc. - Common Stock' → 'Apple Inc.'"""
+    name = name.split(" - ")[0].strip()
+    lower = name.lower()
+    for suffix in _NAME_SUFFIXES:
+        if lower.endswith(suffix):
+            return name[:-len(suffix)].strip()
+    return name
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    log.info("symbol listing refreshed: %d symbols", refresh_listing())
@@ -0,0 +1,108 @@
+"""
+요청 단위 계산 그래프 — 화면 입력값을 의존 관계대로 한 번씩만 계산.
+
+노드 = (함수, 선행 노드 이름 목록). 선행 노드가 모두 끝난 노드부터 공용 스레드 풀에서 실행하고
+함수에는 선행 노드 결과를 순서대로 인자로 넘긴다. 같은 입력을 두 노드가 필요로 해도
+upstream 조회는 그 입력 노드에서 1회만 일어난다.
+
+  예) fear_score = calc_fear_score(fear_greed, vix, market_rsi)
+      → get_fear_greed·get_vix·get_market_rsi 를 다시 호출하지 않음
+
+노드별 실행 시간(대기 제외)은 그래프 이름별로 집계 → /api/stats,
+요청마다의 시간은 run() 반환값으로 받아 Server-Timing 헤더 등에 사용.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from src import thread_pool
+
+log = logging.getLogger(__name__)
+
+_stats: dict = {}           # {graph: {node: {"count", "total_ms", "max_ms"}}}
+_stats_lock = threading.Lock()
+
+
+def run(name: str, nodes: dict, max_workers: int = 8) -> tuple[dict, dict]:
+    """
+    nodes: {노드 이름: (함수, [선행 노드 이름, ...])}
+    반환: (결과 {노드: 값}, 실행 시간 {노드: ms})
+    max_workers: 이 그래프가 공용 풀에서 동시에 쓰는 스레드 수 상한.
+    노드 함수 안에서 run() 을 다시 호출하지 않는다 (공용 풀이 차면 교착).
+    노드 함수가 예외를 내면 나머지 실행 중인 노드를 기다린 뒤 그 예외를 다시 발생시킨다.
+    """
+    for node, (_, deps) in nodes.items():
+        unknown = [d for d in deps if d not in nodes]
+        if unknown:
+            raise ValueError(f"{name}.{node}: 알 수 없는 선행 노드 {unknown}")
+
+    results: dict = {}
+    timings: dict = {}
+    pending = dict(nodes)
+    running = {}            # {future: 노드 이름}
+    error = None
+
+    ex = thread_pool.get("taskgraph")
+    limit = max(1, max_workers)
+    while pending or running:
+        if error is None:
+            ready = [n for n, (_, deps) in pending.items() if all(d in results for d in deps)]
+            for node in ready[:limit - len(running)]:
+                fn, deps = pending.pop(node)
+                running[ex.submit(_timed, fn, [results[d] for d in deps])] = node
+        if not running:
+            if error is None:
+                raise ValueError(f"{name}: 순환 의존 {sorted(pending)}")
+            break
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            node = running.pop(future)
+            try:
+                results[node], timings[node] = future.result()
+            except Exception as e:
+                log.warning("task %s.%s failed: %s", name, node, e)
+                error = error or e
+
+    _record(name, timings)
+    if error is not None:
+        raise error
+    return results, timings
+
+
+def server_timing(timings: dict) -> str:
+    """노드별 실행 시간 → Server-Timing 헤더 값 (브라우저 개발자 도구 Timing 탭)."""
+    return ", ".join(f"{node};dur={ms:.1f}" for node, ms in timings.items())
+
+
+def stats() -> dict:
+    with _stats_lock:
+        return {
+            graph: {
+                node: {
+                    "count":  s["count"],
+                    "avg_ms": round(s["total_ms"] / s["count"], 1),
+                    "max_ms": round(s["max_ms"], 1),
+                }
+                for node, s in nodes.items()
+            }
+            for graph, nodes in _stats.items()
+        }
+
+
+# ── 내부 ──────────────────────────────────────
+def _timed(fn, args: list):
+    started = time.monotonic()
+    value = fn(*args)
+    return value, (time.monotonic() - started) * 1000
+
+
+def _record(name: str, timings: dict):
+    with _stats_lock:
+        graph = _stats.setdefault(name, {})
+        for node, ms in timings.items():
+            s = graph.setdefault(node, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            s["count"] += 1
+            s["total_ms"] += ms
+            s["max_ms"] = max(s["max_ms"], ms)
@@ -0,0 +1,41 @@
+"""
+I/O 동시 조회용 공용 스레드 풀 — 호출마다 ThreadPoolExecutor 를 새로 만들지 않음.
+
+호출마다 풀을 만들면 새 스레드가 매번 생기고, SQLite 는 스레드별 연결이라 새 연결(sqlite3.connect)도
+매번 열린다. 용도별(name) 풀 1개를 프로세스 수명 동안 재사용해 스레드·연결 수를 일정하게 유지한다.
+
+  - 풀 크기: IO_POOL_SIZE (스레드는 필요할 때만 늘어남)
+  - 같은 풀의 작업 안에서 같은 풀에 작업을 넣고 기다리지 않는다 (풀이 차면 교착) → 용도별로 풀을 나눔
+  - gunicorn fork 이후 PID 가 바뀌면 새로 생성 (부모의 스레드는 자식에 없음)
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+_pools: dict = {}           # {name: ThreadPoolExecutor}
+_pid = None
+_lock = threading.Lock()
+
+
+def get(name: str) -> ThreadPoolExecutor:
+    """용도별 공용 풀 (없으면 생성)."""
+    global _pid
+    pid = os.getpid()
+    with _lock:
+        if _pid != pid:
+            _pools.clear()
+            _pid = pid
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = ThreadPoolExecutor(max_workers=config.IO_POOL_SIZE,
+                                                     thread_name_prefix=f"io-{name}")
+    return pool
+
+
+def stats() -> dict:
+    with _lock:
+        pools = dict(_pools) if _pid == os.getpid() else {}
+    return {name: {"threads": len(pool._threads), "queued": pool._work_queue.qsize()}
+            for name, pool in pools.items()}
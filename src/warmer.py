@@ -0,0 +1,128 @@
+"""
+캐시 워머 — watchlist 종목과 시장심리 지표를 TTL 만료 직전에 미리 갱신.
+
+사용자 요청이 upstream(Yahoo·CNN·FRED) 조회를 기다리지 않도록
+만료 CACHE_WARM_LEAD_SEC 전에 백그라운드에서 다시 채워 둔다.
+갱신 사이에 CACHE_WARM_SPACING_SEC 간격을 둬서 Yahoo에 몰아서 요청하지 않는다.
+
+실행 방법:
+  앱 프로세스 내: CACHE_WARMER_ENABLED=true → app 시작 시 start()
+  별도 프로세스:  python -m src.warmer
+여러 워커/프로세스가 동시에 실행해도 DB 임대(lease)로 1곳만 갱신을 담당한다.
+"""
+import logging
+import os
+import socket
+import threading
+from functools import partial
+
+import config
+from src import compute_pool, market_sentiment, rate_limit, stock_analysis, watchlist
+from src.db import cache_get_entry, init_db, lease_acquire
+from src.singleflight import refresh
+
+log = logging.getLogger(__name__)
+
+_LEASE_KEY = "warmer"
+_stop = threading.Event()
+_thread = None
+
+# 시장심리 지표: (캐시 키, CACHE_TTL 키, upstream 조회 함수)
+_SENTIMENT_TARGETS = [
+    ("fear_greed",  "fear_greed",  market_sentiment.fetch_fear_greed),
+    ("vix",         "vix",         market_sentiment.fetch_vix),
+    ("market_rsi",  "market_rsi",  market_sentiment.fetch_market_rsi),
+    ("cpi",         "cpi",         market_sentiment.fetch_cpi),
+    ("m2",          "m2",          market_sentiment.fetch_m2),
+    ("yield_curve", "yield_curve", market_sentiment.fetch_yield_curve),
+]
+
+
+def _targets() -> list[tuple]:
+    targets = list(_SENTIMENT_TARGETS)
+    for ticker in watchlist.get_tickers():
+        # 종목 레이어별로 만료 시점이 다름. profile 은 fundamentals 갱신 시 함께 저장된다.
+        targets += [
+            (f"technical_{ticker}",    "technical",    partial(stock_analysis.fetch_technical, ticker)),
+            (f"fundamentals_{ticker}", "fundamentals", partial(stock_analysis.fetch_info_layers, ticker)),
+            (f"analyst_{ticker}",      "analyst",      partial(stock_analysis.fetch_analyst, ticker)),
+        ]
+    return targets
+
+
+def _lead_seconds(ttl: int) -> int:
+    # TTL이 짧은 지표는 TTL의 1/4 이내에서만 앞당김
+    return min(config.CACHE_WARM_LEAD_SEC, ttl // 4)
+
+
+def due_targets() -> list[tuple]:
+    """만료가 임박했거나 캐시가 없는 항목을 오래된 순으로 반환."""
+    due = []
+    for key, ttl_name, loader in _targets():
+        ttl = config.CACHE_TTL[ttl_name]
+        entry = cache_get_entry(key, ttl)
+        age = entry["age"] if entry else float("inf")
+        if age >= ttl - _lead_seconds(ttl):
+            due.append((age - ttl, key, loader))
+    due.sort(key=lambda x: x[0], reverse=True)
+    return [(key, loader) for _, key, loader in due]
+
+
+def run_once() -> int:
+    """만료 임박 항목을 간격을 두고 갱신. 갱신 시도한 개수 반환."""
+    count = 0
+    for key, loader in due_targets():
+        if _stop.is_set() or not _is_leader():   # 임대 연장 (긴 주기 동안 다른 프로세스가 가져가지 않게)
+            break
+        try:
+            refresh(key, loader)
+            log.info("cache warmed: %s", key)
+        except Exception as e:
+            log.warning("cache warm failed for %s: %s", key, e)
+        count += 1
+        _stop.wait(config.CACHE_WARM_SPACING_SEC)   # 요청 분산 (버스트 방지)
+    return count
+
+
+def _is_leader() -> bool:
+    """워머 임대 획득/연장. 다른 프로세스가 담당 중이면 False."""
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        return lease_acquire(_LEASE_KEY, owner, config.CACHE_WARM_INTERVAL_SEC * 3)
+    except Exception:
+        return False
+
+
+def run_forever():
+    while not _stop.is_set():
+        if _is_leader():
+            try:
+                with rate_limit.background():   # 요청 스레드와 달리 토큰을 기다려도 됨
+                    run_once()
+            except Exception as e:
+                log.warning("cache warmer cycle failed: %s", e)
+        _stop.wait(config.CACHE_WARM_INTERVAL_SEC)
+
+
+def start():
+    """앱 프로세스 안에서 워머 데몬 스레드 시작 (프로세스당 1회)."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=run_forever, name="cache-warmer", daemon=True)
+    _thread.start()
+
+
+def stop():
+    _stop.set()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    compute_pool.start()
+    init_db()
+    try:
+        run_forever()
+    except KeyboardInterrupt:
+        stop()
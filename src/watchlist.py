@@ -1,4 +1,4 @@
-from src.db import get_conn, PH
+from src.db import get_conn, put_conn, PH
 
 
 def get_all() -> list[dict]:
@@ -10,7 +10,7 @@ def get_all() -> list[dict]:
         )
         rows = cur.fetchall()
     finally:
-        conn.close()
+        put_conn(conn)
     return [dict(r) for r in rows]
 
 
@@ -21,7 +21,7 @@ def get_tickers() -> list[str]:
         cur.execute("SELECT ticker FROM watchlist")
         rows = cur.fetchall()
     finally:
-        conn.close()
+        put_conn(conn)
     return [r["ticker"] for r in rows]
 
 
@@ -37,7 +37,7 @@ def add(ticker: str, name: str = "", asset_type: str = "stock", memo: str = "")
             )
             conn.commit()
         finally:
-            conn.close()
+            put_conn(conn)
         return True
     except Exception:
         return False
@@ -51,7 +51,7 @@ def delete(ticker: str) -> bool:
         cur.execute(f"DELETE FROM watchlist WHERE ticker = {PH}", (ticker,))
         conn.commit()
     finally:
-        conn.close()
+        put_conn(conn)
     return True
 
 
@@ -63,5 +63,5 @@ def exists(ticker: str) -> bool:
         cur.execute(f"SELECT 1 FROM watchlist WHERE ticker = {PH}", (ticker,))
         row = cur.fetchone()
     finally:
-        conn.close()
+        put_conn(conn)
     return row is not None
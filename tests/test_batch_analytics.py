@@ -0,0 +1,89 @@
+"""
+batch_analytics 일치 검사 — 종목을 묶어 계산한 결과가 종목별 indicators.advance 결과와 같은지.
+
+거래 달력이 다른 종목을 한 묶음에 넣는다 (평일 종목, 주말에도 거래하는 코인, 휴장일이 다른 해외 종목,
+늦게 상장한 종목, 종가가 빠진 날이 있는 종목). 한 종목의 지표가 같은 묶음의 다른 종목 거래일에
+영향을 받으면 안 된다.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import batch_analytics, indicators
+
+_MA_TOLERANCE = 0.01 + 1e-9      # 소수 2자리 반올림 결과끼리 비교 (누적합 차분 ↔ 구간 합계 오차)
+
+
+def _series(dates: pd.DatetimeIndex, seed: int, gaps: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    close = (100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))).round(2)
+    high = (close * (1 + rng.uniform(0, 0.02, len(dates)))).round(2)
+    if gaps:
+        close[rng.choice(np.arange(1, len(dates) - 1), gaps, replace=False)] = np.nan
+    return dates.values.astype("datetime64[D]"), close, high
+
+
+def _mixed_batch() -> dict:
+    weekdays = pd.bdate_range("2021-01-04", "2024-06-28")
+    foreign_holidays = weekdays[np.random.default_rng(9).random(len(weekdays)) < 0.04]
+    return {
+        "AAPL":    _series(weekdays, 1),
+        "BTC-USD": _series(pd.date_range("2021-01-01", "2024-06-30"), 2),         # 주말 포함
+        "7203.T":  _series(weekdays.difference(foreign_holidays), 3),              # 다른 휴장일
+        "NEWCO":   _series(pd.bdate_range("2024-01-02", "2024-06-28"), 4),         # 늦은 상장
+        "HALTED":  _series(weekdays, 5, gaps=30),                                  # 종가 누락일
+        "OLDCO":   _series(pd.bdate_range("2021-01-04", "2023-03-31"), 6),         # 거래 중단
+    }
+
+
+def _scalar(close: np.ndarray) -> dict:
+    values = close[~np.isnan(close)].tolist()
+    return indicators.advance(indicators._new_state(), values, 0)[1]
+
+
+def _assert_same(batch: dict, scalar: dict):
+    if scalar["rsi"] is None:
+        assert batch["rsi"] is None
+    else:
+        assert batch["rsi"] == pytest.approx(scalar["rsi"], abs=0.1 + 1e-9)
+    assert batch["macd_bullish"] == scalar["macd_bullish"]
+    assert batch["ma_signal"] == scalar["ma_signal"]
+    for name, expected in scalar["ma_series"].items():
+        got = batch["ma_series"][name]
+        assert len(got) == len(expected), name
+        for g, e in zip(got, expected):
+            assert (g is None) == (e is None), name
+            if e is not None:
+                assert abs(g - e) <= _MA_TOLERANCE, name
+
+
+def test_mixed_calendar_batch_matches_scalar():
+    series = _mixed_batch()
+    result = batch_analytics.compute_arrays(series, {})
+    for ticker, (_, close, _) in series.items():
+        _assert_same(result[ticker], _scalar(close))
+
+
+def test_batch_result_independent_of_batch_members():
+    series = _mixed_batch()
+    together = batch_analytics.compute_arrays(series, {})
+    for ticker in series:
+        alone = batch_analytics.compute_arrays({ticker: series[ticker]}, {})[ticker]
+        assert together[ticker] == alone, ticker
+
+
+def test_drawdowns_use_own_history():
+    """stock_analysis._price_levels 와 같은 기준: 종목 이력 전체 고가, 최근 252봉 고가."""
+    series = _mixed_batch()
+    prices = {"AAPL": 150.0}
+    result = batch_analytics.compute_arrays(series, prices)
+    for ticker, (dates, close, high) in series.items():
+        ath = np.nanmax(high)
+        high_52w = np.nanmax(high[-indicators.CHART_DAYS:])
+        price = prices.get(ticker, close[~np.isnan(close)][-1])
+        r = result[ticker]
+        assert r["ath"] == round(float(ath), 2)
+        assert r["ath_date"] == str(dates[np.nanargmax(high)])
+        assert r["high_52w"] == round(float(high_52w), 2)
+        assert r["ath_drawdown_pct"] == round(float((price - ath) / ath * 100), 1)
+        assert r["high_52w_drawdown_pct"] == round(float((price - high_52w) / high_52w * 100), 1)
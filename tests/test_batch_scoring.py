@@ -0,0 +1,169 @@
+"""
+batch_scoring 일치 검사 — rows(score_table(...)) 가 종목별 scoring.calc_recommendation_score 와 같은지.
+
+  - 무작위 행: None·키 누락·ETF·정수/실수 값 섞음
+  - 경계값 행: 하위 점수 구간 경계와 등급 경계(30·50·70) 총점을 정확히 지나는 값
+  - 입력 형식: {컬럼: 리스트} 와 pandas DataFrame (dict 리스트로 만든 것) 둘 다
+"""
+import random
+
+import pandas as pd
+import pytest
+
+from src import batch_scoring, scoring
+
+_NUMERIC = ["ath_drawdown_pct", "rsi", "buy_ratio_pct", "peg", "forward_pe", "eps_growth_pct",
+            "revenue_growth_pct", "roe", "debt_to_equity", "current_ratio", "three_year_return"]
+_FLAGS = ["is_etf", "macd_bullish", "fcf_positive"]
+_COLUMNS = _NUMERIC + _FLAGS + ["ma_signal"]
+
+# 스칼라 함수의 if/elif 경계 (경계값 그대로 + 바로 옆 값)
+_BOUNDARIES = {
+    "ath_drawdown_pct":   [0, -5, -10, -15, -20, -30, -50, -60],
+    "rsi":                [20, 30, 40, 50, 60, 70, 80],
+    "buy_ratio_pct":      [0, 49, 50, 69, 70, 100],
+    "peg":                [-1, 0, 0.5, 1, 2, 3],
+    "forward_pe":         [-5, 0, 10, 15, 20, 25, 30],
+    "eps_growth_pct":     [0, 10, 11, 15, 16],
+    "revenue_growth_pct": [0, 10, 11],
+    "roe":                [0, 15, 16, 20, 21],
+    "debt_to_equity":     [0.1, 0.3, 1, 2, 2.5, 5, 6],
+    "current_ratio":      [0.5, 1, 1.5, 2, 3],
+    "three_year_return":  [-10, 0, 12, 25],
+}
+_MACRO = [
+    {"fear_score": 50},
+    {"fear_score": 75, "yield_spread": -0.8, "m2_yoy": 16, "m2_consecutive": 2},
+    {"fear_score": 30, "yield_spread": 0.2, "m2_yoy": -3, "m2_consecutive": 8},
+    {"fear_score": 45, "yield_spread": -0.3, "m2_yoy": 8, "m2_consecutive": 12},
+]
+
+
+def _random_row(rng: random.Random, integral: bool) -> dict:
+    """integral=True 면 이유 텍스트에 쓰이는 컬럼을 정수로 (DataFrame 에서 NaN 과 섞이면 float 로 바뀜)."""
+    row = {}
+    for name in _NUMERIC:
+        roll = rng.random()
+        if roll < 0.1:
+            continue                    # 키 누락
+        if roll < 0.25:
+            row[name] = None
+        elif name in ("ath_drawdown_pct", "buy_ratio_pct", "three_year_return"):
+            row[name] = rng.randint(-80, 100) if integral else round(rng.uniform(-80, 100), 1)
+        else:
+            row[name] = rng.choice([rng.randint(-5, 90), round(rng.uniform(-5, 90), 2)])
+    for name in _FLAGS:
+        value = rng.choice([True, False, None, "missing"])
+        if value != "missing":
+            row[name] = value
+    signal = rng.choice(["bullish", "neutral", "bearish", None, "missing"])
+    if signal != "missing":
+        row["ma_signal"] = signal
+    return row
+
+
+def _boundary_row(rng: random.Random) -> dict:
+    row = {name: rng.choice(values) for name, values in _BOUNDARIES.items()}
+    row["is_etf"] = rng.random() < 0.3
+    row["macd_bullish"] = rng.choice([True, False])
+    row["fcf_positive"] = rng.choice([True, False])
+    row["ma_signal"] = rng.choice(["bullish", "neutral", "bearish"])
+    return row
+
+
+def _as_columns(rows: list[dict]) -> dict:
+    """키 누락 행은 None (dict 입력은 None·누락을 구분하지 않음 — ma_signal 누락만 스칼라 기본값과 다름)."""
+    return {name: [r.get(name, "neutral" if name == "ma_signal" else None) for r in rows]
+            for name in _COLUMNS}
+
+
+def _frame(rows: list[dict]) -> tuple[pd.DataFrame, list[dict]]:
+    """
+    DataFrame 입력과 비교 기준 행. pandas 문자열 컬럼은 None 을 NaN(누락)으로 바꾸므로
+    ma_signal=None 행은 기준에서도 키 누락으로 본다.
+    """
+    reference = [{k: v for k, v in r.items() if not (k == "ma_signal" and v is None)} for r in rows]
+    return pd.DataFrame(rows), reference
+
+
+def _expected(rows: list[dict], macro: dict) -> list[dict]:
+    fear_score = macro["fear_score"]
+    extra = {k: v for k, v in macro.items() if k != "fear_score"}
+    # 스칼라 함수는 is_etf 입력값(None 포함)을 그대로 돌려줌 → 배열 결과는 bool
+    return [{**s, "is_etf": bool(s["is_etf"])}
+            for s in (scoring.calc_recommendation_score(fear_score, r, **extra) for r in rows)]
+
+
+def _actual(table, macro: dict) -> list[dict]:
+    fear_score = macro["fear_score"]
+    extra = {k: v for k, v in macro.items() if k != "fear_score"}
+    return batch_scoring.rows(batch_scoring.score_table(table, fear_score, **extra))
+
+
+def _assert_same(actual: list[dict], expected: list[dict], rows: list[dict]):
+    assert len(actual) == len(expected)
+    for got, want, row in zip(actual, expected, rows):
+        assert got == want, row
+
+
+@pytest.mark.parametrize("macro", _MACRO)
+@pytest.mark.parametrize("integral", [False, True])
+def test_random_rows_dict_input(macro, integral):
+    rng = random.Random(22)
+    rows = [_random_row(rng, integral) for _ in range(2000)]
+    _assert_same(_actual(_as_columns(rows), macro), _expected(rows, macro), rows)
+
+
+@pytest.mark.parametrize("macro", _MACRO)
+@pytest.mark.parametrize("integral", [False, True])
+def test_random_rows_dataframe_input(macro, integral):
+    rng = random.Random(23)
+    frame, reference = _frame([_random_row(rng, integral) for _ in range(2000)])
+    _assert_same(_actual(frame, macro), _expected(reference, macro), reference)
+
+
+@pytest.mark.parametrize("macro", _MACRO)
+def test_boundary_rows(macro):
+    rng = random.Random(24)
+    rows = [_boundary_row(rng) for _ in range(3000)]
+    expected = _expected(rows, macro)
+    _assert_same(_actual(_as_columns(rows), macro), expected, rows)
+    _assert_same(_actual(pd.DataFrame(rows), macro), expected, rows)
+
+
+def test_boundary_rows_hit_grade_thresholds():
+    """경계값 행이 등급 경계 총점(최소 총점과 그 바로 아래)을 실제로 지나가는지 — 위 검사가 등급 경계를 포함하도록."""
+    rng = random.Random(24)
+    rows = [_boundary_row(rng) for _ in range(3000)]
+    totals = {s["total_score"] for macro in _MACRO for s in _actual(pd.DataFrame(rows), macro)}
+    thresholds = {min_score for min_score, _, _ in scoring.GRADES}
+    assert thresholds | {t - 1 for t in thresholds} <= totals
+
+
+def test_grade_table_is_shared(monkeypatch):
+    """등급 구간표(scoring.GRADES)를 바꾸면 스칼라·일괄 계산이 함께 바뀐다."""
+    monkeypatch.setattr(scoring, "GRADES", [(60, "A", "#111111"), (40, "B", "#222222")])
+    monkeypatch.setattr(scoring, "GRADE_DEFAULT", ("C", "#333333"))
+    rng = random.Random(25)
+    rows = [_boundary_row(rng) for _ in range(500)]
+    expected = _expected(rows, _MACRO[0])
+    assert {s["grade"] for s in expected} == {"A", "B", "C"}
+    _assert_same(_actual(_as_columns(rows), _MACRO[0]), expected, rows)
+
+
+def test_dataframe_nan_flags_are_false():
+    rows = [{"is_etf": True, "fcf_positive": True}, {}, {"is_etf": None, "fcf_positive": None}]
+    result = batch_scoring.score_table(pd.DataFrame(rows), 50)
+    assert result["is_etf"].tolist() == [True, False, False]
+    _assert_same(batch_scoring.rows(result), _expected(rows, {"fear_score": 50}), rows)
+
+
+def test_dataframe_int_column_with_nan_keeps_int_label():
+    rows = [{"buy_ratio_pct": 70, "ath_drawdown_pct": -32}, {"buy_ratio_pct": None}]
+    scored = batch_scoring.rows(batch_scoring.score_table(pd.DataFrame(rows), 50))
+    assert scored[0]["reason"] == "시장 불안 구간 + ATH -32% + Buy 70%"
+    _assert_same(scored, _expected(rows, {"fear_score": 50}), rows)
+
+
+def test_empty_table():
+    assert batch_scoring.rows(batch_scoring.score_table({name: [] for name in _COLUMNS}, 50)) == []
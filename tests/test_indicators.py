@@ -0,0 +1,168 @@
+"""
+indicators 증분 엔진 일치 검사 — pandas_ta 0.3.14b 와 같은 식의 pandas 기준 구현과 비교.
+
+  기준 구현 (pandas_ta 0.3.14b 의 rsi·ema·macd·sma 와 동일한 식):
+    RSI  = rma(상승폭) / (rma(상승폭) + |rma(하락폭)|) × 100,  rma = ewm(alpha=1/14, min_periods=14)
+    EMA  = 첫 length개 단순평균을 시드로 둔 ewm(span=length, adjust=False)
+    MACD = EMA12 - EMA26,  Signal = MACD 유효 구간부터의 EMA9
+    MA   = rolling(w).mean()
+  - 전체 계산: advance(새 상태, 전체 종가)
+  - 이어서 계산: update 로 저장한 ind_<T> 상태 + 새 봉, 장중 마지막 봉 교체, 수정주가 이력 재작성
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import indicators
+
+_RSI_TOLERANCE = 0.05 + 1e-9     # 소수 1자리 반올림 경계
+_MA_TOLERANCE = 0.005 + 1e-9     # 소수 2자리 반올림 경계
+
+
+# ── 기준 구현 ─────────────────────────────────
+def _ref_ema(series: pd.Series, length: int) -> pd.Series:
+    """길이가 length 미만이면 전부 NaN (pandas_ta 는 None 반환)."""
+    if len(series) < length:
+        return pd.Series(np.nan, index=series.index)
+    series = series.copy()
+    series.iloc[length - 1] = series.iloc[:length].mean()
+    series.iloc[:length - 1] = np.nan
+    return series.ewm(span=length, adjust=False).mean()
+
+
+def _reference(closes: pd.Series) -> dict:
+    diff = closes.diff()
+    alpha = 1.0 / indicators.RSI_LENGTH
+    gain = diff.clip(lower=0).ewm(alpha=alpha, min_periods=indicators.RSI_LENGTH).mean()
+    loss = diff.clip(upper=0).ewm(alpha=alpha, min_periods=indicators.RSI_LENGTH).mean()
+    rsi = (100 * gain / (gain + loss.abs())).iloc[-1]
+
+    macd = _ref_ema(closes, indicators.MACD_FAST) - _ref_ema(closes, indicators.MACD_SLOW)
+    macd = macd.loc[macd.first_valid_index():] if macd.first_valid_index() is not None else macd
+    signal = _ref_ema(macd, indicators.MACD_SIGNAL)
+    last_macd = None if macd.empty or pd.isna(macd.iloc[-1]) else float(macd.iloc[-1])
+    last_signal = None if pd.isna(signal.iloc[-1]) else float(signal.iloc[-1])
+
+    mas = {w: closes.rolling(w).mean() for w in indicators.MA_WINDOWS}
+    price, ma20, ma60 = closes.iloc[-1], mas[20].iloc[-1], mas[60].iloc[-1]
+    ma_signal = "neutral"
+    if not (pd.isna(ma20) or pd.isna(ma60)):
+        if price > ma20 > ma60:
+            ma_signal = "bullish"
+        elif price < ma20 < ma60:
+            ma_signal = "bearish"
+
+    return {
+        "rsi":          None if pd.isna(rsi) else float(rsi),
+        "macd":         last_macd,
+        "macd_signal":  last_signal,
+        "macd_bullish": last_macd is not None and last_signal is not None and last_macd > last_signal,
+        "ma_signal":    ma_signal,
+        "ma_series":    {f"ma{w}": [None if pd.isna(v) else float(v)
+                                    for v in s.iloc[-indicators.CHART_DAYS:]]
+                         for w, s in mas.items()},
+    }
+
+
+def _assert_matches(actual: dict, closes: pd.Series):
+    expected = _reference(closes)
+    if expected["rsi"] is None:
+        assert actual["rsi"] is None
+    else:
+        assert abs(actual["rsi"] - expected["rsi"]) <= _RSI_TOLERANCE
+    for name in ("macd", "macd_signal"):
+        if expected[name] is None:
+            assert actual[name] is None, name
+        else:
+            assert actual[name] == pytest.approx(expected[name], rel=1e-9, abs=1e-9), name
+    assert actual["macd_bullish"] == expected["macd_bullish"]
+    assert actual["ma_signal"] == expected["ma_signal"]
+    for name, series in expected["ma_series"].items():
+        got = actual["ma_series"][name]
+        assert len(got) == len(series), name
+        for g, e in zip(got, series):
+            assert (g is None) == (e is None), name
+            if e is not None:
+                assert abs(g - e) <= _MA_TOLERANCE, name
+
+
+# ── 입력 ──────────────────────────────────────
+def _closes(n: int, seed: int, start: str = "2020-01-01") -> pd.Series:
+    rng = np.random.default_rng(seed)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.Series(values.round(2), index=pd.bdate_range(start, periods=n))
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """ind_<T> 상태 저장소 (캐시 대신 dict)."""
+    data = {}
+    monkeypatch.setattr(indicators, "cache_get_raw", data.get)
+    monkeypatch.setattr(indicators, "cache_set", data.__setitem__)
+    return data
+
+
+# ── 전체 계산 ─────────────────────────────────
+@pytest.mark.parametrize("n", [1, 2, 14, 15, 26, 34, 35, 60, 119, 120, 300, 1260])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_full_compute_matches_reference(n, seed):
+    closes = _closes(n, seed)
+    _, outputs = indicators.advance(indicators._new_state(), closes.tolist(), 0)
+    _assert_matches(outputs, closes)
+
+
+def test_flat_series_has_no_rsi():
+    closes = pd.Series([50.0] * 40, index=pd.bdate_range("2024-01-01", periods=40))
+    _, outputs = indicators.advance(indicators._new_state(), closes.tolist(), 0)
+    assert outputs["rsi"] is None
+    _assert_matches(outputs, closes)
+
+
+# ── 이어서 계산 ───────────────────────────────
+@pytest.mark.parametrize("added", [1, 2, 5, 250])
+def test_resume_with_saved_state_matches_full(store, added):
+    closes = _closes(600 + added, seed=3)
+    indicators.update("AAA", closes.iloc[:600])
+    saved = store["ind_AAA"]
+    assert saved["last_date"] == closes.index[598].strftime("%Y-%m-%d")   # 마지막 봉은 미확정
+
+    outputs = indicators.update("AAA", closes)
+    _assert_matches(outputs, closes)
+    assert store["ind_AAA"]["last_date"] == closes.index[-2].strftime("%Y-%m-%d")
+
+
+def test_provisional_last_bar_is_not_committed(store):
+    closes = _closes(400, seed=4)
+    indicators.update("AAA", closes)
+    saved = dict(store["ind_AAA"])
+
+    # 장중 가격 변동: 같은 날짜의 마지막 봉만 바뀜 → 확정 상태 그대로, 지표는 새 가격 기준
+    for price in (closes.iloc[-1] * 1.05, closes.iloc[-1] * 0.9):
+        intraday = closes.copy()
+        intraday.iloc[-1] = round(price, 2)
+        outputs = indicators.update("AAA", intraday)
+        _assert_matches(outputs, intraday)
+        assert store["ind_AAA"]["last_date"] == saved["last_date"]
+        assert store["ind_AAA"]["last_close"] == saved["last_close"]
+
+
+def test_rewritten_history_recomputes(store):
+    closes = _closes(400, seed=5)
+    indicators.update("AAA", closes.iloc[:300])
+
+    # 수정주가(분할·배당) 재조회: 저장 상태의 마지막 확정 종가가 달라짐 → 전체 재계산
+    adjusted = closes * 0.5
+    outputs = indicators.update("AAA", adjusted)
+    _assert_matches(outputs, adjusted)
+
+
+def test_resume_equals_fresh_update(store):
+    closes = _closes(500, seed=6)
+    for end in range(300, 501, 40):
+        resumed = indicators.update("AAA", closes.iloc[:end])
+    fresh = indicators.advance(indicators._new_state(), closes.tolist(), 0)[1]
+    assert resumed["rsi"] == fresh["rsi"]
+    assert resumed["macd_bullish"] == fresh["macd_bullish"]
+    assert resumed["ma_signal"] == fresh["ma_signal"]
+    assert resumed["ma_series"] == fresh["ma_series"]
+    assert resumed["macd"] == pytest.approx(fresh["macd"], rel=1e-9)